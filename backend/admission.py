@@ -0,0 +1,208 @@
+"""
+Admission control untuk endpoint search
+
+- Maksimal ADMISSION_MAX_CONCURRENCY search berjalan bersamaan
+- Request berikutnya antri (FIFO) maksimal ADMISSION_MAX_QUEUE,
+  dengan deadline ADMISSION_QUEUE_TIMEOUT
+- Request yang diperkirakan tidak akan dapat slot sebelum deadline
+  langsung ditolak (503 + Retry-After) tanpa ikut antri
+
+Bisa dipakai dari thread (Flask) maupun event loop (ASGI).
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT
+from metrics import ADMISSION_ACTIVE, ADMISSION_QUEUED, ADMISSION_REJECTED, STAGE_LATENCY
+
+# Bobot EWMA untuk estimasi durasi satu search
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Request ditolak admission controller"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+
+class AdmissionController:
+    """Semaphore dengan antrian terbatas + deadline"""
+
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = deque()
+        self._service_time = None
+
+    # ----- state (dipanggil dengan _lock) -----
+
+    def _expected_wait(self, position):
+        """Perkiraan waktu tunggu untuk posisi antrian ke-N"""
+        if self._service_time is None:
+            return 0.0
+        return math.ceil(position / self.max_concurrency) * self._service_time
+
+    def _retry_after(self):
+        wait = self._expected_wait(len(self._waiters) + 1) or self.queue_timeout
+        return max(1, math.ceil(wait))
+
+    def _update_gauges(self):
+        ADMISSION_ACTIVE.set(self._active, controller=self.name)
+        ADMISSION_QUEUED.set(len(self._waiters), controller=self.name)
+
+    def _enter(self, waiter):
+        """True = langsung dapat slot, False = masuk antrian, raise Overloaded = ditolak"""
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._update_gauges()
+            return True
+        if len(self._waiters) >= self.max_queue:
+            raise Overloaded("queue_full", self._retry_after())
+        if self._expected_wait(len(self._waiters) + 1) > self.queue_timeout:
+            raise Overloaded("deadline", self._retry_after())
+        self._waiters.append(waiter)
+        self._update_gauges()
+        return False
+
+    def _abandon(self, waiter):
+        """Waiter kena timeout; True kalau ternyata slot sudah diberikan"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self._update_gauges()
+            return False
+
+    def _release(self, elapsed=None):
+        """Kembalikan slot; elapsed = durasi search (None = tidak dihitung ke EWMA)"""
+        with self._lock:
+            if elapsed is not None:
+                if self._service_time is None:
+                    self._service_time = elapsed
+                else:
+                    self._service_time += SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+
+            # Slot langsung dioper ke waiter terdepan (tidak ada yang bisa menyerobot)
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.wake()
+            else:
+                self._active -= 1
+            self._update_gauges()
+
+    def _rejected(self, endpoint, error):
+        ADMISSION_REJECTED.inc(endpoint=endpoint, reason=error.reason)
+        return error
+
+    def _timeout(self, endpoint):
+        with self._lock:
+            error = Overloaded("timeout", self._retry_after())
+        return self._rejected(endpoint, error)
+
+    # ----- API -----
+
+    @contextmanager
+    def admit(self, endpoint):
+        """Blok (thread) sampai dapat slot; raise Overloaded kalau ditolak"""
+        start = time.perf_counter()
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        try:
+            with self._lock:
+                admitted = self._enter(waiter)
+        except Overloaded as e:
+            raise self._rejected(endpoint, e)
+
+        if not admitted:
+            event.wait(self.queue_timeout)
+            if not self._abandon(waiter):
+                raise self._timeout(endpoint)
+
+        run_start = time.perf_counter()
+        STAGE_LATENCY.observe(run_start - start, endpoint=endpoint, algorithm="", stage="admission_queue")
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - run_start)
+
+    async def acquire_async(self, endpoint):
+        """
+        Versi event loop: menunggu slot tanpa memblok loop.
+        Return fungsi release (thread-safe) supaya slot bisa dilepas saat
+        kerja di executor benar-benar selesai, bukan saat coroutine dibatalkan
+        """
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = _Waiter(wake)
+        try:
+            with self._lock:
+                admitted = self._enter(waiter)
+        except Overloaded as e:
+            raise self._rejected(endpoint, e)
+
+        if not admitted:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+            except asyncio.TimeoutError:
+                if not self._abandon(waiter):
+                    raise self._timeout(endpoint)
+            except asyncio.CancelledError:
+                # Client disconnect saat antri: slot yang terlanjur diberikan dikembalikan
+                if self._abandon(waiter):
+                    self._release()
+                raise
+
+        run_start = time.perf_counter()
+        STAGE_LATENCY.observe(run_start - start, endpoint=endpoint, algorithm="", stage="admission_queue")
+        return lambda: self._release(time.perf_counter() - run_start)
+
+    def status(self):
+        with self._lock:
+            return {
+                "active": self._active,
+                "queued": len(self._waiters),
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "avg_service_time": round(self._service_time, 4) if self._service_time else None,
+            }
+
+
+def overloaded_payload(error):
+    """(payload, headers) untuk response 503"""
+    payload = {
+        "error": "Server is busy, please retry later",
+        "reason": error.reason,
+        "retry_after": error.retry_after
+    }
+    return payload, {"Retry-After": str(error.retry_after)}
+
+
+search_admission = AdmissionController(
+    "search", ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT
+)
@@ -0,0 +1,287 @@
+"""
+ASGI variant dari Search API (route & response sama dengan app.py)
+
+- Image proxy memakai httpx.AsyncClient: fetch CDN yang lambat hanya
+  menunggu di event loop, tidak memakan thread milik search
+- Scoring (CPU-bound) dijalankan di executor khusus search
+
+Run:
+    cd backend
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from config import (
+    CORS_ORIGINS, IMAGE_FETCH_TIMEOUT, ENABLE_SINGLEFLIGHT,
+    ASGI_SEARCH_WORKERS, ASGI_IMAGE_MAX_CONNECTIONS
+)
+from app import (
+    IMAGE_FETCH_HEADERS, IMAGE_PROXY_ENDPOINT,
+    api_info, health_status, handle_search, handle_search_compare,
+    handle_get_document, handle_stats, handle_documents, handle_evaluate
+)
+from image_variants import (
+    PIL_AVAILABLE, parse_variant_spec, load_variant, store_variant,
+    submit_render, variant_headers
+)
+from serialization import encode_payload, parse_fields
+from admission import Overloaded, overloaded_payload, search_admission
+from singleflight import request_key, relabel, search_flights
+from warmup import readiness_status, start_background_warmup
+from metrics import (
+    REQUEST_LATENCY, REQUESTS_IN_FLIGHT, STAGE_LATENCY, PROMETHEUS_CONTENT_TYPE,
+    record_cache, render_prometheus
+)
+
+logger = logging.getLogger(__name__)
+
+# Executor terpisah supaya scoring tidak berebut thread dengan I/O lain
+search_executor = ThreadPoolExecutor(max_workers=ASGI_SEARCH_WORKERS, thread_name_prefix="search")
+
+http_client = None
+
+# ===================== HELPER FUNCTIONS =====================
+
+async def run_handler(handler, *args):
+    """Jalankan handler sinkron (dari app.py) di search executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(search_executor, handler, *args)
+
+async def json_body(request):
+    """Body JSON atau None kalau kosong/tidak valid (sama seperti get_json)"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+def variant_response(data, spec, cache_status):
+    """Response untuk thumbnail hasil resize/transcode"""
+    return Response(data, media_type=spec.mimetype, headers=variant_headers(cache_status))
+
+def json_response(request, payload, status=200, fields=None):
+    """JSON response lewat serializer cepat + kompresi sesuai Accept-Encoding"""
+    endpoint_label = getattr(request.state, "metrics_endpoint", "unmatched")
+    with STAGE_LATENCY.time(endpoint=endpoint_label, algorithm="", stage="serialization"):
+        body, headers = encode_payload(payload, request.headers.get('accept-encoding', ''), fields)
+    return Response(body, status_code=status, media_type='application/json', headers=headers)
+
+def request_fields(request, data=None):
+    """Field yang diminta client: ?fields=... atau "fields" di body JSON"""
+    value = request.query_params.get('fields')
+    if not value and isinstance(data, dict):
+        value = data.get('fields')
+    return parse_fields(value)
+
+def instrumented(label, route):
+    """Latency + in-flight gauge per endpoint (label = pola route)"""
+    async def wrapper(request):
+        request.state.metrics_endpoint = label
+        start = time.perf_counter()
+        with REQUESTS_IN_FLIGHT.track(endpoint=label):
+            response = await route(request)
+        REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint=label, status=response.status_code)
+        return response
+    return wrapper
+
+def endpoint(handler, name, read_body=False, admission=None, coalesce=False):
+    """
+    Bungkus handler (payload, status) menjadi endpoint ASGI.
+    admission: AdmissionController, request menunggu slot di event loop
+    (bukan di antrian executor) dan dapat 503 kalau ditolak
+    coalesce: request identik yang sedang berjalan digabung (single-flight)
+    """
+    async def execute(request, args):
+        if admission is None:
+            return await run_handler(handler, *args)
+        release = await admission.acquire_async(request.state.metrics_endpoint)
+        try:
+            work = search_executor.submit(handler, *args)
+        except BaseException:
+            release()
+            raise
+        # Slot dilepas saat thread search selesai: client disconnect hanya
+        # membatalkan await di bawah, scoring di executor tetap jalan
+        work.add_done_callback(lambda _: release())
+        return await asyncio.wrap_future(work)
+
+    async def route(request):
+        try:
+            data = await json_body(request) if read_body else None
+            args = [data] if read_body else []
+            label = request.state.metrics_endpoint
+            key = request_key(label, data) if coalesce and ENABLE_SINGLEFLIGHT else None
+            if key is None:
+                payload, status = await execute(request, args)
+            else:
+                (payload, status), shared = await search_flights.do_async(
+                    key, lambda: execute(request, args), label
+                )
+                if shared:
+                    payload = relabel(payload, data)
+            return json_response(request, payload, status, request_fields(request, data))
+        except Overloaded as e:
+            payload, headers = overloaded_payload(e)
+            response = json_response(request, payload, 503)
+            response.headers.update(headers)
+            return response
+        except Exception as e:
+            logger.error(f"{name} error: {e}")
+            return JSONResponse({"error": str(e)}, status_code=500)
+    return route
+
+# ===================== API ROUTES =====================
+
+async def home(request):
+    """API info endpoint"""
+    return JSONResponse(api_info())
+
+async def health_check(request):
+    """Health check endpoint"""
+    return JSONResponse(health_status())
+
+async def readiness_check(request):
+    """Readiness: 200 hanya setelah warmup (index + top query) selesai"""
+    payload, status = readiness_status()
+    return JSONResponse(payload, status_code=status)
+
+async def metrics(request):
+    """Prometheus metrics (latency per tahap, cache hit, in-flight)"""
+    return Response(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+async def image_proxy(request):
+    """
+    Proxy untuk fetch image dari CDN yang block CORS (async)
+    Parameter sama dengan versi Flask: url, w, h, format
+    """
+    try:
+        image_url = request.query_params.get('url')
+        if not image_url:
+            return JSONResponse({"error": "URL parameter required"}, status_code=400)
+
+        try:
+            spec = parse_variant_spec(request.query_params, request.headers.get('accept', ''))
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+
+        loop = asyncio.get_running_loop()
+        if spec and PIL_AVAILABLE:
+            with STAGE_LATENCY.time(endpoint=IMAGE_PROXY_ENDPOINT, algorithm="", stage="cache_lookup"):
+                cached = await loop.run_in_executor(None, load_variant, image_url, spec)
+            record_cache("image_variant", cached is not None)
+            if cached is not None:
+                return variant_response(cached, spec, "HIT")
+
+        with STAGE_LATENCY.time(endpoint=IMAGE_PROXY_ENDPOINT, algorithm="", stage="upstream_fetch"):
+            response = await http_client.get(image_url, headers=IMAGE_FETCH_HEADERS)
+
+        if response.status_code == 200:
+            if spec and PIL_AVAILABLE:
+                try:
+                    with STAGE_LATENCY.time(endpoint=IMAGE_PROXY_ENDPOINT, algorithm="", stage="transcode"):
+                        data = await asyncio.wrap_future(submit_render(response.content, spec))
+                    with STAGE_LATENCY.time(endpoint=IMAGE_PROXY_ENDPOINT, algorithm="", stage="cache_store"):
+                        await loop.run_in_executor(None, store_variant, image_url, spec, data)
+                    return variant_response(data, spec, "MISS")
+                except Exception as e:
+                    logger.warning(f"Image variant failed for {image_url}: {e}")
+
+            return Response(
+                response.content,
+                media_type=response.headers.get('content-type', 'image/jpeg'),
+                headers={
+                    'Cache-Control': 'public, max-age=3600',
+                    'Access-Control-Allow-Origin': '*'
+                }
+            )
+        else:
+            logger.warning(f"Image fetch failed: {response.status_code} for {image_url}")
+            return JSONResponse(
+                {"error": f"Failed to fetch image: {response.status_code}"},
+                status_code=response.status_code
+            )
+
+    except Exception as e:
+        logger.error(f"Image proxy error: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def get_document(request):
+    """Get full document by ID"""
+    try:
+        payload, status = await run_handler(handle_get_document, request.path_params["doc_id"])
+        return json_response(request, payload, status)
+    except Exception as e:
+        logger.error(f"Get document error: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def get_all_documents(request):
+    """Get all documents in JSON format (paginated)"""
+    try:
+        try:
+            page = int(request.query_params.get('page', 1))
+            per_page = int(request.query_params.get('per_page', 10))
+        except ValueError:
+            page, per_page = 1, 10
+        payload, status = await run_handler(handle_documents, page, per_page)
+        return json_response(request, payload, status)
+    except Exception as e:
+        logger.error(f"Get documents error: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+# ===================== ERROR HANDLERS =====================
+
+async def not_found(request, exc):
+    return JSONResponse({"error": "Endpoint not found"}, status_code=404)
+
+async def internal_error(request, exc):
+    return JSONResponse({"error": "Internal server error"}, status_code=500)
+
+# ===================== APP =====================
+
+@asynccontextmanager
+async def lifespan(app):
+    global http_client
+    limits = httpx.Limits(max_connections=ASGI_IMAGE_MAX_CONNECTIONS)
+    http_client = httpx.AsyncClient(timeout=IMAGE_FETCH_TIMEOUT, limits=limits, follow_redirects=True)
+    start_background_warmup()
+    logger.info("ASGI app started (/api/ready returns 200 after warmup)")
+    try:
+        yield
+    finally:
+        await http_client.aclose()
+        search_executor.shutdown(wait=False)
+
+routes = [
+    Route(path, instrumented(path, route), methods=methods)
+    for path, route, methods in [
+        ("/", home, ["GET"]),
+        ("/api/image-proxy", image_proxy, ["GET"]),
+        ("/api/health", health_check, ["GET"]),
+        ("/api/ready", readiness_check, ["GET"]),
+        ("/api/metrics", metrics, ["GET"]),
+        ("/api/search", endpoint(handle_search, "Search", read_body=True, admission=search_admission, coalesce=True), ["POST"]),
+        ("/api/search/compare", endpoint(handle_search_compare, "Compare search", read_body=True, admission=search_admission, coalesce=True), ["POST"]),
+        ("/api/document/{doc_id:int}", get_document, ["GET"]),
+        ("/api/stats", endpoint(handle_stats, "Get stats"), ["GET"]),
+        ("/api/documents", get_all_documents, ["GET"]),
+        ("/api/evaluate", endpoint(handle_evaluate, "Evaluation", read_body=True, admission=search_admission, coalesce=True), ["POST"]),
+    ]
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[Middleware(CORSMiddleware, allow_origins=CORS_ORIGINS, allow_methods=["*"], allow_headers=["*"])],
+    exception_handlers={404: not_found, 500: internal_error},
+    lifespan=lifespan,
+)
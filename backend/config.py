@@ -13,9 +13,8 @@ SEARCH_ENGINE_DIR = os.path.join(ROOT_DIR, "implementation", "search_engine")
 DATA_PATH = os.path.join(DATA_DIR, "merge-all-dual-storage.csv")
 JSON_DATA_PATH = os.path.join(DATA_DIR, "index", "documents.json")
 
-# Index files
-TFIDF_INDEX_PATH = os.path.join(INDEX_DIR, "tfidf_index.pkl")
-BM25_INDEX_PATH = os.path.join(INDEX_DIR, "bm25_index.pkl")
+# Index files: index canonical hasil indexing/ (data/index/), dimuat oleh
+# implementation/search_engine/shared_index.py untuk TF-IDF dan BM25
 
 # ===================== API CONFIGURATION =====================
 API_HOST = "0.0.0.0"
@@ -25,18 +24,65 @@ DEBUG = True
 # CORS settings
 CORS_ORIGINS = ["http://localhost:3000", "http://localhost:5173", "*"]
 
+# Production pre-fork server (serve.py)
+SERVER_WORKERS = os.cpu_count() or 2
+SERVER_THREADS = 4  # thread per worker (gthread), image proxy tidak memblok search
+SERVER_TIMEOUT = 60  # seconds
+SERVER_PIDFILE = os.path.join(BASE_DIR, "serve.pid")
+MEMORY_REPORT_INTERVAL = 300  # seconds, 0 = hanya sekali setelah worker siap
+
+# ASGI server (asgi.py)
+ASGI_SEARCH_WORKERS = 4  # thread untuk scoring (CPU-bound)
+ASGI_IMAGE_MAX_CONNECTIONS = 1000  # koneksi paralel ke CDN untuk image proxy
+
 # ===================== SEARCH CONFIGURATION =====================
 DEFAULT_LIMIT = 10
 MAX_LIMIT = 50
 MIN_SCORE_THRESHOLD = 0.0  # Minimum relevance score
 
+# Admission control untuk /api/search, /api/search/compare, /api/evaluate
+ADMISSION_MAX_CONCURRENCY = 4  # search yang boleh jalan bersamaan per proses
+ADMISSION_MAX_QUEUE = 32  # request yang boleh menunggu slot
+ADMISSION_QUEUE_TIMEOUT = 2.0  # seconds, deadline menunggu slot sebelum 503
+
+# Request search identik yang datang bersamaan hanya dijalankan sekali
+ENABLE_SINGLEFLIGHT = True
+
+# Warmup sebelum /api/ready = 200 (JSON list query / {"query": ...} atau text per baris)
+WARMUP_QUERIES_PATH = os.path.join(ROOT_DIR, "implementation", "comparison", "queries_example.json")
+WARMUP_MAX_QUERIES = 100
+
+# Evaluation (/api/evaluate)
+EVAL_MAX_QUERIES = 1000  # query per request
+EVAL_CACHE_SIZE = 20000  # ranking per (algoritma, versi index, query, top_k)
+RRF_K = 60  # konstanta Reciprocal Rank Fusion
+PSEUDO_RELEVANT_TOP = 7  # top-N dokumen RRF dianggap relevan
+
 # Snippet length for results
 SNIPPET_LENGTH = 200  # characters
 
+# ===================== RESPONSE CONFIGURATION =====================
+SERIALIZER = "auto"  # "auto" (orjson kalau ada), "orjson", atau "json"
+COMPRESSION_MIN_SIZE = 1024  # bytes, response lebih kecil tidak dikompres
+COMPRESSION_LEVEL = {"gzip": 6, "br": 5}
+
+# ===================== METRICS CONFIGURATION =====================
+# Bucket histogram latency (seconds) untuk /api/metrics
+METRICS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
 # ===================== CACHE CONFIGURATION =====================
 ENABLE_CACHE = True
 CACHE_TTL = 3600  # seconds (1 hour)
 
+# ===================== IMAGE PROXY CONFIGURATION =====================
+IMAGE_FETCH_TIMEOUT = 10  # seconds
+IMAGE_CACHE_DIR = os.path.join(DATA_DIR, "image_cache")  # derived thumbnails (w/h/format)
+IMAGE_CACHE_MAX_AGE = 86400  # Cache-Control max-age untuk varian (1 hari)
+IMAGE_MAX_DIMENSION = 1600  # batas atas w/h yang boleh diminta
+IMAGE_FORMATS = ["webp", "jpeg"]
+IMAGE_QUALITY = {"webp": 80, "jpeg": 82}
+IMAGE_WORKERS = 4  # ukuran worker pool untuk resize + transcode
+
 # ===================== LOGGING =====================
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
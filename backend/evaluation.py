@@ -0,0 +1,235 @@
+"""
+Evaluation engine untuk /api/evaluate (multi-query, vectorized)
+
+- Retrieval lewat batch search path (search_tfidf_batch / search_bm25_batch)
+- Ranking per query di-cache per versi index, jadi evaluasi ulang set query
+  yang sama tidak menjalankan search lagi
+- Semua metrik dihitung dengan operasi numpy pada matrix relevansi
+  (queries x ranks), bukan loop set Python per query
+
+Tanpa ground truth: pseudo-relevant = top-7 dokumen menurut Reciprocal
+Rank Fusion (RRF) dari ranking TF-IDF dan BM25.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import EVAL_CACHE_SIZE, RRF_K, PSEUDO_RELEVANT_TOP
+from search_tfidf import search_tfidf_batch, get_tfidf_index_version
+from search_bm25 import search_bm25_batch, get_bm25_index_version
+from metrics import STAGE_LATENCY, record_cache
+
+ALGORITHMS = {
+    "tfidf": (search_tfidf_batch, get_tfidf_index_version),
+    "bm25": (search_bm25_batch, get_bm25_index_version),
+}
+
+METRIC_NAMES = ["map", "precision@5", "recall@5", "f1@5", "precision@10", "recall@10", "f1@10"]
+
+# ===================== RUN CACHE =====================
+
+class RunCache:
+    """LRU cache ranking doc_id per (algoritma, versi index, query, top_k)"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+run_cache = RunCache(EVAL_CACHE_SIZE)
+
+def retrieve(algorithm, queries, top_k):
+    """
+    Ranking doc_id untuk setiap query.
+    Hanya query yang belum ada di cache yang dikirim ke batch search.
+    """
+    search_batch, index_version = ALGORITHMS[algorithm]
+    version = index_version()
+
+    runs = [None] * len(queries)
+    missing = OrderedDict()
+    for i, query in enumerate(queries):
+        cached = run_cache.get((algorithm, version, query, top_k))
+        record_cache("evaluation_run", cached is not None)
+        if cached is None:
+            missing.setdefault(query, []).append(i)
+        else:
+            runs[i] = cached
+
+    if missing:
+        batch = search_batch(list(missing), top_k=top_k)
+        for (query, positions), results in zip(missing.items(), batch):
+            doc_ids = [r["doc_id"] for r in results]
+            run_cache.put((algorithm, version, query, top_k), doc_ids)
+            for i in positions:
+                runs[i] = doc_ids
+
+    return runs
+
+# ===================== MATRIX METRICS =====================
+
+def encode_runs(tfidf_runs, bm25_runs, n_ranks):
+    """doc_id → kode integer; hasil matrix (queries x n_ranks), -1 = slot kosong"""
+    codes = {}
+    shape = (len(tfidf_runs), n_ranks)
+    tfidf = np.full(shape, -1, dtype=np.int64)
+    bm25 = np.full(shape, -1, dtype=np.int64)
+    for q, (t_run, b_run) in enumerate(zip(tfidf_runs, bm25_runs)):
+        tfidf[q, :len(t_run)] = [codes.setdefault(d, len(codes)) for d in t_run[:n_ranks]]
+        bm25[q, :len(b_run)] = [codes.setdefault(d, len(codes)) for d in b_run[:n_ranks]]
+    return tfidf, bm25
+
+def pseudo_relevance(tfidf, bm25):
+    """
+    RRF score setiap dokumen di kedua ranking + matrix relevansi.
+
+    Return:
+        rel_tfidf, rel_bm25  : bool (Q x K), dokumen di rank tsb pseudo-relevant
+        rrf_tfidf, rrf_bm25  : float (Q x K), RRF score dokumen di rank tsb
+        n_relevant           : int (Q,), jumlah dokumen pseudo-relevant
+        same                 : bool (Q x K x K), tfidf[q, i] == bm25[q, j]
+    """
+    n_ranks = tfidf.shape[1]
+    weights = 1.0 / (RRF_K + np.arange(1, n_ranks + 1))
+
+    valid_t = tfidf >= 0
+    valid_b = bm25 >= 0
+    same = (tfidf[:, :, None] == bm25[:, None, :]) & valid_t[:, :, None] & valid_b[:, None, :]
+
+    # RRF = 1/(k + rank_tfidf) + 1/(k + rank_bm25) (0 kalau tidak ada di ranking tsb)
+    rrf_t = np.where(valid_t, weights + (same * weights[None, None, :]).sum(axis=2), 0.0)
+    rrf_b = np.where(valid_b, weights + (same * weights[None, :, None]).sum(axis=1), 0.0)
+
+    # Kandidat unik: semua dokumen TF-IDF, lalu dokumen yang hanya ada di BM25.
+    # Sort stabil → tie dipecah dengan urutan kemunculan (sama seperti dict RRF)
+    candidates = np.concatenate([tfidf, bm25], axis=1)
+    candidate_scores = np.concatenate([
+        np.where(valid_t, rrf_t, -np.inf),
+        np.where(valid_b & ~same.any(axis=1), rrf_b, -np.inf),
+    ], axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")[:, :PSEUDO_RELEVANT_TOP]
+    top_codes = np.take_along_axis(candidates, order, axis=1)
+    top_valid = np.isfinite(np.take_along_axis(candidate_scores, order, axis=1))
+    relevant = np.where(top_valid, top_codes, -2)
+
+    rel_t = (tfidf[:, :, None] == relevant[:, None, :]).any(axis=2) & valid_t
+    rel_b = (bm25[:, :, None] == relevant[:, None, :]).any(axis=2) & valid_b
+    return rel_t, rel_b, rrf_t, rrf_b, top_valid.sum(axis=1), same
+
+def _safe_div(num, den):
+    den = np.asarray(den, dtype=float)
+    return np.divide(num, den, out=np.zeros(np.broadcast(num, den).shape), where=den > 0)
+
+def ranking_metrics(rel, rrf, n_relevant, top_k):
+    """P/R/F1 @5 dan @10, AP, dan DCG (gain = RRF x 10) untuk matrix relevansi (Q x K)"""
+    rel = rel.astype(float)
+    ranks = np.arange(1, rel.shape[1] + 1)
+
+    hits_5 = rel[:, :5].sum(axis=1)
+    hits_10 = rel[:, :10].sum(axis=1)
+
+    precision_5 = hits_5 / 5
+    precision_10 = hits_10 / 10 if top_k >= 10 else np.zeros(len(rel))
+    recall_5 = _safe_div(hits_5, n_relevant)
+    recall_10 = _safe_div(hits_10, n_relevant)
+    f1_5 = _safe_div(2 * precision_5 * recall_5, precision_5 + recall_5)
+    f1_10 = _safe_div(2 * precision_10 * recall_10, precision_10 + recall_10)
+
+    # AP: precision di setiap posisi dokumen relevan, dibagi jumlah dokumen relevan
+    precision_at_hits = rel * np.cumsum(rel, axis=1) / ranks
+    average_precision = _safe_div(precision_at_hits.sum(axis=1), n_relevant)
+
+    dcg = (rel[:, :10] * rrf[:, :10] * 10 / (ranks[:10] + 1)).sum(axis=1)
+
+    return {
+        "map": average_precision,
+        "precision@5": precision_5,
+        "recall@5": recall_5,
+        "f1@5": f1_5,
+        "precision@10": precision_10,
+        "recall@10": recall_10,
+        "f1@10": f1_10,
+        "dcg": dcg,
+    }
+
+def pick_winner(tfidf_metrics, bm25_metrics):
+    """Winner per query: MAP, kalau selisih MAP < 0.01 pakai DCG"""
+    map_t, map_b = tfidf_metrics["map"], bm25_metrics["map"]
+    dcg_t, dcg_b = tfidf_metrics["dcg"], bm25_metrics["dcg"]
+    by_dcg = np.where(np.abs(dcg_t - dcg_b) < 0.01, "Tie", np.where(dcg_t > dcg_b, "TF-IDF", "BM25"))
+    by_map = np.where(map_t > map_b, "TF-IDF", "BM25")
+    return np.where(np.abs(map_t - map_b) < 0.01, by_dcg, by_map)
+
+# ===================== EVALUATION =====================
+
+def _algorithm_report(label, metrics, q):
+    report = {"algorithm": label}
+    for name in METRIC_NAMES:
+        report[name] = round(float(metrics[name][q]), 4)
+    return report
+
+def evaluate_queries(queries, top_k=10, endpoint="/api/evaluate"):
+    """
+    Evaluasi TF-IDF vs BM25 untuk banyak query sekaligus.
+    Return (per_query, summary); format per_query sama dengan evaluasi satu query.
+    """
+    runs = {}
+    for algorithm in ALGORITHMS:
+        with STAGE_LATENCY.time(endpoint=endpoint, algorithm=algorithm, stage="retrieval"):
+            runs[algorithm] = retrieve(algorithm, queries, top_k)
+
+    start = time.perf_counter()
+    n_ranks = max([10] + [len(run) for run in runs["tfidf"] + runs["bm25"]])
+    tfidf, bm25 = encode_runs(runs["tfidf"], runs["bm25"], n_ranks)
+    rel_t, rel_b, rrf_t, rrf_b, n_relevant, same = pseudo_relevance(tfidf, bm25)
+
+    tfidf_metrics = ranking_metrics(rel_t, rrf_t, n_relevant, top_k)
+    bm25_metrics = ranking_metrics(rel_b, rrf_b, n_relevant, top_k)
+    winners = pick_winner(tfidf_metrics, bm25_metrics)
+    overlap_top5 = same[:, :5, :5].any(axis=2).sum(axis=1)
+
+    per_query = []
+    for q, query in enumerate(queries):
+        per_query.append({
+            "query": query,
+            "tfidf": _algorithm_report("TF-IDF", tfidf_metrics, q),
+            "bm25": _algorithm_report("BM25", bm25_metrics, q),
+            "comparison": {
+                "winner_map": str(winners[q]),
+                "map_difference": abs(round(float(tfidf_metrics["map"][q] - bm25_metrics["map"][q]), 4)),
+                "pseudo_relevant_docs": int(n_relevant[q]),
+                "overlap_top5": int(overlap_top5[q]),
+                "ranking_similarity": round(int(overlap_top5[q]) / 5 * 100, 2)
+            }
+        })
+
+    summary = {
+        "tfidf": {name: round(float(tfidf_metrics[name].mean()), 4) for name in METRIC_NAMES},
+        "bm25": {name: round(float(bm25_metrics[name].mean()), 4) for name in METRIC_NAMES},
+        "wins": {label: int((winners == label).sum()) for label in ["TF-IDF", "BM25", "Tie"]},
+        "avg_overlap_top5": round(float(overlap_top5.mean()), 2),
+    }
+    STAGE_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint, algorithm="", stage="metrics")
+
+    return per_query, summary
@@ -0,0 +1,158 @@
+"""
+Image variants untuk /api/image-proxy
+Resize + transcode (WebP/JPEG) di worker pool, hasilnya di-cache di disk
+"""
+
+import os
+import io
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from config import (
+    IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_AGE, IMAGE_MAX_DIMENSION,
+    IMAGE_FORMATS, IMAGE_QUALITY, IMAGE_WORKERS
+)
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    PIL_AVAILABLE = False
+    print("[WARN] Pillow belum terinstall, image proxy hanya passthrough. Jalankan: pip install Pillow")
+
+logger = logging.getLogger(__name__)
+
+MIMETYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# Pillow melepas GIL saat decode/resize/encode, jadi thread pool cukup
+_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image-variant")
+
+
+class VariantSpec(NamedTuple):
+    width: Optional[int]
+    height: Optional[int]
+    format: str
+
+    @property
+    def mimetype(self):
+        return MIMETYPES[self.format]
+
+
+# ===================== PARAMETER PARSING =====================
+
+def _parse_dimension(value, name):
+    if value is None or value == "":
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be an integer")
+    if value < 1 or value > IMAGE_MAX_DIMENSION:
+        raise ValueError(f"'{name}' must be between 1 and {IMAGE_MAX_DIMENSION}")
+    return value
+
+
+def parse_variant_spec(args, accept=""):
+    """
+    Baca parameter w/h/format dari query string.
+    Return None kalau tidak ada yang diminta (passthrough original).
+    Raise ValueError kalau parameter tidak valid.
+
+    format=auto → webp kalau browser mengirim 'image/webp' di header Accept
+    """
+    width = _parse_dimension(args.get("w"), "w")
+    height = _parse_dimension(args.get("h"), "h")
+    fmt = (args.get("format") or "").lower()
+
+    if width is None and height is None and not fmt:
+        return None
+
+    if fmt in ("", "auto"):
+        fmt = "webp" if "image/webp" in (accept or "") else "jpeg"
+    elif fmt == "jpg":
+        fmt = "jpeg"
+
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(IMAGE_FORMATS + ['auto'])}")
+
+    return VariantSpec(width, height, fmt)
+
+
+def variant_headers(cache_status):
+    """Header response untuk thumbnail hasil resize/transcode"""
+    return {
+        'Cache-Control': f'public, max-age={IMAGE_CACHE_MAX_AGE}',
+        'Access-Control-Allow-Origin': '*',
+        'X-Image-Cache': cache_status,
+        'Vary': 'Accept'
+    }
+
+
+# ===================== DISK CACHE =====================
+
+def variant_path(url, spec):
+    """Path cache untuk kombinasi (url, w, h, format, quality)"""
+    key = f"{url}|{spec.width}|{spec.height}|{spec.format}|{IMAGE_QUALITY.get(spec.format)}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(IMAGE_CACHE_DIR, digest[:2], f"{digest}.{spec.format}")
+
+
+def load_variant(url, spec):
+    """Ambil varian dari cache disk, None kalau belum ada"""
+    path = variant_path(url, spec)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def store_variant(url, spec, data):
+    """Simpan varian secara atomik (tulis ke tmp lalu rename)"""
+    path = variant_path(url, spec)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to cache image variant {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# ===================== RESIZE + TRANSCODE =====================
+
+def render_variant(raw, spec):
+    """
+    Resize (fit di dalam w x h, aspect ratio dijaga, tidak pernah upscale)
+    lalu encode ke format tujuan. Dipanggil di dalam worker pool.
+    """
+    image = Image.open(io.BytesIO(raw))
+
+    target = (spec.width or IMAGE_MAX_DIMENSION, spec.height or IMAGE_MAX_DIMENSION)
+    # JPEG bisa di-decode langsung di skala 1/2, 1/4, 1/8 → jauh lebih murah
+    image.draft("RGB", target)
+    image.thumbnail(target, Image.LANCZOS)
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if spec.format == "jpeg" or not has_alpha:
+        image = image.convert("RGB")
+    else:
+        image = image.convert("RGBA")
+
+    out = io.BytesIO()
+    if spec.format == "webp":
+        image.save(out, "WEBP", quality=IMAGE_QUALITY["webp"], method=4)
+    else:
+        image.save(out, "JPEG", quality=IMAGE_QUALITY["jpeg"], optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def submit_render(raw, spec):
+    """Jadwalkan render_variant di worker pool, return Future"""
+    return _executor.submit(render_variant, raw, spec)
@@ -0,0 +1,253 @@
+"""
+Load test untuk Search API (replay query log)
+
+- Sumber query: query log (text satu query per baris, diputar apa adanya)
+  atau queries_example.json yang diperbanyak dengan distribusi Zipf
+  (query peringkat r muncul ~ 1 / r^s)
+- Request dikirim ke /api/search, /api/search/compare dan /api/evaluate
+  sesuai --mix, dengan --concurrency client paralel (closed loop)
+- Report JSON: QPS, latency p50/p95/p99, error rate per endpoint
+
+Run (server sudah jalan, misal python app.py / python serve.py):
+    cd backend
+    python loadtest.py --concurrency 32 --duration 30
+    python loadtest.py --query-log ../data/query_log.txt --requests 5000 --output report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import API_PORT, ROOT_DIR, DEFAULT_LIMIT
+
+DEFAULT_QUERIES_PATH = os.path.join(ROOT_DIR, "implementation", "comparison", "queries_example.json")
+
+ENDPOINTS = {
+    "search": "/api/search",
+    "compare": "/api/search/compare",
+    "evaluate": "/api/evaluate",
+}
+
+# ===================== QUERY SOURCE =====================
+
+def load_queries(path):
+    """Query dari JSON list (string / {"query": ...}) atau text satu query per baris"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            items = json.load(f)
+        else:
+            items = f.read().splitlines()
+
+    queries = []
+    for item in items:
+        query = item.get("query", "") if isinstance(item, dict) else str(item)
+        if query.strip():
+            queries.append(query.strip())
+    return queries
+
+def zipf_workload(queries, n, exponent, rng):
+    """n query dengan popularitas Zipf: urutan di file = peringkat popularitas"""
+    unique = list(dict.fromkeys(queries))
+    weights = [1.0 / (rank ** exponent) for rank in range(1, len(unique) + 1)]
+    return rng.choices(unique, weights=weights, k=n)
+
+def parse_mix(value):
+    """'search=0.7,compare=0.25,evaluate=0.05' → {endpoint: bobot}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}'. Available: {', '.join(ENDPOINTS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for '{name}': {weight!r}")
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("Mix needs at least one positive weight")
+    return mix
+
+def request_body(endpoint, query, rng):
+    if endpoint == "search":
+        return {"query": query, "algorithm": rng.choice(["tfidf", "bm25"]), "limit": DEFAULT_LIMIT}
+    if endpoint == "compare":
+        return {"query": query, "limit": DEFAULT_LIMIT}
+    return {"query": query, "top_k": DEFAULT_LIMIT}
+
+# ===================== RUNNER =====================
+
+async def wait_ready(client, timeout):
+    """Tunggu /api/ready = 200 (warmup selesai)"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/api/ready")).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    return False
+
+async def run_load(base_url, plan, concurrency, duration, timeout):
+    """
+    plan: list (endpoint, body), diputar berulang kalau --duration dipakai.
+    Return list sample (endpoint, status, latency_seconds).
+    """
+    samples = []
+    position = 0
+    stop_at = time.perf_counter() + duration if duration else None
+
+    def next_request():
+        nonlocal position
+        if stop_at is None:
+            if position >= len(plan):
+                return None
+        elif time.perf_counter() >= stop_at:
+            return None
+        item = plan[position % len(plan)]
+        position += 1
+        return item
+
+    async def worker(client):
+        while True:
+            item = next_request()
+            if item is None:
+                return
+            endpoint, body = item
+            start = time.perf_counter()
+            try:
+                response = await client.post(ENDPOINTS[endpoint], json=body)
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            samples.append((endpoint, status, time.perf_counter() - start))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return samples, elapsed
+
+# ===================== REPORT =====================
+
+def summarize(samples, elapsed):
+    """Statistik untuk sekumpulan sample (endpoint, status, latency)"""
+    latencies = np.array([s[2] for s in samples]) * 1000
+    statuses = defaultdict(int)
+    for _, status, _ in samples:
+        statuses[str(status)] += 1
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+
+    summary = {
+        "requests": len(samples),
+        "qps": round(len(samples) / elapsed, 2) if elapsed > 0 else 0,
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0,
+        "status_codes": dict(sorted(statuses.items())),
+    }
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary["latency_ms"] = {
+            "mean": round(float(latencies.mean()), 2),
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "max": round(float(latencies.max()), 2),
+        }
+    return summary
+
+def build_report(samples, elapsed, config):
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+
+    return {
+        "config": config,
+        "duration_seconds": round(elapsed, 2),
+        "overall": summarize(samples, elapsed),
+        "endpoints": {
+            ENDPOINTS[name]: summarize(items, elapsed)
+            for name, items in sorted(by_endpoint.items())
+        },
+    }
+
+# ===================== MAIN =====================
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test Search API dengan replay query log")
+    parser.add_argument("--base-url", default=f"http://127.0.0.1:{API_PORT}")
+    parser.add_argument("--query-log", help="Query log (satu query per baris), diputar apa adanya")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES_PATH,
+                        help="Daftar query yang diperbanyak dengan distribusi Zipf (kalau --query-log tidak dipakai)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Eksponen Zipf")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("search=0.6,compare=0.3,evaluate=0.1"))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="Total request (diabaikan kalau --duration dipakai)")
+    parser.add_argument("--duration", type=float, default=0, help="Durasi test (detik)")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout per request (detik)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-wait-ready", action="store_true", help="Jangan tunggu /api/ready")
+    parser.add_argument("--output", help="Simpan report JSON ke file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.query_log:
+        queries = load_queries(args.query_log)
+        source = {"query_log": args.query_log}
+    else:
+        queries = zipf_workload(load_queries(args.queries), args.requests, args.zipf, rng)
+        source = {"queries": args.queries, "zipf": args.zipf}
+    if not queries:
+        print("[ERROR] No queries to replay")
+        sys.exit(1)
+
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    plan = []
+    for query in queries:
+        endpoint = rng.choices(names, weights=weights)[0]
+        plan.append((endpoint, request_body(endpoint, query, rng)))
+
+    async def run():
+        if not args.no_wait_ready:
+            async with httpx.AsyncClient(base_url=args.base_url, timeout=5) as client:
+                if not await wait_ready(client, args.timeout):
+                    print(f"[ERROR] {args.base_url}/api/ready is not 200 (server belum jalan?)")
+                    sys.exit(1)
+        return await run_load(args.base_url, plan, args.concurrency, args.duration, args.timeout)
+
+    print(f"Replaying {len(plan)} requests against {args.base_url} with concurrency {args.concurrency}...",
+          file=sys.stderr)
+    samples, elapsed = asyncio.run(run())
+
+    report = build_report(samples, elapsed, {
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "unique_queries": len(set(queries)),
+        "seed": args.seed,
+        **source,
+    })
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Report saved to {args.output}", file=sys.stderr)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Metrics untuk Search API (format text Prometheus di /api/metrics)
+
+- Histogram latency per request dan per tahap pencarian
+  (query_analysis, index_fetch, scoring, topk, doc_fetch, serialization)
+- Counter hit/miss cache
+- Gauge request yang sedang diproses (in-flight)
+- Admission control: slot aktif, antrian, dan request yang ditolak (503)
+- Request yang digabung oleh single-flight
+
+Catatan: metric disimpan per proses. Dengan serve.py (multi-worker),
+setiap scrape hanya melihat worker yang kebetulan melayani request tsb.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from config import METRICS_BUCKETS
+
+# ===================== METRIC TYPES =====================
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track(self, **labels):
+        """Naikkan gauge selama blok berjalan (untuk in-flight request)"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=METRICS_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+REGISTRY = []
+
+def render_prometheus():
+    """Semua metric dalam text exposition format Prometheus 0.0.4"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ===================== SEARCH API METRICS =====================
+
+REQUEST_LATENCY = Histogram(
+    "search_api_request_duration_seconds",
+    "End-to-end request latency",
+    ["endpoint", "status"],
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "search_api_requests_in_flight",
+    "Requests currently being processed",
+    ["endpoint"],
+)
+
+STAGE_LATENCY = Histogram(
+    "search_api_stage_duration_seconds",
+    "Latency per processing stage",
+    ["endpoint", "algorithm", "stage"],
+)
+
+CACHE_REQUESTS = Counter(
+    "search_api_cache_requests_total",
+    "Cache lookups by result (hit/miss)",
+    ["cache", "result"],
+)
+
+ADMISSION_ACTIVE = Gauge(
+    "search_api_admission_active",
+    "Searches currently holding an admission slot",
+    ["controller"],
+)
+
+ADMISSION_QUEUED = Gauge(
+    "search_api_admission_queued",
+    "Requests waiting for an admission slot",
+    ["controller"],
+)
+
+ADMISSION_REJECTED = Counter(
+    "search_api_admission_rejected_total",
+    "Requests rejected with 503 by admission control",
+    ["endpoint", "reason"],
+)
+
+COALESCED_REQUESTS = Counter(
+    "search_api_coalesced_requests_total",
+    "Requests served by sharing an identical in-flight search (single-flight)",
+    ["endpoint"],
+)
+
+def observe_stages(endpoint, algorithm, timings):
+    """Catat dict {stage: seconds} dari search_tfidf/search_bm25"""
+    for stage, seconds in timings.items():
+        STAGE_LATENCY.observe(seconds, endpoint=endpoint, algorithm=algorithm, stage=stage)
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
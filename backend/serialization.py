@@ -0,0 +1,138 @@
+"""
+Serialisasi response JSON untuk Search API
+- Serializer pluggable (orjson kalau tersedia, fallback ke json stdlib)
+- Kompresi gzip / brotli berdasarkan header Accept-Encoding
+- Proyeksi field hasil pencarian (fields=title,url,score)
+"""
+
+import gzip
+import json
+
+from config import SERIALIZER, COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ===================== SERIALIZERS =====================
+
+def _default(obj):
+    """Fallback untuk tipe numpy/pandas yang lolos ke payload"""
+    if hasattr(obj, "item"):
+        return obj.item()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps_json(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+def _dumps_orjson(payload):
+    return orjson.dumps(
+        payload,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+SERIALIZERS = {"json": _dumps_json}
+if orjson is not None:
+    SERIALIZERS["orjson"] = _dumps_orjson
+
+def get_serializer(name=SERIALIZER):
+    """'auto' → serializer tercepat yang terinstall"""
+    if name == "auto":
+        name = "orjson" if "orjson" in SERIALIZERS else "json"
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer '{name}'. Available: {', '.join(SERIALIZERS)}")
+    return SERIALIZERS[name]
+
+dumps = get_serializer()
+
+# ===================== COMPRESSION =====================
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pilih encoding terbaik dari header Accept-Encoding (hormati q=0).
+    Prioritas: br (kalau brotli terinstall) → gzip → identity
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        token, *params = part.split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        # q bisa di posisi parameter mana saja, nama case-insensitive ("br;level=5;Q=0")
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        accepted[token] = q
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    for encoding in candidates:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_LEVEL["br"])
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=COMPRESSION_LEVEL["gzip"])
+    return body
+
+# ===================== FIELD PROJECTION =====================
+
+def parse_fields(value):
+    """'title,url,score' atau ['title', 'url'] → set field, None = semua field"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    fields = {str(f).strip() for f in value if str(f).strip()}
+    return fields or None
+
+def project_results(payload, fields):
+    """Sisakan hanya field yang diminta di setiap list 'results' dalam payload"""
+    if not fields or not isinstance(payload, dict):
+        return payload
+
+    projected = dict(payload)
+    for key, value in payload.items():
+        if key == "results" and isinstance(value, list):
+            projected[key] = [
+                {k: v for k, v in item.items() if k in fields}
+                for item in value
+            ]
+        elif isinstance(value, dict):
+            projected[key] = project_results(value, fields)
+    return projected
+
+# ===================== RESPONSE BODY =====================
+
+def encode_payload(payload, accept_encoding="", fields=None):
+    """
+    Serialisasi + kompresi payload.
+    Return (body_bytes, headers) untuk dipakai Flask maupun ASGI response.
+    """
+    body = dumps(project_results(payload, fields))
+    headers = {"Vary": "Accept-Encoding"}
+
+    if len(body) >= COMPRESSION_MIN_SIZE:
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+
+    return body, headers
@@ -0,0 +1,176 @@
+"""
+Production server (pre-fork) untuk Search API
+
+- Master menjalankan warmup (warmup.py: load index TF-IDF + BM25, sentuh
+  page, replay top query) SEBELUM fork, jadi semua worker berbagi satu
+  salinan memory index (copy-on-write) dan langsung ready
+- gc.freeze() setelah warmup: object index dipindah ke generasi permanen,
+  GC tidak lagi menulis ke header object tersebut sehingga page tetap shared
+- Memory per worker (RSS / PSS / shared / private) di-log setelah worker siap
+
+Run:
+    cd backend
+    python serve.py --workers 4
+    python serve.py --memory-report      # report dari server yang sedang jalan
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from gunicorn.app.base import BaseApplication
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import (
+    API_HOST, API_PORT, SERVER_WORKERS, SERVER_THREADS, SERVER_TIMEOUT,
+    SERVER_PIDFILE, MEMORY_REPORT_INTERVAL, LOG_LEVEL, LOG_FORMAT
+)
+
+logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+logger = logging.getLogger("serve")
+
+# ===================== MEMORY REPORT =====================
+
+def read_memory(pid):
+    """
+    Memory usage satu proses dalam MB (Linux /proc).
+    PSS = bagian proporsional dari page shared → jumlah PSS semua proses
+    adalah total memory fisik yang benar-benar terpakai.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except FileNotFoundError:
+        return None
+
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "pid": pid,
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "shared_mb": round(shared / 1024, 1),
+        "private_mb": round(private / 1024, 1),
+    }
+
+def child_pids(pid):
+    """PID child langsung dari proses (worker gunicorn)"""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except FileNotFoundError:
+        return []
+
+def memory_report(master_pid, worker_pids=None):
+    """Report memory master + semua worker"""
+    if worker_pids is None:
+        worker_pids = child_pids(master_pid)
+
+    master = read_memory(master_pid)
+    workers = [m for m in (read_memory(pid) for pid in sorted(worker_pids)) if m]
+    total_pss = (master["pss_mb"] if master else 0) + sum(w["pss_mb"] for w in workers)
+    total_rss = (master["rss_mb"] if master else 0) + sum(w["rss_mb"] for w in workers)
+
+    return {
+        "master": master,
+        "workers": workers,
+        "total_pss_mb": round(total_pss, 1),
+        # Total RSS menghitung page shared berkali-kali; selisihnya = hemat dari CoW
+        "total_rss_mb": round(total_rss, 1),
+        "avg_private_per_worker_mb": round(
+            sum(w["private_mb"] for w in workers) / len(workers), 1
+        ) if workers else 0,
+    }
+
+def log_memory_report(server):
+    """Thread di master: tunggu semua worker hidup lalu log report secara berkala"""
+    while len(server.WORKERS) < server.num_workers:
+        time.sleep(0.5)
+    # beri waktu worker selesai init sebelum diukur
+    time.sleep(2)
+
+    while True:
+        report = memory_report(os.getpid(), list(server.WORKERS.keys()))
+        logger.info(f"Memory report: {json.dumps(report)}")
+        if MEMORY_REPORT_INTERVAL <= 0:
+            return
+        time.sleep(MEMORY_REPORT_INTERVAL)
+
+# ===================== GUNICORN APPLICATION =====================
+
+class SearchServer(BaseApplication):
+    """Gunicorn app dengan preload: index di-load di master sebelum fork"""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app import app, SEARCH_AVAILABLE
+        from warmup import run_warmup
+
+        if not SEARCH_AVAILABLE:
+            logger.error("Search engines not available. Exiting.")
+            sys.exit(1)
+
+        # Warmup lengkap (index, page, top query) di master → worker langsung ready
+        if not run_warmup():
+            logger.error("Warmup failed. Exiting.")
+            sys.exit(1)
+
+        # Semua object yang hidup sekarang (index) tidak akan di-scan GC lagi
+        gc.collect()
+        gc.freeze()
+        logger.info(f"gc.freeze(): {gc.get_freeze_count()} objects moved to permanent generation")
+        return app
+
+def when_ready(server):
+    threading.Thread(target=log_memory_report, args=(server,), daemon=True).start()
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork production server untuk Search API")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    parser.add_argument("--threads", type=int, default=SERVER_THREADS)
+    parser.add_argument("--bind", default=f"{API_HOST}:{API_PORT}")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Print memory per worker dari server yang sedang jalan lalu keluar")
+    args = parser.parse_args()
+
+    if args.memory_report:
+        if not os.path.exists(SERVER_PIDFILE):
+            print(f"[ERROR] Pidfile not found: {SERVER_PIDFILE} (server belum jalan?)")
+            sys.exit(1)
+        with open(SERVER_PIDFILE) as f:
+            master_pid = int(f.read().strip())
+        print(json.dumps(memory_report(master_pid), indent=2))
+        return
+
+    options = {
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        "timeout": SERVER_TIMEOUT,
+        "preload_app": True,
+        "pidfile": SERVER_PIDFILE,
+        "when_ready": when_ready,
+        "loglevel": LOG_LEVEL.lower(),
+    }
+    SearchServer(options).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Single-flight untuk request search yang identik
+
+Kalau banyak request dengan body yang sama (setelah normalisasi) datang
+bersamaan, hanya request pertama yang menjalankan search. Request lain
+menunggu dan memakai hasil yang sama, jadi lonjakan traffic untuk satu
+query hanya dibayar satu kali scoring.
+
+Bisa dipakai dari thread (Flask) maupun event loop (ASGI).
+"""
+
+import asyncio
+import json
+import threading
+
+from metrics import COALESCED_REQUESTS
+
+# Field body yang tidak mempengaruhi hasil handler (hanya proyeksi response)
+IGNORED_FIELDS = {"fields"}
+
+
+def normalize_query(query):
+    """Query setelah lowercase + whitespace dirapikan (sama seperti preprocessing search engine)"""
+    return " ".join(query.lower().split())
+
+
+def request_key(endpoint, data):
+    """
+    Key single-flight untuk body request, None kalau body tidak bisa di-key
+    (request tsb dijalankan sendiri tanpa coalescing)
+    """
+    if not isinstance(data, dict):
+        return None
+
+    normalized = {k: v for k, v in data.items() if k not in IGNORED_FIELDS}
+    query = normalized.get("query")
+    if isinstance(query, str):
+        normalized["query"] = normalize_query(query)
+    algorithm = normalized.get("algorithm")
+    if isinstance(algorithm, str):
+        normalized["algorithm"] = algorithm.lower()
+
+    try:
+        return endpoint + json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def relabel(payload, data):
+    """Payload hasil request lain → pakai teks query milik request ini"""
+    if isinstance(payload, dict) and "query" in payload and isinstance(data.get("query"), str):
+        payload = dict(payload)
+        payload["query"] = data["query"].strip()
+    return payload
+
+
+class _LeaderCancelled(Exception):
+    """Leader single-flight dibatalkan sebelum selesai; follower menjalankan ulang"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Gabungkan eksekusi fn untuk key yang sama selama masih berjalan"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._futures = {}
+
+    def do(self, key, fn, endpoint=""):
+        """Return (result, shared). Exception dari fn diteruskan ke semua penunggu."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            COALESCED_REQUESTS.inc(endpoint=endpoint)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key, fn, endpoint=""):
+        """
+        Versi event loop; fn = coroutine function.
+
+        Kalau leader dibatalkan (client disconnect / timeout), follower tidak ikut
+        batal: follower pertama yang bangun menjalankan fn ulang sebagai leader baru.
+        """
+        coalesced = False
+        while True:
+            future = self._futures.get(key)
+            if future is None:
+                break
+            if not coalesced:
+                COALESCED_REQUESTS.inc(endpoint=endpoint)
+                coalesced = True
+            try:
+                return await asyncio.shield(future), True
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Exception biasa untuk follower (bukan CancelledError), lihat loop di atas
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # tandai sudah diambil, supaya tidak ada warning kalau tidak ada penunggu
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._futures[key]
+        return result, False
+
+
+search_flights = SingleFlight()
@@ -0,0 +1,182 @@
+"""
+Warmup Search API sebelum menerima traffic
+
+1. Load index TF-IDF + BM25 (build kalau pickle belum ada)
+2. Sentuh setiap page memory array index (termasuk yang memory-mapped),
+   supaya page fault tidak terjadi di request pertama
+3. Load analisis query (pipeline preprocessing + stemmer Sastrawi, ~2 detik)
+4. Replay daftar top query (WARMUP_QUERIES_PATH) ke kedua algoritma dan
+   evaluasi, mengisi cache ranking
+
+/api/ready baru 200 setelah warmup selesai; /api/health tetap liveness.
+"""
+
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+
+import numpy as np
+
+from config import DEFAULT_LIMIT, WARMUP_QUERIES_PATH, WARMUP_MAX_QUERIES
+
+logger = logging.getLogger(__name__)
+
+_state = {
+    "status": "pending",  # pending → running → ready / failed
+    "started_at": None,
+    "finished_at": None,
+    "duration": None,
+    "steps": {},
+    "queries_replayed": 0,
+    "error": None,
+}
+_state_lock = threading.Lock()
+
+# ===================== QUERIES =====================
+
+def load_warmup_queries(path=WARMUP_QUERIES_PATH, limit=WARMUP_MAX_QUERIES):
+    """
+    Top query untuk warmup, urutan dipertahankan, duplikat dibuang.
+    Format: JSON list (string atau {"query": ...}) atau text satu query per baris.
+    """
+    if not path or not os.path.exists(path):
+        return []
+
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            items = json.load(f)
+        else:
+            items = f.read().splitlines()
+
+    queries = []
+    for item in items:
+        query = item.get("query", "") if isinstance(item, dict) else str(item)
+        query = query.strip()
+        if query and query not in queries:
+            queries.append(query)
+    return queries[:limit]
+
+# ===================== PAGE TOUCHING =====================
+
+def _arrays(obj):
+    """
+    Semua numpy array di dalam struktur index (array, sparse matrix, tuple,
+    atribut object). File index yang di-mmap (BinaryIndex) di-yield sebagai
+    mmap-nya saja, karena array di dalamnya hanya view ke mmap tsb.
+    """
+    if isinstance(obj, (np.ndarray, mmap.mmap)):
+        yield obj
+    elif isinstance(obj, (tuple, list)):
+        for item in obj:
+            yield from _arrays(item)
+    elif hasattr(obj, "indptr"):  # scipy.sparse CSR/CSC
+        yield obj.data
+        yield obj.indices
+        yield obj.indptr
+    elif hasattr(obj, "__dict__"):
+        values = list(vars(obj).values())
+        mapped = [value for value in values if isinstance(value, mmap.mmap)]
+        for value in mapped or values:
+            if isinstance(value, (np.ndarray, mmap.mmap, tuple, list)) or hasattr(value, "indptr"):
+                yield from _arrays(value)
+
+def touch_pages(obj):
+    """Baca satu byte per page dari setiap array; return total byte yang disentuh"""
+    touched = 0
+    seen = set()
+    for array in _arrays(obj):
+        if id(array) in seen:
+            continue
+        seen.add(id(array))
+        if isinstance(array, mmap.mmap):
+            array = np.frombuffer(array, dtype=np.uint8)
+        if array.size == 0 or array.dtype == object:
+            continue
+        flat = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+        int(flat[::mmap.PAGESIZE].sum())
+        touched += flat.nbytes
+    return touched
+
+def touch_index(*indexes):
+    """touch_pages snapshot yang sedang dibuka setiap index (ditahan selama page disentuh)"""
+    snapshots = [index.acquire() for index in indexes]
+    try:
+        return touch_pages(snapshots)
+    finally:
+        for snapshot in snapshots:
+            snapshot.release()
+
+# ===================== WARMUP =====================
+
+def _step(name, fn):
+    start = time.time()
+    result = fn()
+    with _state_lock:
+        _state["steps"][name] = round(time.time() - start, 4)
+    return result
+
+def replay_queries(queries):
+    """Jalankan setiap query ke TF-IDF, BM25 dan evaluasi (batch)"""
+    from search_tfidf import search_tfidf
+    from search_bm25 import search_bm25
+    from evaluation import evaluate_queries
+
+    for query in queries:
+        search_tfidf(query, top_k=DEFAULT_LIMIT)
+        search_bm25(query, top_k=DEFAULT_LIMIT)
+    if queries:
+        evaluate_queries(queries, top_k=DEFAULT_LIMIT, endpoint="warmup")
+    return len(queries)
+
+def run_warmup(queries=None):
+    """Warmup sinkron; return True kalau berhasil"""
+    with _state_lock:
+        if _state["status"] in ("running", "ready"):
+            return _state["status"] == "ready"
+        _state.update(status="running", started_at=time.time(), error=None, steps={})
+
+    try:
+        from search_tfidf import get_tfidf_index
+        from search_bm25 import get_bm25_index
+        from shared_index import query_terms
+
+        tfidf_index = _step("load_tfidf", get_tfidf_index)
+        bm25_index = _step("load_bm25", get_bm25_index)
+        touched = _step("touch_pages", lambda: touch_index(tfidf_index, bm25_index))
+        _step("load_analyzer", lambda: query_terms(""))
+
+        if queries is None:
+            queries = load_warmup_queries()
+        replayed = _step("replay_queries", lambda: replay_queries(queries))
+
+        with _state_lock:
+            _state.update(status="ready", queries_replayed=replayed)
+        logger.info(f"Warmup done: {touched / 1024 / 1024:.1f} MB touched, {replayed} queries replayed")
+        return True
+
+    except Exception as e:
+        logger.error(f"Warmup failed: {e}")
+        with _state_lock:
+            _state.update(status="failed", error=str(e))
+        return False
+
+    finally:
+        with _state_lock:
+            _state["finished_at"] = time.time()
+            _state["duration"] = round(_state["finished_at"] - _state["started_at"], 4)
+
+def start_background_warmup():
+    """Warmup di thread terpisah, server sudah bisa menjawab /api/health"""
+    thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+def readiness_status():
+    """(payload, status_code) untuk /api/ready"""
+    with _state_lock:
+        payload = dict(_state, steps=dict(_state["steps"]))
+    payload["ready"] = payload["status"] == "ready"
+    return payload, 200 if payload["ready"] else 503
@@ -52,7 +52,8 @@ def json_to_csv(json_file, csv_file):
         'content',
         'main_image',
         'images_count',
-        'content_length'
+        'content_length',
+        'published_at'
     ]
     
     # Tulis ke CSV
@@ -82,7 +83,8 @@ def json_to_csv(json_file, csv_file):
                     'content': content,
                     'main_image': article.get('main_image', ''),
                     'images_count': images_count,
-                    'content_length': content_length
+                    'content_length': content_length,
+                    'published_at': article.get('published_at') or ''
                 }
                 
                 writer.writerow(row)
@@ -14,6 +14,7 @@ def load_articles(path, source_name):
             "id": f"{source_name}_{i}",
             "source": source_name,
             "url": item.get("url", ""),
+            "published_at": item.get("published_at"),  # None kalau crawler tidak menemukan tanggal
             "title": item.get("title", ""),
             "content": item.get("content", ""),
             "images": images,          # simpan semua (opsional)
@@ -640,7 +640,7 @@ function ComparePage() {
                   Konten:
                 </p>
                 <p className="text-sm text-slate-600 leading-relaxed">
-                  {selectedDoc.content}
+                  {selectedDoc.snippet}
                 </p>
               </div>
 
@@ -31,7 +31,10 @@ function SearchPage() {
           headers: {
             "Content-Type": "application/json",
           },
-          body: JSON.stringify({ query: searchQuery }),
+          body: JSON.stringify({
+            query: searchQuery,
+            fields: "doc_id,title,content,url,main_image,source,score",
+          }),
         }),
         new Promise((resolve) => setTimeout(resolve, 2000)),
       ]);
@@ -181,7 +184,7 @@ function SearchPage() {
                               <img
                                 src={`http://localhost:5000/api/image-proxy?url=${encodeURIComponent(
                                   result.main_image
-                                )}`}
+                                )}&h=224&format=auto`}
                                 alt={result.title}
                                 className="w-28 h-28 object-cover bg-slate-100 transition-transform duration-500 group-hover:scale-105"
                                 onError={(e) => {
@@ -202,7 +205,7 @@ function SearchPage() {
                               </span>
                             </div>
                             <p className="text-sm text-slate-600 line-clamp-2 mb-3 leading-relaxed">
-                              {result.content}
+                              {result.snippet}
                             </p>
                             <div className="flex items-center justify-between text-xs mb-2">
                               <span className="text-slate-600 font-medium bg-slate-100 px-2 py-1 rounded">
@@ -274,7 +277,7 @@ function SearchPage() {
                               <img
                                 src={`http://localhost:5000/api/image-proxy?url=${encodeURIComponent(
                                   result.main_image
-                                )}`}
+                                )}&h=224&format=auto`}
                                 alt={result.title}
                                 className="w-28 h-28 object-cover bg-slate-100 transition-transform duration-500 group-hover:scale-105"
                                 onError={(e) => {
@@ -295,7 +298,7 @@ function SearchPage() {
                               </span>
                             </div>
                             <p className="text-sm text-slate-600 line-clamp-2 mb-3 leading-relaxed">
-                              {result.content}
+                              {result.snippet}
                             </p>
                             <div className="flex items-center justify-between text-xs mb-2">
                               <span className="text-slate-600 font-medium bg-slate-100 px-2 py-1 rounded">
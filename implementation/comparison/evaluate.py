@@ -1,6 +1,8 @@
+import argparse
 import os
 import sys
 import json
+import time
 from typing import List, Dict, Callable, Any
 
 # ===================== PERBAIKAN PENTING =====================
@@ -17,6 +19,7 @@ from implementation.search_engine.search_bm25 import search_bm25
 
 RESULT_PATH = os.path.join(os.path.dirname(__file__), "results_tfidf_bm25.json")
 QUERIES_FILE = os.path.join(os.path.dirname(__file__), "queries_example.json")
+LATENCY_REPEAT = 1  # Latency per query = median dari sekian kali pencarian (--latency-repeat)
 
 
 # ===================== METRIK IR =====================
@@ -86,16 +89,29 @@ def evaluate_method(
     queries: List[str],
     ground_truth: Dict[str, List[str]],
     top_k: int = 10,
+    latency_repeat: int = LATENCY_REPEAT,
 ) -> Dict[str, Any]:
 
     print(f"\n=== Evaluasi {name} ===")
     ap_scores = []
     details = []
+    latencies = []
+
+    # Warm-up: load index tidak ikut dihitung di latency
+    if queries:
+        search_fn(queries[0], top_k=top_k)
 
     for q in queries:
         rel = ground_truth.get(q, [])
         results = search_fn(q, top_k=top_k)
 
+        runs = []
+        for _ in range(latency_repeat):
+            start = time.perf_counter()
+            search_fn(q, top_k=top_k)
+            runs.append(time.perf_counter() - start)
+        latencies.append(sorted(runs)[len(runs) // 2])
+
         retrieved_urls = [r.get("url", "") for r in results]
 
         ap = average_precision(retrieved_urls, rel)
@@ -119,36 +135,50 @@ def evaluate_method(
         print(f"  AP={ap:.4f}, P@5={p5:.4f}, P@10={p10:.4f}")
 
     map_score = sum(ap_scores) / len(ap_scores) if ap_scores else 0.0
+    p5_score = sum(d["P@5"] for d in details) / len(details) if details else 0.0
+    p10_score = sum(d["P@10"] for d in details) / len(details) if details else 0.0
+    latency_ms = 1000 * sum(latencies) / len(latencies) if latencies else 0.0
 
-    print(f"\nMAP {name}: {map_score:.4f}")
+    print(f"\nMAP {name}: {map_score:.4f}, P@10: {p10_score:.4f}, latency: {latency_ms:.2f} ms/query")
 
     return {
         "method": name,
         "MAP": map_score,
+        "P@5": p5_score,
+        "P@10": p10_score,
+        "latency_ms": latency_ms,
         "per_query": details,
     }
 
 
 # ===================== MAIN =====================
 
-def main():
+def main(output_path: str = RESULT_PATH, latency_repeat: int = LATENCY_REPEAT):
     queries, ground_truth = load_queries_and_ground_truth()
 
     print(f"Queries to evaluate: {len(queries)}")
 
-    tfidf_result = evaluate_method("TF-IDF", search_tfidf, queries, ground_truth)
-    bm25_result = evaluate_method("BM25", search_bm25, queries, ground_truth)
+    tfidf_result = evaluate_method("TF-IDF", search_tfidf, queries, ground_truth, latency_repeat=latency_repeat)
+    bm25_result = evaluate_method("BM25", search_bm25, queries, ground_truth, latency_repeat=latency_repeat)
 
     all_results = {
         "TF-IDF": tfidf_result,
         "BM25": bm25_result,
     }
 
-    with open(RESULT_PATH, "w", encoding="utf-8") as f:
+    with open(output_path, "w", encoding="utf-8") as f:
         json.dump(all_results, f, ensure_ascii=False, indent=2)
 
-    print(f"\nDetail disimpan di: {RESULT_PATH}")
+    print(f"\nDetail disimpan di: {output_path}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Evaluasi TF-IDF vs BM25 (MAP, P@5, P@10)")
+    parser.add_argument("--output", default=RESULT_PATH,
+                        help="File JSON hasil evaluasi (default: results_tfidf_bm25.json)")
+    parser.add_argument("--latency-repeat", type=int, default=LATENCY_REPEAT,
+                        help="Pencarian per query untuk median latency (default: 1)")
+    args = parser.parse_args()
+    if args.latency_repeat < 1:
+        parser.error("--latency-repeat harus >= 1")
+    main(args.output, args.latency_repeat)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from search_tfidf import search_tfidf
-from search_bm25 import search_bm25, BM25Okapi
+from search_bm25 import search_bm25
 
 
 def print_results(label, results, max_len_title=80):
@@ -20,13 +20,6 @@ if __name__ == "__main__":
     print("=== Demo CLI: Perbandingan TF-IDF vs BM25 ===")
     print("Ketik 'exit' untuk keluar.\n")
 
-    # cek BM25 terinstall
-    if BM25Okapi is None:
-        print("Peringatan: BM25 (rank_bm25) belum terinstall. Jalankan: pip install rank-bm25")
-        use_bm25 = False
-    else:
-        use_bm25 = True
-
     while True:
         q = input("\nQuery: ").strip()
         if q.lower() == "exit":
@@ -35,6 +28,5 @@ if __name__ == "__main__":
         tfidf_res = search_tfidf(q, top_k=5)
         print_results("TF-IDF", tfidf_res)
 
-        if use_bm25:
-            bm25_res = search_bm25(q, top_k=5)
-            print_results("BM25", bm25_res) 
\ No newline at end of file
+        bm25_res = search_bm25(q, top_k=5)
+        print_results("BM25", bm25_res) 
\ No newline at end of file
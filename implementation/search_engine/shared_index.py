@@ -0,0 +1,98 @@
+"""
+Index canonical hasil indexing/ yang dipakai bersama oleh search_tfidf dan search_bm25.
+
+Tidak ada index terpisah per algoritma: kedua scorer membaca postings yang
+sama (data/index/inverted_index.bin + segment incremental + tombstone, lewat
+indexing/utils/segments.py), jadi tokenisasi dan indexing hanya terjadi sekali
+di run_all_steps.py / update_index.py, dan memory proses hanya berisi satu
+set postings (mmap). Metadata hasil (title, url, main_image, source,
+published_at) dan snippet (dari content asli, dibuat saat build) diambil dari
+document index.
+"""
+import os
+import sys
+import threading
+from typing import List, Dict, Any, Tuple
+
+# path relatif dari file ini ke root repo
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+INDEXING_DIR = os.path.join(ROOT_DIR, "indexing")
+INVERTED_INDEX_PATH = os.path.join(ROOT_DIR, "data", "index", "inverted_index.bin")
+
+# Package indexing memakai nama top-level config / utils / steps (bentrok dengan
+# backend/config.py), jadi module dengan nama itu disingkirkan selama import
+_INDEXING_PACKAGES = ("config", "utils", "steps")
+
+
+def _is_indexing_module(name: str) -> bool:
+    return name.split(".")[0] in _INDEXING_PACKAGES
+
+
+def _import_segments():
+    """indexing/utils/segments.py tanpa menimpa module config/utils milik proses"""
+    saved = {name: sys.modules.pop(name) for name in list(sys.modules) if _is_indexing_module(name)}
+    sys.path.insert(0, INDEXING_DIR)
+    try:
+        from utils import segments
+    finally:
+        sys.path.remove(INDEXING_DIR)
+        for name in [name for name in sys.modules if _is_indexing_module(name)]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+    return segments
+
+
+# Index di-cache per proses: dibuka sekali, di-reload otomatis kalau manifest segment berubah
+_segments = None
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """SegmentedIndex milik proses ini (satu instance untuk TF-IDF dan BM25)."""
+    global _segments, _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if not os.path.exists(INVERTED_INDEX_PATH):
+                    raise FileNotFoundError(
+                        f"Index tidak ditemukan: {INVERTED_INDEX_PATH}. "
+                        "Jalankan dulu: python indexing/run_all_steps.py"
+                    )
+                _segments = _import_segments()
+                _index = _segments.SegmentedIndex()
+                print(f"[INDEX] Loaded {_index.n_docs} documents from {len(_index.segments)} segment(s)")
+    _index.refresh()
+    return _index
+
+
+def get_index_version() -> str:
+    """Versi index yang sedang dibuka (base + manifest segment), untuk kunci cache."""
+    return get_index().version
+
+
+def query_terms(query: str) -> List[str]:
+    """Analisis query yang sama dengan dokumen di index (step 1-4 preprocessing + bigram)."""
+    get_index()
+    return _segments.query_terms(query)
+
+
+def build_results(snapshot, ranked: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+    """Susun list hasil (rank, score, metadata) dari list (doc_id, score) milik `snapshot`."""
+    results = []
+    for rank, (doc_id, score) in enumerate(ranked, start=1):
+        document = snapshot.document(doc_id) or {}
+        results.append(
+            {
+                "rank": rank,
+                "score": score,
+                "title": document.get("title") or "",
+                "url": document.get("url") or "",
+                "snippet": document.get("snippet") or "",
+                "main_image": document.get("main_image") or "",
+                "source": document.get("source") or "",
+                "published_at": document.get("published_at"),
+                "doc_id": doc_id,
+            }
+        )
+    return results
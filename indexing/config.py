@@ -11,35 +11,84 @@ INDEX_DIR = os.path.join(DATA_DIR, "index")  # Folder khusus untuk index results
 # Input file (hasil preprocessing)
 INPUT_FILE = os.path.join(DATA_DIR, "merge-all-clean.csv")
 
+# Pipeline preprocessing (step 1-4 juga dijalankan untuk query, utils/text_processor.py)
+PREPROCESSING_DIR = os.path.join(BASE_DIR, "..", "preprocessing")
+
 # Output files untuk setiap step
-INVERTED_INDEX_FILE = os.path.join(INDEX_DIR, "inverted_index.json")
+INVERTED_INDEX_FILE = os.path.join(INDEX_DIR, "inverted_index.bin")  # Binary (vbyte postings, mmap)
+INVERTED_INDEX_JSON_FILE = os.path.join(INDEX_DIR, "inverted_index.json")  # Export JSON (opsional)
 DOCUMENT_INDEX_FILE = os.path.join(INDEX_DIR, "document_index.json")
-TFIDF_MATRIX_FILE = os.path.join(INDEX_DIR, "tfidf_matrix.pkl")
-VOCABULARY_FILE = os.path.join(INDEX_DIR, "vocabulary.json")
+TFIDF_MATRIX_FILE = os.path.join(INDEX_DIR, "tfidf_matrix.npz")  # CSR sparse arrays
+VOCABULARY_FILE = os.path.join(INDEX_DIR, "vocabulary.bin")  # Front-coded term dictionary
 INDEX_STATS_FILE = os.path.join(INDEX_DIR, "index_stats.json")
 
+# Build cache: fingerprint input/config/code build terakhir (run_all_steps.py)
+BUILD_MANIFEST_FILE = os.path.join(INDEX_DIR, "build_manifest.json")
+
+# Profiling (run_all_steps.py --profile): report JSON + dump cProfile per step
+PROFILE_DIR = os.path.join(DATA_DIR, "profile")
+
+# Static pruning (prune_index.py): backup index lengkap, hasil evaluate.py dan report
+PRUNING_DIR = os.path.join(DATA_DIR, "pruning")
+
+# Segment store (incremental indexing artikel baru)
+SEGMENTS_DIR = os.path.join(INDEX_DIR, "segments")
+SEGMENT_MANIFEST_FILE = os.path.join(SEGMENTS_DIR, "manifest.json")
+
 # ===================== INDEXING PARAMETERS =====================
 # Kolom yang akan diindex
 TEXT_COLUMN = "text_combined"  # Kolom hasil preprocessing yang sudah digabung
 
 # Metadata columns
-METADATA_COLUMNS = ["id", "source", "url", "title", "main_image", "word_count", "char_count"]
+METADATA_COLUMNS = ["id", "source", "url", "title", "main_image", "published_at", "word_count", "char_count"]
+
+# Snippet hasil pencarian: dari content asli (sebelum preprocessing), bukan text yang sudah di-stem
+SNIPPET_COLUMN = "content_original"
+SNIPPET_LENGTH = 250  # Karakter maksimum, dipotong di batas kata
 
 # TF-IDF Parameters
 MIN_DF = 1  # Minimum document frequency (kata muncul minimal di berapa dokumen)
 MAX_DF = 0.95  # Maximum document frequency (ignore kata yang terlalu umum)
 USE_IDF = True  # Gunakan IDF weighting
 SMOOTH_IDF = True  # Smooth IDF weights
-SUBLINEAR_TF = True  # Use sublinear TF scaling (1 + log(tf))
+SUBLINEAR_TF = False  # Use sublinear TF scaling (1 + log(tf)); False = raw TF (MAP TF-IDF lebih baik di evaluate.py)
+INDEX_BIGRAMS = True  # Bigram kata ("a b") ikut jadi term index dan query (TF-IDF dan BM25)
 
 # Index options
 SAVE_RAW_COUNTS = True  # Simpan raw term frequency
 CALCULATE_TFIDF = True  # Hitung TF-IDF weights
 BUILD_INVERTED_INDEX = True  # Build inverted index
+SAVE_JSON_INDEX = False  # Tulis juga inverted_index.json (untuk debugging, ~10x lebih besar)
+
+# Segment merge policy (tiered)
+MERGE_FACTOR = 4  # Tier penuh kalau berisi >= MERGE_FACTOR segment → digabung
+SEGMENT_TIER_DOCS = 50  # Ukuran tier 0 (dokumen); tier n = SEGMENT_TIER_DOCS * MERGE_FACTOR^n
+MERGE_INTERVAL = 30  # Detik antar pengecekan background merger
+COMPACT_TOMBSTONE_RATIO = 0.2  # Segment di-compact kalau >= 20% dokumennya dihapus
+
+# Source shards: satu segment per source (bolanet, kompas, ...) dengan statistik global
+SHARD_BY_SOURCE = False  # run_all_steps.py: build shard per source setelah full build
+QUERY_WORKERS = os.cpu_count() or 1  # Thread scatter-gather query lintas segment / shard
+PARALLEL_MIN_QUERY_DOCS = 20000  # Di bawah ini segment di-query serial (overhead thread > hasil)
+
+# BM25 (query lintas segment)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Static index pruning (prune_index.py)
+PRUNE_METHOD = "document"  # "document" (per dokumen, Büttcher & Clarke) atau "term" (per term, Carmel et al.)
+PRUNE_RATIO = 0.3  # Fraksi postings per term / per dokumen yang dibuang (impact BM25 terendah)
+PRUNE_KEEP_TOP = 10  # Term-centric: postings teratas setiap term yang selalu disimpan (= top-k hasil)
+PRUNE_MIN_SIZE_REDUCTION = 0.05  # Warning kalau file index mengecil kurang dari ini
+PRUNE_LATENCY_REPEAT = 20  # evaluate.py --latency-repeat: selisih latency sebelum / sesudah perlu median
 
 # Performance
 VERBOSE = True  # Show progress
-BATCH_SIZE = 100  # Untuk processing dalam batch
+BATCH_SIZE = 100  # Dokumen per chunk saat streaming build (pd.read_csv chunksize)
+SPILL_POSTINGS = 1_000_000  # Streaming build: postings di memory sebelum di-spill ke run file
+STREAMING_MIN_FILE_SIZE = 256 * 1024 * 1024  # CSV >= ini (byte) otomatis di-index streaming
+INDEX_WORKERS = os.cpu_count() or 1  # Process untuk build index per shard
+PARALLEL_MIN_DOCUMENTS = 2000  # Di bawah ini build serial (overhead pool > hasil)
 
 # ===================== CREATE INDEX DIRECTORY =====================
 os.makedirs(INDEX_DIR, exist_ok=True)
@@ -0,0 +1,171 @@
+"""
+Static index pruning: buang postings ber-impact rendah dari inverted_index.bin
+
+Dijalankan setelah run_all_steps.py. Postings dibuang per term (term-centric)
+atau per dokumen (document-centric) berdasarkan kontribusi skor BM25-nya
+(utils/pruning.py); df koleksi dan norms dokumen tidak berubah. Sebelum dan
+sesudah pruning implementation/comparison/evaluate.py dijalankan otomatis,
+lalu selisih MAP / P@10, ukuran index dan latency query ditulis ke
+PRUNING_DIR/pruning_report.json.
+
+Index lengkap di-backup ke PRUNING_DIR; full build berikutnya (run_all_steps.py)
+menulis ulang index lengkap.
+
+Usage:
+    python prune_index.py                                # PRUNE_METHOD / PRUNE_RATIO dari config
+    python prune_index.py --method document --ratio 0.5
+    python prune_index.py --dry-run                      # hanya report, index lengkap dikembalikan
+    python prune_index.py --restore                      # kembalikan index lengkap dari backup
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import (
+    BASE_DIR, INVERTED_INDEX_FILE, PRUNING_DIR, PRUNE_METHOD, PRUNE_RATIO, PRUNE_KEEP_TOP,
+    PRUNE_MIN_SIZE_REDUCTION, PRUNE_LATENCY_REPEAT
+)
+from utils.binary_index import BinaryIndex, write_pruned_index
+from utils.pruning import PRUNE_METHODS, pruned_postings, pruning_summary
+from utils.segments import BASE_SEGMENT, publish_base, read_manifest
+
+EVALUATE_SCRIPT = os.path.join(BASE_DIR, "..", "implementation", "comparison", "evaluate.py")
+FULL_INDEX_BACKUP = os.path.join(PRUNING_DIR, "inverted_index.full.bin")
+PRUNING_REPORT_FILE = os.path.join(PRUNING_DIR, "pruning_report.json")
+
+
+def run_evaluation(label):
+    """Jalankan evaluate.py di process terpisah (index dibuka ulang), return hasilnya"""
+    output = os.path.join(PRUNING_DIR, f"evaluate_{label}.json")
+    print(f"\n📏 Evaluating {label} index...")
+    subprocess.run([sys.executable, EVALUATE_SCRIPT, "--output", output,
+                    "--latency-repeat", str(PRUNE_LATENCY_REPEAT)],
+                   check=True, stdout=subprocess.DEVNULL)
+    with open(output, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(full, pruned):
+    """Selisih metrik per algoritma (pruned - full)"""
+    comparison = {}
+    for method in full:
+        before, after = full[method], pruned[method]
+        comparison[method] = {
+            metric: {
+                "full": round(before[metric], 4),
+                "pruned": round(after[metric], 4),
+                "delta": round(after[metric] - before[metric], 4),
+            }
+            for metric in ("MAP", "P@10", "latency_ms")
+        }
+    return comparison
+
+
+def print_report(report):
+    postings = report["postings"]
+    size = report["index_bytes"]
+    print("\n" + "=" * 60)
+    print(f"✂️  STATIC PRUNING ({report['method']}-centric, ratio {report['ratio']})")
+    print("=" * 60)
+    print(f"   Postings : {postings['postings_before']:,} → {postings['postings_after']:,} "
+          f"(-{postings['postings_removed_ratio']:.1%})")
+    reduction = 1 - size['pruned'] / size['full']
+    print(f"   Index    : {size['full'] / 1024:.1f} KB → {size['pruned'] / 1024:.1f} KB "
+          f"({-reduction:+.1%})")
+    for method, metrics in report["evaluation"].items():
+        print(f"   {method:<7}: " + ", ".join(
+            f"{metric} {values['full']:.4f} → {values['pruned']:.4f} ({values['delta']:+.4f})"
+            for metric, values in metrics.items()
+        ))
+    if reduction < PRUNE_MIN_SIZE_REDUCTION:
+        hint = "--method document atau " if report["method"] == "term" else ""
+        print(f"\n⚠️  Ukuran index {-reduction:+.1%} (penghematan < {PRUNE_MIN_SIZE_REDUCTION:.0%}): "
+              f"pruning {report['method']}-centric hampir tidak menghemat ruang, "
+              f"pertimbangkan {hint}--ratio lebih besar")
+    print(f"\n📄 Report: {PRUNING_REPORT_FILE}")
+    print("=" * 60 + "\n")
+
+
+def prune(method, ratio, keep_top, dry_run=False):
+    os.makedirs(PRUNING_DIR, exist_ok=True)
+    if not any(segment["name"] == BASE_SEGMENT["name"] for segment in read_manifest()["segments"]):
+        print("❌ Base index tidak dipakai query (index di-shard per source), pruning tidak berpengaruh")
+        return False
+    with BinaryIndex(INVERTED_INDEX_FILE) as index:
+        if index.pruned:
+            print("❌ Index sudah di-prune. Jalankan --restore atau build ulang (run_all_steps.py --force)")
+            return False
+
+    full = run_evaluation("full")
+
+    start = time.time()
+    tmp = INVERTED_INDEX_FILE + ".pruned.tmp"
+    with BinaryIndex(INVERTED_INDEX_FILE) as index:
+        postings = pruned_postings(index, method, ratio, keep_top)
+        summary = pruning_summary(index, postings)
+        write_pruned_index(tmp, index, postings)
+    shutil.copy2(INVERTED_INDEX_FILE, FULL_INDEX_BACKUP)
+    full_bytes = os.path.getsize(INVERTED_INDEX_FILE)
+    os.replace(tmp, INVERTED_INDEX_FILE)
+    publish_base()
+    print(f"\n✂️  Pruned index written in {time.time() - start:.2f}s")
+
+    pruned = run_evaluation("pruned")
+    report = {
+        "method": method,
+        "ratio": ratio,
+        "keep_top": keep_top,
+        "postings": summary,
+        "index_bytes": {"full": full_bytes, "pruned": os.path.getsize(INVERTED_INDEX_FILE)},
+        "evaluation": compare(full, pruned),
+        "applied": not dry_run,
+        "created_at": round(time.time(), 3),
+    }
+    with open(PRUNING_REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if dry_run:
+        restore()
+    print_report(report)
+    return True
+
+
+def restore():
+    """Kembalikan index lengkap dari backup"""
+    if not os.path.exists(FULL_INDEX_BACKUP):
+        print("❌ Backup index lengkap tidak ditemukan")
+        return False
+    with BinaryIndex(INVERTED_INDEX_FILE) as index:
+        if not index.pruned:
+            print("❌ Index saat ini tidak di-prune (backup tidak dipakai)")
+            return False
+    os.replace(FULL_INDEX_BACKUP, INVERTED_INDEX_FILE)
+    publish_base()
+    print("✅ Full index restored")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Static pruning inverted_index.bin + evaluasi MAP / P@10")
+    parser.add_argument("--method", choices=PRUNE_METHODS, default=PRUNE_METHOD,
+                        help="term-centric atau document-centric (default: PRUNE_METHOD)")
+    parser.add_argument("--ratio", type=float, default=PRUNE_RATIO,
+                        help="Fraksi postings per term / dokumen yang dibuang (default: PRUNE_RATIO)")
+    parser.add_argument("--keep-top", type=int, default=PRUNE_KEEP_TOP,
+                        help="Term-centric: postings teratas per term yang selalu disimpan")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Hanya evaluasi, index lengkap dikembalikan setelah report ditulis")
+    parser.add_argument("--restore", action="store_true",
+                        help="Kembalikan index lengkap dari backup pruning terakhir")
+    args = parser.parse_args()
+    if not 0 <= args.ratio < 1:
+        parser.error("--ratio harus di antara 0 dan 1")
+    success = restore() if args.restore else prune(args.method, args.ratio, args.keep_top, args.dry_run)
+    sys.exit(0 if success else 1)
@@ -1,6 +1,27 @@
 """
 Master script to run all indexing steps
+
+Single-scan: corpus dibaca dan di-tokenize SEKALI oleh IndexBuilder,
+semua step berikutnya memakai struktur yang sudah ada di memory.
+Corpus besar (--streaming, atau CSV >= STREAMING_MIN_FILE_SIZE) memakai
+StreamingIndexBuilder: baca per chunk, spill run ke disk, external merge.
+(Step individual di steps/ tetap bisa dijalankan sendiri.)
+
+Build cache: fingerprint (isi merge-all-clean.csv + config + code indexing)
+dicatat di BUILD_MANIFEST_FILE; kalau sama dengan build terakhir dan file
+index tidak berubah, build di-skip (segment incremental juga tidak di-reset).
+Stage builder berbagi struktur di memory, jadi satu build = satu unit cache.
+
+Shard per source (--shard-by-source atau SHARD_BY_SOURCE): setelah full build,
+corpus di-index ulang sebagai satu segment per source (utils/segments.py
+build_shards) yang menggantikan base di manifest; query memakai statistik global.
+
+--profile: wall/CPU time, dokumen/detik dan peak memory (tracemalloc) per
+stage ditulis ke report JSON di PROFILE_DIR; --cprofile menambah dump
+cProfile (.prof) per stage. Dengan --workers, memory / CPU process worker
+tidak ikut terukur (hanya process utama).
 """
+import argparse
 import sys
 import os
 import time
@@ -8,24 +29,90 @@ import time
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from steps import step1_build_inverted_index
-from steps import step2_calculate_tfidf
-from steps import step3_build_document_index
-from steps import step4_generate_statistics
+# Build cache dan profiler dipakai bersama dengan preprocessing/run_all_steps.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "preprocessing", "utils"))
+
+import config
+from config import (
+    BASE_DIR, INPUT_FILE, INVERTED_INDEX_FILE, INVERTED_INDEX_JSON_FILE, TFIDF_MATRIX_FILE,
+    DOCUMENT_INDEX_FILE, VOCABULARY_FILE, INDEX_STATS_FILE, BUILD_MANIFEST_FILE,
+    PROFILE_DIR, SAVE_JSON_INDEX, BATCH_SIZE, STREAMING_MIN_FILE_SIZE, SHARD_BY_SOURCE
+)
+from build_cache import BuildCache, step_spec, config_values, package_code
+from step_profiler import StepProfiler, default_report_path
+
+BUILD_STEP = "Index Build"
 
-def run_all():
+def build_spec(shard_by_source=False):
+    """Apa saja yang menentukan isi file index (workers / streaming tidak: output identik)"""
+    outputs = [INVERTED_INDEX_FILE, TFIDF_MATRIX_FILE, DOCUMENT_INDEX_FILE, VOCABULARY_FILE, INDEX_STATS_FILE]
+    if SAVE_JSON_INDEX:
+        outputs.append(INVERTED_INDEX_JSON_FILE)
+    return step_spec(
+        inputs=[INPUT_FILE],
+        outputs=outputs,
+        # BM25_K1 / BM25_B: norms BM25 + config bobot disimpan di header inverted_index.bin
+        config=dict(config_values(config, [
+            "TEXT_COLUMN", "METADATA_COLUMNS", "SNIPPET_COLUMN", "SNIPPET_LENGTH",
+            "SMOOTH_IDF", "SUBLINEAR_TF", "INDEX_BIGRAMS", "BM25_K1", "BM25_B", "SAVE_JSON_INDEX"
+        ]), SHARD_BY_SOURCE=shard_by_source),
+        code=package_code(os.path.join(BASE_DIR, "steps")) + package_code(os.path.join(BASE_DIR, "utils"))
+    )
+
+def build_source_shards():
+    """Index ulang corpus sebagai satu shard per source (menggantikan base di manifest)"""
+    from utils.index_builder import read_documents
+    from utils.segments import build_shards
+    
+    rows, columns = read_documents(INPUT_FILE)
+    shards = build_shards(rows, columns)
+    print(f"\n✅ {len(shards)} source shard(s): {', '.join(shard['source'] for shard in shards)}")
+
+def run_all(workers=None, streaming=None, chunk_size=BATCH_SIZE, force=False, profile=None, cprofile=False,
+            shard_by_source=SHARD_BY_SOURCE):
+    """profile: path report JSON (None = tanpa profiling)"""
     print("\n" + "="*60)
     print("🚀 INDEXING PIPELINE - MODULAR EXECUTION")
     print("="*60)
     print("This will build the search index from preprocessed data")
     print("="*60 + "\n")
     
+    spec = build_spec(shard_by_source)
+    cache = BuildCache(BUILD_MANIFEST_FILE)
+    fingerprint = cache.fingerprint(spec)
+    profiler = StepProfiler(
+        "indexing", enabled=profile is not None,
+        cprofile_dir=os.path.splitext(profile)[0] if profile and cprofile else None
+    )
+    if not force and cache.is_fresh(BUILD_STEP, fingerprint, spec):
+        print(f"⏭️  Index up to date - input, config dan code tidak berubah (fingerprint {fingerprint[:12]})")
+        print("   Gunakan --force untuk build ulang\n")
+        if profiler.enabled:
+            profiler.skipped(BUILD_STEP)
+            profiler.write(profile, input_file=os.path.abspath(INPUT_FILE),
+                           input_bytes=os.path.getsize(INPUT_FILE), force=force)
+        return True
+    
+    # Import di sini: no-op rebuild tidak perlu load pandas / scipy sama sekali
+    from utils.index_builder import IndexBuilder
+    from utils.streaming_builder import StreamingIndexBuilder
+    
+    if streaming is None:
+        streaming = os.path.getsize(INPUT_FILE) >= STREAMING_MIN_FILE_SIZE
+    if streaming:
+        builder = StreamingIndexBuilder(chunk_size=chunk_size)
+        scan = ("Step 1: Stream Corpus (chunked read + spill + external merge)", builder.scan)
+    else:
+        builder = IndexBuilder()
+        scan = ("Step 1: Scan Corpus (read + tokenize once)", lambda: builder.scan(workers=workers))
     steps = [
-        ("Step 1: Build Inverted Index", step1_build_inverted_index.main),
-        ("Step 2: Calculate TF-IDF", step2_calculate_tfidf.main),
-        ("Step 3: Build Document Index", step3_build_document_index.main),
-        ("Step 4: Generate Statistics", step4_generate_statistics.main),
+        scan,
+        ("Step 2: Calculate TF-IDF", builder.calculate_tfidf),
+        ("Step 3: Save Index Files", builder.save),
+        ("Step 4: Generate Statistics", builder.generate_statistics),
     ]
+    if shard_by_source:
+        steps.append(("Step 5: Build Source Shards", build_source_shards))
     
     total_start = time.time()
     
@@ -34,17 +121,22 @@ def run_all():
         print(f"▶️  [{i}/{len(steps)}] {name}")
         print("="*60)
         
-        start = time.time()
         try:
-            func()
-            elapsed = time.time() - start
-            print(f"✅ {name} completed in {elapsed:.2f}s")
+            with profiler.step(name) as record:
+                func()
+                # Jumlah dokumen baru diketahui setelah scan (step 1)
+                record["documents"] = builder.total_documents
+            print(f"✅ {name} completed in {record['wall_time']:.2f}s")
         except Exception as e:
             print(f"❌ Error in {name}: {e}")
             import traceback
             traceback.print_exc()
+            builder.close()
+            cache.invalidate(BUILD_STEP)
             return False
     
+    builder.close()
+    cache.record(BUILD_STEP, fingerprint, spec)
     total_elapsed = time.time() - total_start
     
     print("\n" + "="*60)
@@ -53,15 +145,46 @@ def run_all():
     print(f"⏱️  Total time: {total_elapsed:.2f}s")
     print(f"📁 Index files saved in: data/index/")
     print("\n📊 Index files created:")
-    print("   • inverted_index.json - Term to document mapping")
-    print("   • tfidf_matrix.pkl - TF-IDF weights")
+    print("   • inverted_index.bin - Term to document mapping (binary, vbyte postings)")
+    print("   • tfidf_matrix.npz - TF-IDF weights (sparse CSR)")
     print("   • document_index.json - Document metadata")
-    print("   • vocabulary.json - Complete vocabulary")
+    print("   • vocabulary.bin - Complete vocabulary (front-coded)")
     print("   • index_stats.json - Index statistics")
     print("="*60 + "\n")
     
+    if profiler.enabled:
+        profiler.print_summary()
+        profiler.write(profile, input_file=os.path.abspath(INPUT_FILE),
+                       input_bytes=os.path.getsize(INPUT_FILE), force=force,
+                       builder="streaming" if streaming else "in-memory", workers=workers)
+    
     return True
 
 if __name__ == "__main__":
-    success = run_all()
+    parser = argparse.ArgumentParser(description="Build search index dari merge-all-clean.csv")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Jumlah process untuk build per shard (default: INDEX_WORKERS, "
+                             "serial kalau corpus < PARALLEL_MIN_DOCUMENTS)")
+    parser.add_argument("--streaming", action="store_true", default=None,
+                        help="Build per chunk dengan spill ke disk (default: otomatis kalau CSV "
+                             ">= STREAMING_MIN_FILE_SIZE)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_SIZE,
+                        help="Dokumen per chunk untuk --streaming (default: BATCH_SIZE)")
+    parser.add_argument("--force", action="store_true",
+                        help="Build ulang walaupun fingerprint tidak berubah")
+    parser.add_argument("--shard-by-source", action="store_true", default=SHARD_BY_SOURCE,
+                        help="Setelah build, index sebagai satu shard per source (default: SHARD_BY_SOURCE)")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="REPORT_JSON",
+                        help="Catat wall/CPU time, dokumen/detik dan peak memory per stage ke report JSON "
+                             "(default: PROFILE_DIR/indexing_<timestamp>.json)")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="Dengan --profile: dump cProfile (.prof) per stage di folder sebelah report")
+    args = parser.parse_args()
+    if args.cprofile and args.profile is None:
+        parser.error("--cprofile membutuhkan --profile")
+    if args.profile == "":
+        args.profile = default_report_path(PROFILE_DIR, "indexing")
+    success = run_all(workers=args.workers, streaming=args.streaming, chunk_size=args.chunk_size,
+                      force=args.force, profile=args.profile, cprofile=args.cprofile,
+                      shard_by_source=args.shard_by_source)
     sys.exit(0 if success else 1)
@@ -12,10 +12,12 @@ from collections import defaultdict, Counter
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import (
-    INPUT_FILE, INVERTED_INDEX_FILE, VOCABULARY_FILE, 
-    TEXT_COLUMN, VERBOSE
+    INPUT_FILE, INVERTED_INDEX_FILE, INVERTED_INDEX_JSON_FILE, VOCABULARY_FILE,
+    TEXT_COLUMN, VERBOSE, SAVE_JSON_INDEX
 )
 from utils.text_processor import tokenize, get_term_statistics
+from utils.binary_index import write_binary_index
+from utils.term_dictionary import write_vocabulary
 
 def build_inverted_index(df):
     """
@@ -75,6 +77,31 @@ def build_inverted_index(df):
     
     return dict(inverted_index), sorted(list(vocabulary))
 
+def save_inverted_index(inverted_index, vocabulary, doc_ids, doc_lengths):
+    """
+    Simpan inverted_index.bin (+ inverted_index.json kalau SAVE_JSON_INDEX)
+    dan vocabulary.bin. doc_ids / doc_lengths = per dokumen dalam urutan corpus.
+    """
+    total_documents = len(doc_ids)
+    print(f"\n💾 Saving inverted index to: {INVERTED_INDEX_FILE}")
+    write_binary_index(INVERTED_INDEX_FILE, inverted_index, doc_ids, doc_lengths)
+    # Base baru berisi seluruh corpus → segment incremental lama tidak dipakai lagi
+    # (import di sini karena utils.segments meng-import index_builder → step ini)
+    from utils.segments import reset_segments
+    reset_segments()
+    
+    if SAVE_JSON_INDEX:
+        print(f"💾 Saving inverted index (JSON) to: {INVERTED_INDEX_JSON_FILE}")
+        with open(INVERTED_INDEX_JSON_FILE, 'w', encoding='utf-8') as f:
+            json.dump(inverted_index, f, ensure_ascii=False, indent=2)
+    
+    save_vocabulary(vocabulary, total_documents)
+
+def save_vocabulary(vocabulary, total_documents):
+    """Simpan vocabulary.bin (vocabulary = list term terurut, front-coded per block)"""
+    print(f"💾 Saving vocabulary to: {VOCABULARY_FILE}")
+    write_vocabulary(VOCABULARY_FILE, vocabulary, total_documents)
+
 def main():
     print("\n" + "="*60)
     print("📇 STEP 1: BUILD INVERTED INDEX")
@@ -94,20 +121,9 @@ def main():
     # Build inverted index
     inverted_index, vocabulary = build_inverted_index(df)
     
-    # Save inverted index
-    print(f"\n💾 Saving inverted index to: {INVERTED_INDEX_FILE}")
-    with open(INVERTED_INDEX_FILE, 'w', encoding='utf-8') as f:
-        json.dump(inverted_index, f, ensure_ascii=False, indent=2)
-    
-    # Save vocabulary
-    print(f"💾 Saving vocabulary to: {VOCABULARY_FILE}")
-    vocab_data = {
-        "vocabulary": vocabulary,
-        "vocab_size": len(vocabulary),
-        "total_documents": len(df)
-    }
-    with open(VOCABULARY_FILE, 'w', encoding='utf-8') as f:
-        json.dump(vocab_data, f, ensure_ascii=False, indent=2)
+    # Save inverted index + vocabulary
+    doc_lengths = [len(tokenize(text)) for text in df[TEXT_COLUMN]]
+    save_inverted_index(inverted_index, vocabulary, df['id'].tolist(), doc_lengths)
     
     print(f"\n✅ Step 1 completed!")
     print("="*60 + "\n")
@@ -1,14 +1,19 @@
 """
 STEP 2: Calculate TF-IDF Weights
 Menghitung TF-IDF score untuk setiap term dalam setiap dokumen
+
+Semua perhitungan vectorized di atas sparse matrix (CSR):
+count matrix dokumen x term dibuat sekali, lalu TF dan IDF diterapkan
+langsung ke array .data. Hasil disimpan sebagai array sparse (npz).
 """
 import pandas as pd
 import json
-import pickle
 import sys
 import os
-from collections import defaultdict
-import math
+import zipfile
+
+import numpy as np
+from scipy import sparse
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -18,122 +23,183 @@ from config import (
     TEXT_COLUMN, VERBOSE, SUBLINEAR_TF, SMOOTH_IDF
 )
 from utils.text_processor import tokenize
+from utils.binary_index import BinaryIndex
+from utils.weighting import compute_idf, tf_weights
 
-def calculate_tfidf(df, inverted_index):
+def count_matrix(doc_term_counts, term_ids):
+    """
+    CSR count matrix (dokumen x term) dari list {term: count} per dokumen.
+    term_ids: {term: kolom}; term di luar vocabulary diabaikan.
     """
-    Calculate TF-IDF matrix
-    
+    indptr = np.zeros(len(doc_term_counts) + 1, dtype=np.int64)
+    indices, data = [], []
+    for row, term_counts in enumerate(doc_term_counts):
+        for term, count in term_counts.items():
+            column = term_ids.get(term)
+            if column is not None:
+                indices.append(column)
+                data.append(count)
+        indptr[row + 1] = len(indices)
+    index_dtype = np.int32 if len(indices) < np.iinfo(np.int32).max else np.int64
+    matrix = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=index_dtype), indptr.astype(index_dtype)),
+        shape=(len(doc_term_counts), len(term_ids))
+    )
+    matrix.sort_indices()
+    return matrix
+
+def tfidf_weights(counts, doc_lengths, idf=None):
+    """
+    TF-IDF dari CSR count matrix (vectorized di atas counts.data)
+
+    TF = 1 + log(count) kalau SUBLINEAR_TF, selain itu count / panjang dokumen
+    IDF = log((1 + N) / (1 + df)) + 1 kalau SMOOTH_IDF, selain itu log(N / df)
+    idf=None → dihitung dari counts (counts = seluruh corpus); streaming build
+    memberi IDF global karena counts hanya sebagian dokumen.
+    Return (tfidf CSR, idf per term)
+    """
+    if idf is None:
+        doc_freqs = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = compute_idf(doc_freqs, counts.shape[0])
+
+    tfidf = counts.copy()
+    row_lengths = None if SUBLINEAR_TF else np.repeat(np.asarray(doc_lengths, dtype=np.float64), np.diff(tfidf.indptr))
+    tfidf.data = tf_weights(tfidf.data, row_lengths)
+    tfidf.data *= idf[tfidf.indices]
+    return tfidf, idf
+
+def calculate_tfidf(df, terms):
+    """
+    Calculate TF-IDF matrix untuk vocabulary `terms` (urutan = kolom matrix)
+
     TF-IDF = TF * IDF
-    - TF: Term Frequency (normalized by document length)
+    - TF: Term Frequency (sublinear / normalized by document length)
     - IDF: Inverse Document Frequency
     """
-    total_docs = len(df)
-    tfidf_matrix = {}
-    
     print(f"\n📊 Calculating TF-IDF weights...")
-    print(f"   Total documents: {total_docs}")
+    print(f"   Total documents: {len(df)}")
     print(f"   Sublinear TF: {SUBLINEAR_TF}")
     print(f"   Smooth IDF: {SMOOTH_IDF}\n")
-    
-    # Step 1: Calculate IDF for each term
-    print("   🔢 Calculating IDF...")
-    idf = {}
-    for term, data in inverted_index.items():
-        doc_count = data["doc_count"]
-        if SMOOTH_IDF:
-            idf[term] = math.log((1 + total_docs) / (1 + doc_count)) + 1
-        else:
-            idf[term] = math.log(total_docs / doc_count)
-    
-    print(f"   ✓ IDF calculated for {len(idf)} terms")
-    
-    # Step 2: Calculate TF-IDF for each document
-    print(f"   🔢 Calculating TF-IDF for each document...\n")
-    
-    for idx, row in df.iterrows():
-        doc_id = row['id']
-        text = row[TEXT_COLUMN]
-        
-        # Tokenize
-        terms = tokenize(text)
-        doc_length = len(terms)
-        
-        if doc_length == 0:
-            tfidf_matrix[doc_id] = {}
-            continue
-        
-        # Count term frequencies
+
+    # Step 1: Count matrix (satu tokenize per dokumen)
+    print("   🔢 Building count matrix...")
+    term_ids = {term: column for column, term in enumerate(terms)}
+    doc_term_counts, doc_lengths = [], []
+    for text in df[TEXT_COLUMN]:
+        tokens = tokenize(text)
         term_counts = {}
-        for term in terms:
+        for term in tokens:
             term_counts[term] = term_counts.get(term, 0) + 1
-        
-        # Calculate TF-IDF
-        tfidf_scores = {}
-        for term, count in term_counts.items():
-            # Calculate TF
-            if SUBLINEAR_TF:
-                tf = 1 + math.log(count) if count > 0 else 0
-            else:
-                tf = count / doc_length
-            
-            # Calculate TF-IDF
-            tfidf = tf * idf.get(term, 0)
-            tfidf_scores[term] = round(tfidf, 6)
-        
-        tfidf_matrix[doc_id] = tfidf_scores
-        
-        if VERBOSE and (idx + 1) % 50 == 0:
-            print(f"   ✓ Processed {idx + 1}/{len(df)} documents")
-    
+        doc_term_counts.append(term_counts)
+        doc_lengths.append(len(tokens))
+    counts = count_matrix(doc_term_counts, term_ids)
+    print(f"   ✓ Count matrix: {counts.shape[0]} x {counts.shape[1]}, {counts.nnz} entries")
+
+    # Step 2: TF-IDF (vectorized)
+    print(f"   🔢 Calculating TF-IDF...")
+    tfidf_matrix, idf = tfidf_weights(counts, doc_lengths)
+
     print(f"\n✅ TF-IDF matrix calculated!")
-    print(f"   📊 Documents: {len(tfidf_matrix)}")
-    
-    # Calculate statistics
-    total_tfidf_entries = sum(len(scores) for scores in tfidf_matrix.values())
-    avg_terms_per_doc = total_tfidf_entries / len(tfidf_matrix) if tfidf_matrix else 0
-    print(f"   📊 Avg unique terms per document: {avg_terms_per_doc:.1f}")
-    
+    print(f"   📊 Documents: {tfidf_matrix.shape[0]}")
+    print(f"   📊 Avg unique terms per document: {tfidf_matrix.nnz / max(tfidf_matrix.shape[0], 1):.1f}")
+
     return tfidf_matrix, idf
 
+def _strings_to_arrays(strings):
+    """(blob uint8, offsets) — string disimpan tanpa pickle dan tanpa padding"""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def _arrays_to_strings(blob, offsets):
+    data = blob.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+def tfidf_metadata(total_documents, vocab_size):
+    return {
+        'total_documents': total_documents,
+        'vocab_size': vocab_size,
+        'sublinear_tf': SUBLINEAR_TF,
+        'smooth_idf': SMOOTH_IDF
+    }
+
+def save_tfidf_matrix(tfidf_matrix, idf, terms, doc_ids):
+    """Simpan tfidf_matrix.npz (CSR data/indices/indptr + idf + terms + doc ids)"""
+    print(f"\n💾 Saving TF-IDF matrix to: {TFIDF_MATRIX_FILE}")
+    term_blob, term_offsets = _strings_to_arrays(terms)
+    doc_blob, doc_offsets = _strings_to_arrays(doc_ids)
+    metadata = tfidf_metadata(tfidf_matrix.shape[0], len(idf))
+    np.savez(
+        TFIDF_MATRIX_FILE,
+        data=tfidf_matrix.data, indices=tfidf_matrix.indices, indptr=tfidf_matrix.indptr,
+        shape=np.asarray(tfidf_matrix.shape), idf=idf,
+        term_blob=term_blob, term_offsets=term_offsets,
+        doc_blob=doc_blob, doc_offsets=doc_offsets,
+        metadata=np.asarray(json.dumps(metadata))
+    )
+
+def load_tfidf_matrix(path=TFIDF_MATRIX_FILE):
+    """
+    Load tfidf_matrix.npz → {'tfidf_matrix': CSR (dokumen x term), 'idf': array,
+    'terms': list, 'doc_ids': list, 'metadata': dict}
+    """
+    with np.load(path) as f:
+        return {
+            'tfidf_matrix': sparse.csr_matrix(
+                (f['data'], f['indices'], f['indptr']), shape=tuple(f['shape'])
+            ),
+            'idf': f['idf'],
+            'terms': _arrays_to_strings(f['term_blob'], f['term_offsets']),
+            'doc_ids': _arrays_to_strings(f['doc_blob'], f['doc_offsets']),
+            'metadata': json.loads(str(f['metadata']))
+        }
+
+def iter_npz_array(path, key, chunk_size=1 << 20):
+    """
+    Baca satu array dari .npz per chunk (np.load selalu membaca array utuh).
+    Generator array numpy berisi paling banyak chunk_size elemen.
+    """
+    with zipfile.ZipFile(path) as archive, archive.open(f"{key}.npy") as f:
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, _, dtype = read_header(f)
+        remaining = int(np.prod(shape))
+        while remaining:
+            count = min(chunk_size, remaining)
+            yield np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype)
+            remaining -= count
+
 def main():
     print("\n" + "="*60)
     print("📈 STEP 2: CALCULATE TF-IDF WEIGHTS")
     print("="*60)
     print("Operations:")
-    print("  ✓ Load inverted index")
+    print("  ✓ Load term dictionary")
+    print("  ✓ Build sparse count matrix")
     print("  ✓ Calculate IDF (Inverse Document Frequency)")
     print("  ✓ Calculate TF (Term Frequency)")
     print("  ✓ Calculate TF-IDF scores")
     print("="*60)
-    
+
     # Load data
     print(f"\n📂 Loading: {INPUT_FILE}")
     df = pd.read_csv(INPUT_FILE, encoding='utf-8')
     print(f"✅ Loaded {len(df)} documents")
-    
-    # Load inverted index
+
+    # Load term dictionary dari inverted index (kolom matrix = term id)
     print(f"\n📂 Loading inverted index: {INVERTED_INDEX_FILE}")
-    with open(INVERTED_INDEX_FILE, 'r', encoding='utf-8') as f:
-        inverted_index = json.load(f)
-    print(f"✅ Loaded inverted index with {len(inverted_index)} terms")
-    
+    with BinaryIndex(INVERTED_INDEX_FILE) as index:
+        terms = index.terms()
+    print(f"✅ Loaded inverted index with {len(terms)} terms")
+
     # Calculate TF-IDF
-    tfidf_matrix, idf = calculate_tfidf(df, inverted_index)
-    
-    # Save TF-IDF matrix (using pickle for efficiency)
-    print(f"\n💾 Saving TF-IDF matrix to: {TFIDF_MATRIX_FILE}")
-    with open(TFIDF_MATRIX_FILE, 'wb') as f:
-        pickle.dump({
-            'tfidf_matrix': tfidf_matrix,
-            'idf': idf,
-            'metadata': {
-                'total_documents': len(df),
-                'vocab_size': len(idf),
-                'sublinear_tf': SUBLINEAR_TF,
-                'smooth_idf': SMOOTH_IDF
-            }
-        }, f)
-    
+    tfidf_matrix, idf = calculate_tfidf(df, terms)
+
+    # Save TF-IDF matrix (sparse arrays)
+    save_tfidf_matrix(tfidf_matrix, idf, terms, df['id'].tolist())
+
     print(f"\n✅ Step 2 completed!")
     print("="*60 + "\n")
 
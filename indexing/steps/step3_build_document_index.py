@@ -12,9 +12,41 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import (
     INPUT_FILE, DOCUMENT_INDEX_FILE, METADATA_COLUMNS, 
-    TEXT_COLUMN, VERBOSE
+    TEXT_COLUMN, SNIPPET_COLUMN, SNIPPET_LENGTH, VERBOSE
 )
 
+def make_snippet(text, title="", max_len=SNIPPET_LENGTH):
+    """Potongan awal text (whitespace dirapikan, judul di awal text dibuang), dipotong di batas kata"""
+    if not isinstance(text, str):
+        return ""
+    text = " ".join(text.split())
+    title = " ".join(title.split()) if isinstance(title, str) else ""
+    if title and text.startswith(title):
+        text = text[len(title):].lstrip()
+    if len(text) <= max_len:
+        return text
+    return text[:max_len].rsplit(" ", 1)[0] + "..."
+
+def document_entry(row, columns):
+    """Metadata + snippet satu dokumen (row: Series / dict, columns: kolom yang tersedia)"""
+    doc_data = {}
+    for col in METADATA_COLUMNS:
+        if col in columns:
+            value = row[col]
+            # Convert numpy types to python types
+            if pd.isna(value):
+                doc_data[col] = None
+            elif isinstance(value, (int, float)):
+                doc_data[col] = int(value) if col in ['word_count', 'char_count', 'images_count'] else float(value)
+            else:
+                doc_data[col] = str(value)
+    
+    # Snippet dari content asli; CSV tanpa SNIPPET_COLUMN memakai text hasil preprocessing
+    text = row[SNIPPET_COLUMN] if SNIPPET_COLUMN in columns else row[TEXT_COLUMN] if TEXT_COLUMN in columns else ""
+    doc_data['snippet'] = make_snippet(text, row['title'] if 'title' in columns else "")
+    
+    return doc_data
+
 def build_document_index(df):
     """
     Build document index dengan metadata lengkap
@@ -27,9 +59,10 @@ def build_document_index(df):
             "title": "...",
             "url": "...",
             "main_image": "...",
+            "published_at": "2025-11-15T23:37:00+0700",
             "word_count": 341,
             "char_count": 2192,
-            "text_preview": "first 200 chars..."
+            "snippet": "first 250 chars of the original content..."
         }
     }
     """
@@ -39,26 +72,7 @@ def build_document_index(df):
     print(f"   Metadata columns: {', '.join(METADATA_COLUMNS)}\n")
     
     for idx, row in df.iterrows():
-        doc_id = row['id']
-        
-        # Extract metadata
-        doc_data = {}
-        for col in METADATA_COLUMNS:
-            if col in df.columns:
-                value = row[col]
-                # Convert numpy types to python types
-                if pd.isna(value):
-                    doc_data[col] = None
-                elif isinstance(value, (int, float)):
-                    doc_data[col] = int(value) if col in ['word_count', 'char_count', 'images_count'] else float(value)
-                else:
-                    doc_data[col] = str(value)
-        
-        # Add text preview (first 200 chars)
-        text = row[TEXT_COLUMN] if TEXT_COLUMN in df.columns else ""
-        doc_data['text_preview'] = text[:200] + "..." if len(text) > 200 else text
-        
-        document_index[doc_id] = doc_data
+        document_index[row['id']] = document_entry(row, df.columns)
         
         if VERBOSE and (idx + 1) % 50 == 0:
             print(f"   ✓ Indexed {idx + 1}/{len(df)} documents")
@@ -68,6 +82,71 @@ def build_document_index(df):
     
     return document_index
 
+def print_source_counts(document_index):
+    """Jumlah dokumen per sumber"""
+    sources = {}
+    for doc_data in document_index.values():
+        source = doc_data.get('source', 'unknown')
+        sources[source] = sources.get(source, 0) + 1
+    print_source_distribution(sources)
+
+def print_source_distribution(sources):
+    """sources: {source: jumlah dokumen}"""
+    print(f"\n📊 Documents by source:")
+    for source, count in sorted(sources.items()):
+        print(f"   • {source}: {count} documents")
+
+def save_document_index(document_index):
+    """Simpan document_index.json"""
+    print(f"\n💾 Saving document index to: {DOCUMENT_INDEX_FILE}")
+    with open(DOCUMENT_INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump(document_index, f, ensure_ascii=False, indent=2)
+
+def iter_document_index(path=DOCUMENT_INDEX_FILE, buffer_size=1 << 16):
+    """
+    Generator (doc_id, metadata) dari document_index.json tanpa json.load
+    seluruh file: object top-level di-parse entry demi entry dari buffer.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, position, eof = "", 0, False
+
+        def skip(chars):
+            # Lewati whitespace + karakter pemisah; isi buffer kalau habis
+            nonlocal buffer, position, eof
+            while True:
+                while position < len(buffer) and (buffer[position].isspace() or buffer[position] in chars):
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                buffer, position = f.read(buffer_size), 0
+                eof = not buffer
+
+        def value():
+            # raw_decode gagal kalau value terpotong di ujung buffer → baca lagi
+            nonlocal buffer, position, eof
+            while True:
+                try:
+                    result, end = decoder.raw_decode(buffer, position)
+                    if end < len(buffer) or eof:
+                        position = end
+                        return result
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                chunk = f.read(buffer_size)
+                eof = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+
+        skip("{")
+        while True:
+            skip(",")
+            if eof or buffer[position] == "}":
+                return
+            doc_id = value()
+            skip(":")
+            yield doc_id, value()
+
 def main():
     print("\n" + "="*60)
     print("📑 STEP 3: BUILD DOCUMENT INDEX")
@@ -87,19 +166,10 @@ def main():
     document_index = build_document_index(df)
     
     # Count documents by source
-    sources = {}
-    for doc_data in document_index.values():
-        source = doc_data.get('source', 'unknown')
-        sources[source] = sources.get(source, 0) + 1
-    
-    print(f"\n📊 Documents by source:")
-    for source, count in sorted(sources.items()):
-        print(f"   • {source}: {count} documents")
+    print_source_counts(document_index)
     
     # Save document index
-    print(f"\n💾 Saving document index to: {DOCUMENT_INDEX_FILE}")
-    with open(DOCUMENT_INDEX_FILE, 'w', encoding='utf-8') as f:
-        json.dump(document_index, f, ensure_ascii=False, indent=2)
+    save_document_index(document_index)
     
     print(f"\n✅ Step 3 completed!")
     print("="*60 + "\n")
@@ -3,100 +3,52 @@ STEP 4: Generate Index Statistics
 Membuat statistik lengkap dari index yang sudah dibuat
 """
 import json
-import pickle
 import sys
 import os
-from collections import Counter
+
+import numpy as np
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import (
     INVERTED_INDEX_FILE, TFIDF_MATRIX_FILE, DOCUMENT_INDEX_FILE,
-    VOCABULARY_FILE, INDEX_STATS_FILE, VERBOSE
+    INDEX_STATS_FILE, VERBOSE
 )
+from utils.binary_index import BinaryIndex
+from utils.streaming_stats import StatisticsAccumulator
+from steps.step2_calculate_tfidf import compute_idf, iter_npz_array
+from steps.step3_build_document_index import iter_document_index
+
+STREAM_CHUNK = 1 << 16  # Elemen per batch saat membaca file index
 
-def calculate_statistics(inverted_index, tfidf_data, document_index, vocabulary_data):
+def calculate_statistics(inverted_index_file=INVERTED_INDEX_FILE, tfidf_file=TFIDF_MATRIX_FILE,
+                         document_index_file=DOCUMENT_INDEX_FILE):
     """
-    Calculate comprehensive statistics
+    Calculate comprehensive statistics dari file index, satu pass per file:
+    term dictionary (mmap) per batch, bobot TF-IDF per chunk dari .npz,
+    document_index.json entry demi entry. Memory tambahan konstan.
+    (run_all_steps.py tidak memanggil ini: statistik sudah dikumpulkan saat build.)
     """
-    print(f"\n📊 Calculating index statistics...\n")
-    
-    # Basic counts
-    total_docs = len(document_index)
-    vocab_size = len(inverted_index)
-    
-    # Term statistics
-    term_doc_counts = [data["doc_count"] for data in inverted_index.values()]
-    avg_doc_per_term = sum(term_doc_counts) / len(term_doc_counts) if term_doc_counts else 0
-    max_doc_per_term = max(term_doc_counts) if term_doc_counts else 0
-    min_doc_per_term = min(term_doc_counts) if term_doc_counts else 0
-    
-    # Find most common terms
-    most_common_terms = sorted(
-        inverted_index.items(), 
-        key=lambda x: x[1]["doc_count"], 
-        reverse=True
-    )[:20]
-    
-    # Document length statistics
-    doc_lengths = [doc["word_count"] for doc in document_index.values() if "word_count" in doc]
-    avg_doc_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0
-    max_doc_length = max(doc_lengths) if doc_lengths else 0
-    min_doc_length = min(doc_lengths) if doc_lengths else 0
-    
-    # TF-IDF statistics
-    tfidf_matrix = tfidf_data.get('tfidf_matrix', {})
-    idf_scores = tfidf_data.get('idf', {})
-    
-    # Calculate average TF-IDF scores
-    all_tfidf_scores = []
-    for doc_scores in tfidf_matrix.values():
-        all_tfidf_scores.extend(doc_scores.values())
-    
-    avg_tfidf = sum(all_tfidf_scores) / len(all_tfidf_scores) if all_tfidf_scores else 0
-    max_tfidf = max(all_tfidf_scores) if all_tfidf_scores else 0
-    
-    # Terms with highest IDF (most discriminative)
-    top_idf_terms = sorted(idf_scores.items(), key=lambda x: x[1], reverse=True)[:20]
-    
-    # Source distribution
-    source_counts = Counter(doc["source"] for doc in document_index.values() if "source" in doc)
-    
-    statistics = {
-        "overview": {
-            "total_documents": total_docs,
-            "vocabulary_size": vocab_size,
-            "avg_terms_per_document": round(avg_doc_length, 2),
-            "total_index_entries": sum(len(scores) for scores in tfidf_matrix.values())
-        },
-        "term_statistics": {
-            "avg_documents_per_term": round(avg_doc_per_term, 2),
-            "max_documents_per_term": max_doc_per_term,
-            "min_documents_per_term": min_doc_per_term,
-            "most_common_terms": [
-                {"term": term, "doc_count": data["doc_count"]} 
-                for term, data in most_common_terms
-            ]
-        },
-        "document_statistics": {
-            "avg_document_length": round(avg_doc_length, 2),
-            "max_document_length": max_doc_length,
-            "min_document_length": min_doc_length,
-            "source_distribution": dict(source_counts)
-        },
-        "tfidf_statistics": {
-            "avg_tfidf_score": round(avg_tfidf, 6),
-            "max_tfidf_score": round(max_tfidf, 6),
-            "top_discriminative_terms": [
-                {"term": term, "idf_score": round(score, 4)} 
-                for term, score in top_idf_terms
-            ]
-        },
-        "metadata": tfidf_data.get('metadata', {})
-    }
-    
-    return statistics
+    print(f"\n📊 Calculating index statistics (streaming)...\n")
+    stats = StatisticsAccumulator()
+
+    with BinaryIndex(inverted_index_file) as index:
+        for start in range(0, index.n_terms, STREAM_CHUNK):
+            end = min(start + STREAM_CHUNK, index.n_terms)
+            # copy: view mmap tidak boleh hidup setelah index ditutup
+            doc_freqs = index.doc_freqs[start:end].astype(np.int64)
+            terms = [index.term(term_id) for term_id in range(start, end)]
+            stats.add_terms(terms, doc_freqs, compute_idf(doc_freqs, index.n_docs))
+
+    for scores in iter_npz_array(tfidf_file, "data", STREAM_CHUNK):
+        stats.add_tfidf_scores(scores)
+    metadata = json.loads(str(next(iter_npz_array(tfidf_file, "metadata"))[0]))
+
+    for _, entry in iter_document_index(document_index_file):
+        stats.add_document(entry)
+
+    return stats.result(metadata)
 
 def print_statistics(stats):
     """
@@ -131,6 +83,8 @@ def print_statistics(stats):
     print(f"   • Avg document length: {doc_stats['avg_document_length']} words")
     print(f"   • Max document length: {doc_stats['max_document_length']} words")
     print(f"   • Min document length: {doc_stats['min_document_length']} words")
+    quantiles = ", ".join(f"{q}={v}" for q, v in doc_stats["document_length_quantiles"].items())
+    print(f"   • Document length quantiles: {quantiles}")
     
     print("\n   Documents by source:")
     for source, count in sorted(doc_stats["source_distribution"].items()):
@@ -141,6 +95,9 @@ def print_statistics(stats):
     tfidf_stats = stats["tfidf_statistics"]
     print(f"   • Avg TF-IDF score: {tfidf_stats['avg_tfidf_score']}")
     print(f"   • Max TF-IDF score: {tfidf_stats['max_tfidf_score']}")
+    print(f"   • Std TF-IDF score: {tfidf_stats['std_tfidf_score']}")
+    quantiles = ", ".join(f"{q}={v}" for q, v in tfidf_stats["tfidf_score_quantiles"].items())
+    print(f"   • TF-IDF score quantiles: {quantiles}")
     
     print("\n   Top 10 discriminative terms (highest IDF):")
     for i, item in enumerate(tfidf_stats["top_discriminative_terms"][:10], 1):
@@ -148,50 +105,33 @@ def print_statistics(stats):
     
     print("\n" + "="*60)
 
+def save_statistics(statistics):
+    """Simpan index_stats.json"""
+    print(f"\n💾 Saving statistics to: {INDEX_STATS_FILE}")
+    with open(INDEX_STATS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(statistics, f, ensure_ascii=False, indent=2)
+
 def main():
     print("\n" + "="*60)
     print("📊 STEP 4: GENERATE INDEX STATISTICS")
     print("="*60)
     print("Operations:")
-    print("  ✓ Load all index files")
+    print("  ✓ Stream all index files (one pass, constant memory)")
     print("  ✓ Calculate comprehensive statistics")
     print("  ✓ Identify key patterns")
     print("="*60)
     
-    # Load inverted index
-    print(f"\n📂 Loading inverted index: {INVERTED_INDEX_FILE}")
-    with open(INVERTED_INDEX_FILE, 'r', encoding='utf-8') as f:
-        inverted_index = json.load(f)
-    print(f"✅ Loaded inverted index")
-    
-    # Load TF-IDF matrix
-    print(f"\n📂 Loading TF-IDF matrix: {TFIDF_MATRIX_FILE}")
-    with open(TFIDF_MATRIX_FILE, 'rb') as f:
-        tfidf_data = pickle.load(f)
-    print(f"✅ Loaded TF-IDF matrix")
-    
-    # Load document index
-    print(f"\n📂 Loading document index: {DOCUMENT_INDEX_FILE}")
-    with open(DOCUMENT_INDEX_FILE, 'r', encoding='utf-8') as f:
-        document_index = json.load(f)
-    print(f"✅ Loaded document index")
-    
-    # Load vocabulary
-    print(f"\n📂 Loading vocabulary: {VOCABULARY_FILE}")
-    with open(VOCABULARY_FILE, 'r', encoding='utf-8') as f:
-        vocabulary_data = json.load(f)
-    print(f"✅ Loaded vocabulary")
-    
-    # Calculate statistics
-    statistics = calculate_statistics(inverted_index, tfidf_data, document_index, vocabulary_data)
+    # Calculate statistics (streaming dari file index)
+    print(f"\n📂 Reading: {INVERTED_INDEX_FILE}")
+    print(f"📂 Reading: {TFIDF_MATRIX_FILE}")
+    print(f"📂 Reading: {DOCUMENT_INDEX_FILE}")
+    statistics = calculate_statistics()
     
     # Print statistics
     print_statistics(statistics)
     
     # Save statistics
-    print(f"\n💾 Saving statistics to: {INDEX_STATS_FILE}")
-    with open(INDEX_STATS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(statistics, f, ensure_ascii=False, indent=2)
+    save_statistics(statistics)
     
     print(f"\n✅ Step 4 completed!")
     print("="*60 + "\n")
@@ -0,0 +1,144 @@
+"""
+Incremental indexing: tambah artikel baru ke index tanpa full rebuild
+
+Artikel baru di-index menjadi segment kecil (utils/segments.py), lalu tiered
+merge menggabungkan segment kecil di background. Delete / update memakai
+tombstone; compaction membuang dokumen mati dari segment.
+
+Usage:
+    python update_index.py add                      # row merge-all-clean.csv yang belum ter-index
+    python update_index.py add --input new.csv      # CSV lain (kolom sama dengan merge-all-clean.csv)
+    python update_index.py update --input fixed.csv # ganti versi lama artikel (re-crawl)
+    python update_index.py delete sindonews_12 ...  # hapus artikel (retracted)
+    python update_index.py merge                    # jalankan compaction + tiered merge sekarang
+    python update_index.py shard                    # index ulang sebagai satu shard per source
+    python update_index.py shard --source kompas    # build ulang shard satu source saja
+    python update_index.py status                   # daftar segment
+    python update_index.py search "persib juara"    # BM25 lintas semua segment
+"""
+import argparse
+import sys
+import os
+import time
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import INPUT_FILE
+from utils.index_builder import read_documents
+from utils.segments import (
+    SegmentedIndex, add_documents, build_shards, delete_documents, maybe_merge,
+    read_manifest, live_docs, segment_tier
+)
+
+
+def run_merger(args):
+    """Compaction + tiered merge setelah perubahan (sudah searchable sebelum merge, lewat manifest)"""
+    if not args.no_merge:
+        maybe_merge()
+
+
+def cmd_add(args):
+    start = time.time()
+    rows, columns = read_documents(args.input)
+    segment = add_documents(rows, columns, replace=args.command == "update")
+    if segment is None:
+        print("✅ No new documents to index")
+        return True
+    print(f"✅ Indexed {segment['docs']} documents into {segment['name']} in {time.time() - start:.2f}s")
+    run_merger(args)
+    return True
+
+
+def cmd_delete(args):
+    start = time.time()
+    deleted = delete_documents(args.doc_ids)
+    print(f"✅ Deleted {deleted}/{len(args.doc_ids)} documents in {time.time() - start:.2f}s")
+    run_merger(args)
+    return True
+
+
+def cmd_shard(args):
+    start = time.time()
+    rows, columns = read_documents(args.input)
+    shards = build_shards(rows, columns, sources=args.source)
+    if not shards:
+        print("✅ No documents for the requested source(s)")
+        return True
+    docs = sum(shard["docs"] for shard in shards)
+    print(f"✅ Built {len(shards)} shard(s) with {docs} documents in {time.time() - start:.2f}s")
+    run_merger(args)
+    return True
+
+
+def cmd_merge(args):
+    start = time.time()
+    merges = maybe_merge()
+    print(f"✅ {merges} merge(s) in {time.time() - start:.2f}s")
+    return True
+
+
+def cmd_status(args):
+    manifest = read_manifest()
+    print(f"📇 Segments (generation {manifest['generation']}):")
+    total = 0
+    for segment in manifest["segments"]:
+        docs = live_docs(segment)
+        total += docs
+        deleted = segment.get("deleted", 0)
+        placement = f"shard {segment['source']}" if segment.get("source") else f"tier {segment_tier(docs)}"
+        print(f"   • {segment['name']:<12} {docs:>6} documents  {deleted:>4} deleted  "
+              f"{placement:<16} ({segment['postings']})")
+    print(f"   Total: {total} live documents in {len(manifest['segments'])} segments")
+    return True
+
+
+def cmd_search(args):
+    index = SegmentedIndex()
+    with index.snapshot() as snapshot:
+        start = time.time()
+        results = snapshot.search(args.query, top_k=args.top_k)
+        elapsed = time.time() - start
+        for rank, (doc_id, score) in enumerate(results, 1):
+            document = snapshot.document(doc_id) or {}
+            print(f"[{rank}] ({score:.4f}) {doc_id} - {document.get('title', '')}")
+        print(f"\n{len(results)} results from {len(snapshot.segments)} segments in {elapsed * 1000:.1f} ms")
+    index.close()
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental indexing (segment-based)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add = subparsers.add_parser("add", help="Index artikel baru sebagai segment")
+    update = subparsers.add_parser("update", help="Index ulang artikel, versi lama di-tombstone")
+    for sub in (add, update):
+        sub.add_argument("--input", default=INPUT_FILE, help="CSV hasil preprocessing (default: merge-all-clean.csv)")
+        sub.add_argument("--no-merge", action="store_true", help="Jangan jalankan merge setelahnya")
+        sub.set_defaults(func=cmd_add)
+
+    delete = subparsers.add_parser("delete", help="Hapus artikel (tombstone)")
+    delete.add_argument("doc_ids", nargs="+")
+    delete.add_argument("--no-merge", action="store_true", help="Jangan jalankan compaction setelahnya")
+    delete.set_defaults(func=cmd_delete)
+
+    shard = subparsers.add_parser("shard", help="Index ulang sebagai satu shard per source "
+                                  "(artikel yang sudah di-delete tetap terhapus)")
+    shard.add_argument("--source", action="append", default=None,
+                       help="Hanya build ulang shard source ini (boleh berulang; default: semua source)")
+    shard.add_argument("--input", default=INPUT_FILE, help="CSV hasil preprocessing (default: merge-all-clean.csv)")
+    shard.add_argument("--no-merge", action="store_true", help="Jangan jalankan compaction setelahnya")
+    shard.set_defaults(func=cmd_shard)
+
+    subparsers.add_parser("merge", help="Jalankan compaction + tiered merge").set_defaults(func=cmd_merge)
+    subparsers.add_parser("status", help="Daftar segment").set_defaults(func=cmd_status)
+
+    search = subparsers.add_parser("search", help="BM25 lintas semua segment")
+    search.add_argument("query")
+    search.add_argument("--top-k", type=int, default=10)
+    search.set_defaults(func=cmd_search)
+
+    args = parser.parse_args()
+    success = args.func(args)
+    sys.exit(0 if success else 1)
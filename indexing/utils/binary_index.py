@@ -0,0 +1,448 @@
+"""
+Binary inverted index (pengganti inverted_index.json)
+
+Satu file little-endian yang bisa di-mmap langsung:
+
+    header   : magic, versi, jumlah dokumen, jumlah term, ukuran block term, offset setiap section
+    docs     : offset u32[n_docs + 1] + blob UTF-8 doc id (doc number = posisi di corpus)
+               + u32[n_docs] panjang dokumen (jumlah token)
+    norms    : f32[n_docs] panjang vektor TF-IDF (L2) + f32[n_docs] faktor panjang BM25
+               k1 * (1 - b + b * dl / avgdl), keduanya dengan N / df / avgdl file ini
+               + f64[5] doc stats (avgdl, SUBLINEAR_TF, SMOOTH_IDF, k1, b) untuk cek validitas
+    terms    : front-coded term dictionary (utils/term_dictionary.py): offset
+               u32[n_blocks + 1] + blob block (term terurut, prefix sama dibuang)
+    df       : u32[n_terms] jumlah postings per term
+               + vbyte[n_terms] selisih df koleksi - jumlah postings (hanya index hasil
+               pruning: df sebelum postings dibuang, untuk IDF; kosong di index biasa)
+    postings : offset u64[n_terms + 1] + blob postings
+
+Postings satu term = variable-byte (gap doc number) lalu variable-byte (term freq).
+Variable-byte: 7 bit per byte, byte terakhir setiap angka diberi bit 0x80.
+Encode/decode dilakukan vectorized dengan numpy.
+
+Norms dihitung saat build, jadi scorer tidak perlu menyentuh token atau
+men-decode seluruh postings untuk normalisasi (utils/weighting.py).
+"""
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+from utils.term_dictionary import BLOCK_SIZE, TermDictionary, encode_terms
+from utils.weighting import bm25_length_norms, squared_weights, weighting_config
+
+MAGIC = b"PIIDX\x00\x00\x00"
+VERSION = 5
+
+# magic, version, n_docs, n_terms, term block size, offset 13 section (docs, doc blob,
+# doc lengths, TF-IDF norms, BM25 norms, doc stats, term blocks, term blob, df,
+# df koleksi, postings offset, postings blob, end of file)
+HEADER = struct.Struct("<8sIIII13Q")
+SECTIONS = ("doc_offsets", "doc_blob", "doc_lengths", "doc_norms", "bm25_norms", "doc_stats",
+            "term_blocks", "term_blob", "doc_freqs", "collection_freqs", "posting_offsets",
+            "postings", "end")
+
+
+# ===================== VARIABLE-BYTE =====================
+
+def vbyte_lengths(values):
+    """Jumlah byte per angka (minimal 1)"""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        lengths += values >= (1 << shift)
+    return lengths
+
+
+def vbyte_encode(values):
+    """Array integer non-negatif → bytes variable-byte"""
+    values = np.asarray(values, dtype=np.uint64)
+    if len(values) == 0:
+        return b""
+    lengths = vbyte_lengths(values)
+    starts = np.cumsum(lengths) - lengths
+    out = np.zeros(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max())):
+        mask = lengths > k
+        out[starts[mask] + k] = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+    out[starts + lengths - 1] |= 0x80
+    return out.tobytes()
+
+
+def vbyte_decode(data):
+    """bytes / uint8 array variable-byte → array int64"""
+    data = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(data & 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # posisi byte di dalam angkanya → shift 7 * posisi
+    group = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    shifts = (np.arange(len(data)) - starts[group]) * 7
+    parts = (data & 0x7F).astype(np.int64) << shifts
+    return np.add.reduceat(parts, starts)
+
+
+# ===================== WRITER =====================
+
+def _string_table(strings):
+    """(offset u32 array, blob) untuk list string"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def _postings_values(postings):
+    """[gap term 1..., tf term 1..., gap term 2..., ...] sebagai satu array int64"""
+    chunks = []
+    for numbers, tfs in postings:
+        chunks.append(np.diff(np.asarray(numbers, dtype=np.int64), prepend=0))
+        chunks.append(np.asarray(tfs, dtype=np.int64))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+
+
+def _norm_squares(doc_lengths):
+    """Akumulator kuadrat bobot TF-IDF per dokumen (kosong untuk run tanpa tabel dokumen)"""
+    return np.zeros(len(doc_lengths), dtype=np.float64)
+
+
+def _add_norm_squares(squares, doc_lengths, postings):
+    """Tambahkan kuadrat bobot postings (list (numbers, tfs) per term) ke squares"""
+    if not len(squares) or not postings:
+        return
+    doc_freqs = [len(numbers) for numbers, _ in postings]
+    numbers = np.concatenate([np.asarray(n, dtype=np.int64) for n, _ in postings])
+    tfs = np.concatenate([np.asarray(t, dtype=np.int64) for _, t in postings])
+    # add.at menjumlah berurutan per posting → hasil sama persis untuk satu batch maupun banyak batch
+    np.add.at(squares, numbers, squared_weights(doc_freqs, numbers, tfs, doc_lengths))
+
+
+def _doc_sections(doc_lengths, squares):
+    """Section norms: (TF-IDF L2 f32, faktor panjang BM25 f32, doc stats f64)"""
+    doc_lengths = np.asarray(doc_lengths, dtype=np.uint32)
+    avgdl = float(doc_lengths.sum()) / len(doc_lengths) if len(doc_lengths) else 0.0
+    stats = np.asarray((avgdl,) + weighting_config(), dtype=np.float64)
+    return (np.sqrt(squares).astype(np.float32).tobytes(),
+            bm25_length_norms(doc_lengths, avgdl).astype(np.float32).tobytes(),
+            stats.tobytes())
+
+
+def _write_index_file(path, doc_ids, doc_lengths, squares, terms, doc_freqs, posting_offsets, blob,
+                      collection_freqs=()):
+    """
+    Susun file index: header + section (masing-masing di-align 8 byte).
+    squares: kuadrat bobot TF-IDF per dokumen (lihat _add_norm_squares)
+    blob: bytes postings, atau file object yang di-copy streaming ke file index
+    collection_freqs: df sebelum pruning (kosong kalau postings lengkap)
+    """
+    doc_offsets, doc_blob = _string_table(doc_ids)
+    term_blocks, term_blob = encode_terms(terms, BLOCK_SIZE)
+    sections = [doc_offsets.tobytes(), doc_blob, np.asarray(doc_lengths, dtype=np.uint32).tobytes(),
+                *_doc_sections(doc_lengths, squares),
+                term_blocks.tobytes(), term_blob, np.asarray(doc_freqs, dtype=np.uint32).tobytes(),
+                vbyte_encode(np.asarray(collection_freqs, dtype=np.int64) - doc_freqs)
+                if len(collection_freqs) else b"",
+                np.asarray(posting_offsets, dtype=np.uint64).tobytes()]
+    blob_size = int(posting_offsets[-1]) if len(posting_offsets) else 0
+
+    # Setiap section di-align 8 byte supaya bisa langsung di-view sebagai array
+    offsets, position, body = [], HEADER.size, []
+    for section_size, section in [(len(s), s) for s in sections] + [(blob_size, None)]:
+        padding = -position % 8
+        body.append(b"\x00" * padding)
+        position += padding
+        offsets.append(position)
+        if section is not None:
+            body.append(section)
+        position += section_size
+    offsets.append(position)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(doc_ids), len(terms), BLOCK_SIZE, *offsets))
+        f.writelines(body)
+        if isinstance(blob, (bytes, bytearray)):
+            f.write(blob)
+        else:
+            shutil.copyfileobj(blob, f)
+
+
+def _encode_postings(postings):
+    """(df u32 per term, offset byte u64[n_terms + 1], blob vbyte) dari (numbers, tfs) per term"""
+    doc_freqs = np.fromiter((len(numbers) for numbers, _ in postings), dtype=np.uint32, count=len(postings))
+    values = _postings_values(postings)
+
+    # Offset byte per term = cumsum panjang vbyte setiap angka, dipotong per 2 * df
+    value_ends = np.cumsum(vbyte_lengths(values))
+    term_value_ends = np.cumsum(doc_freqs.astype(np.int64) * 2)
+    posting_offsets = np.zeros(len(postings) + 1, dtype=np.uint64)
+    has_values = term_value_ends > 0
+    posting_offsets[1:][has_values] = value_ends[term_value_ends[has_values] - 1]
+    return doc_freqs, posting_offsets, vbyte_encode(values)
+
+
+def write_postings(path, doc_ids, doc_lengths, terms, postings):
+    """
+    Tulis index binary dari postings yang sudah berupa array.
+
+    doc_ids / doc_lengths: per doc number (urutan corpus / segment); kosong untuk
+    run sementara streaming build (norms tidak ditulis)
+    terms: term terurut; postings: (doc numbers terurut, term freqs) per term
+    """
+    doc_freqs, posting_offsets, blob = _encode_postings(postings)
+    squares = _norm_squares(doc_lengths)
+    _add_norm_squares(squares, doc_lengths, postings)
+    _write_index_file(path, doc_ids, doc_lengths, squares, terms, doc_freqs, posting_offsets, blob)
+
+
+def write_pruned_index(path, index, postings):
+    """
+    Tulis index hasil static pruning (utils/pruning.py).
+
+    index: BinaryIndex lengkap; postings: (doc numbers terurut, term freqs) per
+    term id index (boleh kosong). Semua term, df koleksi, panjang dokumen dan
+    norms disalin dari index, jadi postings yang tersisa diberi skor yang sama
+    persis dengan di index lengkap.
+    """
+    doc_freqs, posting_offsets, blob = _encode_postings(postings)
+    squares = index.doc_norms.astype(np.float64) ** 2
+    _write_index_file(path, index.doc_ids, index.doc_lengths, squares, index.terms(), doc_freqs,
+                      posting_offsets, blob, collection_freqs=index.collection_freqs)
+
+
+class PostingsWriter:
+    """
+    Writer index binary term demi term (untuk external merge).
+
+    Postings di-encode per batch ke file sementara, jadi memory hanya
+    sebesar term dictionary + satu batch + norms per dokumen; close()
+    menyusun file final yang identik byte-per-byte dengan write_postings().
+    doc_lengths (panjang setiap dokumen) harus sudah lengkap sebelum add().
+    """
+
+    def __init__(self, path, doc_lengths, flush_values=1 << 20):
+        self.path = path
+        self.doc_lengths = doc_lengths
+        self._squares = _norm_squares(doc_lengths)
+        self.flush_values = flush_values
+        self.terms = []
+        self.doc_freqs = []
+        self._ends = [0]
+        self._pending, self._pending_values = [], 0
+        self._blob = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+
+    def add(self, term, numbers, tfs):
+        """Tambah postings satu term (term harus datang terurut)"""
+        self.terms.append(term)
+        self.doc_freqs.append(len(numbers))
+        self._pending.append((numbers, tfs))
+        self._pending_values += 2 * len(numbers)
+        if self._pending_values >= self.flush_values:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        values = _postings_values(self._pending)
+        value_ends = np.cumsum(vbyte_lengths(values))
+        term_value_ends = np.cumsum([2 * len(numbers) for numbers, _ in self._pending])
+        base = self._ends[-1]
+        self._ends.extend(
+            (base + int(value_ends[end - 1]) if end else base) for end in term_value_ends.tolist()
+        )
+        self._blob.write(vbyte_encode(values))
+        _add_norm_squares(self._squares, self.doc_lengths, self._pending)
+        self._pending, self._pending_values = [], 0
+
+    def close(self, doc_ids):
+        self._flush()
+        self._blob.seek(0)
+        try:
+            _write_index_file(self.path, doc_ids, self.doc_lengths, self._squares, self.terms,
+                              self.doc_freqs, np.asarray(self._ends, dtype=np.uint64), self._blob)
+        finally:
+            self._blob.close()
+
+
+def write_binary_index(path, inverted_index, doc_ids, doc_lengths):
+    """
+    Tulis inverted index ke format binary.
+
+    inverted_index: {term: {"doc_ids": [...], "doc_count": n, "term_freq": {doc_id: tf}}}
+    doc_ids: semua doc id dalam urutan corpus (posisi = doc number)
+    doc_lengths: jumlah token per dokumen (urutan sama dengan doc_ids)
+    """
+    doc_numbers = {doc_id: number for number, doc_id in enumerate(doc_ids)}
+    terms = sorted(inverted_index)
+    postings = []
+    for term in terms:
+        posting = inverted_index[term]
+        numbers = np.fromiter((doc_numbers[d] for d in posting["doc_ids"]), dtype=np.int64)
+        tfs = np.fromiter((posting["term_freq"][d] for d in posting["doc_ids"]), dtype=np.int64)
+        order = np.argsort(numbers, kind="stable")
+        postings.append((numbers[order], tfs[order]))
+    write_postings(path, doc_ids, doc_lengths, terms, postings)
+
+
+# ===================== READER =====================
+
+class BinaryIndex:
+    """
+    Reader memory-mapped untuk inverted_index.bin.
+    Hanya tabel offset yang di-view sebagai array; postings di-decode per term saat dibutuhkan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.n_docs, self.n_terms, block_size, *offsets = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary inverted index")
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary index version {version} (expected {VERSION})")
+        self._sections = dict(zip(SECTIONS, offsets))
+
+        self._doc_offsets = self._array("doc_offsets", np.uint32, self.n_docs + 1)
+        self.doc_lengths = self._array("doc_lengths", np.uint32, self.n_docs)
+        self.doc_norms = self._array("doc_norms", np.float32, self.n_docs)
+        self.bm25_norms = self._array("bm25_norms", np.float32, self.n_docs)
+        stats = self._array("doc_stats", np.float64, 5).tolist()
+        self.avgdl, self.weighting = stats[0], tuple(stats[1:])
+        n_blocks = -(-self.n_terms // block_size)
+        self._terms = TermDictionary(self._mm, self._array("term_blocks", np.uint32, n_blocks + 1),
+                                     self.n_terms, block_size, base=self._sections["term_blob"])
+        self.doc_freqs = self._array("doc_freqs", np.uint32, self.n_terms)
+        # Index hasil pruning menyimpan df koleksi terpisah dari jumlah postings
+        self.pruned = self._sections["collection_freqs"] != self._sections["posting_offsets"]
+        self.collection_freqs = self._collection_freqs() if self.pruned else self.doc_freqs
+        self._posting_offsets = self._array("posting_offsets", np.uint64, self.n_terms + 1)
+        self._doc_ids = None
+        self._doc_numbers = None
+
+    def _array(self, section, dtype, count):
+        return np.frombuffer(self._mm, dtype=dtype, count=count, offset=self._sections[section])
+
+    def _collection_freqs(self):
+        """df koleksi index hasil pruning = jumlah postings + selisih (vbyte, tanpa padding section)"""
+        start = self._sections["collection_freqs"]
+        data = np.frombuffer(self._mm, dtype=np.uint8, count=self._sections["posting_offsets"] - start,
+                             offset=start)
+        data = data[:np.flatnonzero(data & 0x80)[self.n_terms - 1] + 1]
+        return self.doc_freqs.astype(np.int64) + vbyte_decode(data)
+
+    # ----- terms -----
+
+    def term(self, term_id):
+        return self._terms.term(term_id)
+
+    def term_id(self, term):
+        """Binary search di block index, lalu satu block di-decode; None kalau term tidak ada"""
+        return self._terms.term_id(term)
+
+    def terms(self):
+        """Semua term (terurut)"""
+        return self._terms.terms()
+
+    def __len__(self):
+        return self.n_terms
+
+    def __contains__(self, term):
+        return self.term_id(term) is not None
+
+    # ----- documents -----
+
+    @property
+    def doc_ids(self):
+        """Doc id string per doc number (di-decode sekali)"""
+        if self._doc_ids is None:
+            blob = self._mm[self._sections["doc_blob"]:self._sections["doc_lengths"]]
+            offsets = self._doc_offsets.tolist()
+            self._doc_ids = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self.n_docs)]
+        return self._doc_ids
+
+    def doc_number(self, doc_id):
+        if self._doc_numbers is None:
+            self._doc_numbers = {d: n for n, d in enumerate(self.doc_ids)}
+        return self._doc_numbers[doc_id]
+
+    # ----- postings -----
+
+    def doc_freq(self, term):
+        """Document frequency koleksi (sebelum pruning) untuk IDF"""
+        term_id = self.term_id(term)
+        return 0 if term_id is None else int(self.collection_freqs[term_id])
+
+    def postings_by_id(self, term_id):
+        """(doc numbers, term freqs) sebagai array int64"""
+        base = self._sections["postings"]
+        start = base + int(self._posting_offsets[term_id])
+        end = base + int(self._posting_offsets[term_id + 1])
+        values = vbyte_decode(np.frombuffer(self._mm, dtype=np.uint8, count=end - start, offset=start))
+        df = int(self.doc_freqs[term_id])
+        return np.cumsum(values[:df]), values[df:]
+
+    def postings(self, term):
+        """(doc numbers, term freqs) untuk term; array kosong kalau term tidak ada"""
+        term_id = self.term_id(term)
+        if term_id is None:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return self.postings_by_id(term_id)
+
+    def all_postings(self):
+        """
+        Semua postings sekaligus (satu decode vectorized untuk seluruh blob):
+        (term id, doc number, term freq) per posting, urut term lalu doc number
+        """
+        base = self._sections["postings"]
+        size = int(self._posting_offsets[-1])
+        values = vbyte_decode(np.frombuffer(self._mm, dtype=np.uint8, count=size, offset=base))
+        doc_freqs = self.doc_freqs.astype(np.int64)
+
+        # Per term: df gap lalu df tf → pisahkan dengan posisi di dalam term
+        value_term = np.repeat(np.arange(self.n_terms), 2 * doc_freqs)
+        value_starts = np.cumsum(2 * doc_freqs) - 2 * doc_freqs
+        is_gap = np.arange(len(values)) - value_starts[value_term] < doc_freqs[value_term]
+        gaps, tfs = values[is_gap], values[~is_gap]
+
+        # Gap → doc number: cumsum global dikurangi cumsum sebelum term dimulai
+        term_ids = np.repeat(np.arange(self.n_terms), doc_freqs)
+        cumulative = np.cumsum(gaps)
+        posting_starts = np.cumsum(doc_freqs) - doc_freqs
+        before = np.concatenate(([0], cumulative))[posting_starts]
+        return term_ids, cumulative - before[term_ids], tfs
+
+    def to_dict(self):
+        """Struktur lama inverted_index.json (term urut alfabet)"""
+        doc_ids = self.doc_ids
+        inverted_index = {}
+        for term_id, term in enumerate(self.terms()):
+            numbers, tfs = self.postings_by_id(term_id)
+            ids = [doc_ids[n] for n in numbers.tolist()]
+            inverted_index[term] = {
+                "doc_ids": ids,
+                "doc_count": len(ids),
+                "term_freq": dict(zip(ids, tfs.tolist()))
+            }
+        return inverted_index
+
+    def close(self):
+        # Array view harus dilepas sebelum mmap ditutup
+        self._doc_offsets = self.doc_lengths = self.doc_norms = self.bm25_norms = None
+        self._terms.close()
+        self.doc_freqs = self.collection_freqs = self._posting_offsets = None
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,255 @@
+"""
+Single-scan index builder
+
+Membaca setiap dokumen SEKALI (satu read CSV, satu tokenize per dokumen)
+dan mengisi semua struktur index sekaligus:
+- inverted index + vocabulary  (sama dengan step 1)
+- term counts per dokumen      → TF-IDF (sama dengan step 2, tanpa tokenize ulang)
+- document index               (sama dengan step 3)
+- statistik                    (streaming aggregates, diisi selama build)
+
+Output file identik byte-per-byte dengan menjalankan step 1-4 satu per satu.
+
+Mode paralel: corpus dipecah menjadi shard berurutan, setiap shard di-index
+di process pool, lalu partial index digabung dengan k-way merge (term
+terurut) + IDF global. Hasil merge identik byte-per-byte dengan build serial.
+"""
+import sys
+import os
+import heapq
+import itertools
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    INPUT_FILE, TEXT_COLUMN, VERBOSE,
+    INDEX_WORKERS, PARALLEL_MIN_DOCUMENTS
+)
+from utils.text_processor import tokenize
+from steps.step1_build_inverted_index import save_inverted_index
+from steps.step2_calculate_tfidf import count_matrix, tfidf_weights, tfidf_metadata, save_tfidf_matrix
+from steps.step3_build_document_index import document_entry, print_source_counts, save_document_index
+from steps.step4_generate_statistics import print_statistics, save_statistics
+from utils.streaming_stats import StatisticsAccumulator
+
+
+def read_documents(input_file=INPUT_FILE):
+    """Baca corpus sekali, return (list row dict, kolom yang tersedia)"""
+    df = pd.read_csv(input_file, encoding='utf-8')
+    return df.to_dict('records'), list(df.columns)
+
+
+def split_shards(rows, n_shards):
+    """Bagi rows menjadi n_shards potongan berurutan (ukuran hampir sama)"""
+    size, extra = divmod(len(rows), n_shards)
+    shards, start = [], 0
+    for i in range(n_shards):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(rows[start:end])
+        start = end
+    return shards
+
+
+def _build_shard(args):
+    """Worker process: index satu shard, return partial index untuk merge"""
+    rows, columns = args
+    builder = IndexBuilder()
+    for row in rows:
+        builder.add_document(row, columns)
+    return builder.shard_run()
+
+
+def merge_shards(runs):
+    """
+    K-way merge partial index (urutan shard = urutan dokumen di corpus).
+
+    Setiap run berisi term terurut + posisi kemunculan pertama term di shard,
+    jadi postings cukup disambung per term, lalu urutan term dikembalikan ke
+    urutan kemunculan pertama di corpus (sama seperti build serial).
+    """
+    builder = IndexBuilder()
+    # list (bukan generator): shard_no harus terikat per stream
+    streams = [
+        [(term, shard_no, rank, posting) for term, rank, posting in run["terms"]]
+        for shard_no, run in enumerate(runs)
+    ]
+
+    merged = []
+    for term, group in itertools.groupby(
+        heapq.merge(*streams, key=lambda item: (item[0], item[1])),
+        key=lambda item: item[0]
+    ):
+        group = list(group)
+        _, shard_no, rank, _ = group[0]
+        posting = {"doc_ids": [], "doc_count": 0, "term_freq": {}}
+        for _, _, _, part in group:
+            posting["doc_ids"].extend(part["doc_ids"])
+            posting["doc_count"] += part["doc_count"]
+            posting["term_freq"].update(part["term_freq"])
+        merged.append(((shard_no, rank), sys.intern(term), posting))
+
+    merged.sort(key=lambda item: item[0])
+    builder.inverted_index = {term: posting for _, term, posting in merged}
+
+    for run in runs:
+        for doc_id, term_counts, doc_length in run["doc_terms"]:
+            term_counts = {sys.intern(term): count for term, count in term_counts.items()}
+            builder.doc_terms.append((doc_id, term_counts, doc_length))
+        builder.document_index.update(run["document_index"])
+        builder.stats.merge_documents(run["stats"])
+        builder.total_documents += run["total_documents"]
+        builder.total_terms += run["total_terms"]
+
+    return builder
+
+
+class IndexBuilder:
+    """Accumulator index: add_document() untuk setiap dokumen, lalu stage build di bawah"""
+
+    def __init__(self):
+        self.inverted_index = {}
+        self.document_index = {}
+        # (doc_id, term_counts, doc_length) per dokumen, urutan sesuai corpus
+        self.doc_terms = []
+        self.total_documents = 0
+        self.total_terms = 0
+        # Statistik diisi selama build (streaming aggregates, lihat utils/streaming_stats.py)
+        self.stats = StatisticsAccumulator()
+
+        self.terms = None
+        self.idf = None
+        self.tfidf_matrix = None
+        self.statistics = None
+
+    def add_document(self, row, columns):
+        """Tokenize satu dokumen dan update semua struktur"""
+        doc_id = row['id']
+        # intern: satu object string per term di seluruh index (hemat memory,
+        # dan isi pickle tidak bergantung pada dari mana string berasal)
+        terms = [sys.intern(term) for term in tokenize(row[TEXT_COLUMN])]
+        term_counts = Counter(terms)
+
+        for term, count in term_counts.items():
+            posting = self.inverted_index.get(term)
+            if posting is None:
+                posting = self.inverted_index[term] = {
+                    "doc_ids": [],
+                    "doc_count": 0,
+                    "term_freq": {}
+                }
+            posting["doc_ids"].append(doc_id)
+            posting["doc_count"] += 1
+            posting["term_freq"][doc_id] = count
+
+        self.doc_terms.append((doc_id, term_counts, len(terms)))
+        entry = self.document_index[doc_id] = document_entry(row, columns)
+        self.stats.add_document(entry)
+        self.total_documents += 1
+        self.total_terms += len(terms)
+
+    def shard_run(self):
+        """Partial index untuk merge_shards: term terurut + rank kemunculan pertama"""
+        terms = [
+            (term, rank, posting)
+            for rank, (term, posting) in enumerate(self.inverted_index.items())
+        ]
+        terms.sort(key=lambda item: item[0])
+        return {
+            "terms": terms,
+            "doc_terms": self.doc_terms,
+            "document_index": self.document_index,
+            "stats": self.stats,
+            "total_documents": self.total_documents,
+            "total_terms": self.total_terms,
+        }
+
+    @property
+    def vocabulary(self):
+        return sorted(self.inverted_index)
+
+    # ===================== BUILD STAGES =====================
+
+    def scan(self, input_file=INPUT_FILE, workers=None):
+        """
+        Read + tokenize seluruh corpus (satu-satunya pass atas data).
+        workers=None → INDEX_WORKERS, tapi serial kalau corpus < PARALLEL_MIN_DOCUMENTS
+        """
+        print(f"\n📂 Loading: {input_file}")
+        rows, columns = read_documents(input_file)
+        print(f"✅ Loaded {len(rows)} documents")
+
+        if workers is None:
+            # Corpus kecil: overhead process pool lebih besar dari hasilnya
+            workers = INDEX_WORKERS if len(rows) >= PARALLEL_MIN_DOCUMENTS else 1
+        workers = max(1, min(workers, len(rows)))
+        if workers > 1:
+            self.scan_parallel(rows, columns, workers)
+        else:
+            print(f"\n🔨 Scanning documents (tokenize once)...")
+            for idx, row in enumerate(rows):
+                self.add_document(row, columns)
+                if VERBOSE and (idx + 1) % 50 == 0:
+                    print(f"   ✓ Processed {idx + 1}/{len(rows)} documents")
+
+        print(f"\n✅ Scan completed!")
+        print(f"   📊 Total unique terms: {len(self.inverted_index)}")
+        print(f"   📊 Total terms processed: {self.total_terms}")
+        if self.total_documents:
+            print(f"   📊 Avg terms per document: {self.total_terms / self.total_documents:.1f}")
+
+    def scan_parallel(self, rows, columns, workers):
+        """Index shard di process pool, lalu k-way merge ke builder ini"""
+        print(f"\n🔨 Scanning documents in {workers} shards (process pool)...")
+        shards = split_shards(rows, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            runs = list(pool.map(_build_shard, [(shard, columns) for shard in shards]))
+        for shard_no, run in enumerate(runs, 1):
+            print(f"   ✓ Shard {shard_no}/{workers}: {run['total_documents']} documents, {len(run['terms'])} terms")
+
+        print(f"   🔀 Merging {len(runs)} shards...")
+        merged = merge_shards(runs)
+        self.inverted_index = merged.inverted_index
+        self.doc_terms = merged.doc_terms
+        self.document_index = merged.document_index
+        self.stats = merged.stats
+        self.total_documents = merged.total_documents
+        self.total_terms = merged.total_terms
+
+    def calculate_tfidf(self):
+        """TF-IDF (CSR, kolom = term terurut) dari term counts yang sudah dikumpulkan saat scan"""
+        self.terms = self.vocabulary
+        counts = count_matrix(
+            [term_counts for _, term_counts, _ in self.doc_terms],
+            {term: column for column, term in enumerate(self.terms)}
+        )
+        self.tfidf_matrix, self.idf = tfidf_weights(
+            counts, [doc_length for _, _, doc_length in self.doc_terms]
+        )
+        self.stats.add_terms(self.terms, np.bincount(counts.indices, minlength=len(self.terms)), self.idf)
+        self.stats.add_tfidf_scores(self.tfidf_matrix.data)
+
+        print(f"\n✅ TF-IDF calculated for {self.tfidf_matrix.shape[0]} documents, {len(self.idf)} terms")
+
+    def save(self):
+        """Tulis inverted index, vocabulary, TF-IDF matrix dan document index"""
+        doc_ids = [doc_id for doc_id, _, _ in self.doc_terms]
+        doc_lengths = [doc_length for _, _, doc_length in self.doc_terms]
+        save_inverted_index(self.inverted_index, self.vocabulary, doc_ids, doc_lengths)
+        save_tfidf_matrix(self.tfidf_matrix, self.idf, self.terms, doc_ids)
+        print_source_counts(self.document_index)
+        save_document_index(self.document_index)
+
+    def generate_statistics(self):
+        """Statistik sudah dikumpulkan selama scan + TF-IDF; di sini hanya finalisasi"""
+        self.statistics = self.stats.result(tfidf_metadata(self.total_documents, len(self.idf)))
+        print_statistics(self.statistics)
+        save_statistics(self.statistics)
+
+    def close(self):
+        """Tidak ada file sementara (lihat StreamingIndexBuilder.close)"""
@@ -0,0 +1,92 @@
+"""
+Static index pruning: buang postings yang hampir tidak pernah masuk top-k
+
+Impact satu posting = kontribusi skor BM25-nya (idf koleksi * saturasi tf
+dengan faktor panjang dokumen yang tersimpan di index), sama dengan yang
+dihitung IndexSnapshot.bm25_scores saat query.
+
+- term-centric (Carmel et al.): per term, postings dengan impact terendah
+  dibuang sebanyak `ratio` dari df-nya, tapi PRUNE_KEEP_TOP postings teratas
+  setiap term selalu disimpan (top-k query satu term tidak berubah)
+- document-centric (Büttcher & Clarke): per dokumen, term dengan impact
+  terendah dibuang sebanyak `ratio` dari jumlah term unik dokumen tsb
+  (minimal satu term per dokumen tetap disimpan)
+
+Index hasil pruning tetap menyimpan df koleksi dan norms index lengkap
+(utils/binary_index.write_pruned_index), jadi yang berubah hanya postings.
+"""
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import PRUNE_KEEP_TOP, BM25_K1
+
+PRUNE_METHODS = ("term", "document")
+
+
+def posting_impacts(index, term_ids, numbers, tfs):
+    """Kontribusi skor BM25 setiap posting (statistik koleksi index ini)"""
+    doc_freqs = index.collection_freqs.astype(np.float64)
+    idf = np.log(1 + (index.n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+    tfs = tfs.astype(np.float64)
+    return idf[term_ids] * tfs * (BM25_K1 + 1) / (tfs + index.bm25_norms[numbers])
+
+
+def _lowest_in_groups(groups, impacts, n_groups, drop_counts):
+    """
+    Mask posting yang dibuang: per group, drop_counts[group] posting dengan impact
+    terendah (impact sama: posting yang datang belakangan dibuang lebih dulu)
+    """
+    order = np.lexsort((-np.arange(len(impacts)), impacts, groups))
+    group_starts = np.concatenate(([0], np.cumsum(np.bincount(groups, minlength=n_groups))[:-1]))
+    rank = np.empty(len(impacts), dtype=np.int64)
+    rank[order] = np.arange(len(impacts)) - group_starts[groups[order]]
+    return rank < drop_counts[groups]
+
+
+def prune_mask(index, method, ratio, keep_top=PRUNE_KEEP_TOP):
+    """
+    (term ids, doc numbers, term freqs, mask posting yang disimpan) untuk seluruh
+    postings index (urut term lalu doc number, lihat BinaryIndex.all_postings)
+    """
+    if method not in PRUNE_METHODS:
+        raise ValueError(f"Unknown pruning method {method!r} (expected one of {PRUNE_METHODS})")
+    if not 0 <= ratio < 1:
+        raise ValueError(f"Pruning ratio must be in [0, 1), got {ratio}")
+
+    term_ids, numbers, tfs = index.all_postings()
+    impacts = posting_impacts(index, term_ids, numbers, tfs)
+    if method == "term":
+        sizes = index.doc_freqs.astype(np.int64)
+        drop = np.minimum(np.floor(sizes * ratio).astype(np.int64), np.maximum(sizes - keep_top, 0))
+        dropped = _lowest_in_groups(term_ids, impacts, index.n_terms, drop)
+    else:
+        sizes = np.bincount(numbers, minlength=index.n_docs)
+        drop = np.minimum(np.floor(sizes * ratio).astype(np.int64), np.maximum(sizes - 1, 0))
+        dropped = _lowest_in_groups(numbers, impacts, index.n_docs, drop)
+    return term_ids, numbers, tfs, ~dropped
+
+
+def pruned_postings(index, method, ratio, keep_top=PRUNE_KEEP_TOP):
+    """Postings (doc numbers, term freqs) per term id setelah pruning"""
+    term_ids, numbers, tfs, keep = prune_mask(index, method, ratio, keep_top)
+    term_ids, numbers, tfs = term_ids[keep], numbers[keep], tfs[keep]
+    bounds = np.searchsorted(term_ids, np.arange(index.n_terms + 1))
+    return [(numbers[bounds[t]:bounds[t + 1]], tfs[bounds[t]:bounds[t + 1]]) for t in range(index.n_terms)]
+
+
+def pruning_summary(index, postings):
+    """Jumlah postings sebelum / sesudah pruning"""
+    before = int(index.doc_freqs.sum())
+    after = sum(len(numbers) for numbers, _ in postings)
+    return {
+        "postings_before": before,
+        "postings_after": after,
+        "postings_removed_ratio": round(1 - after / before, 4) if before else 0.0,
+        "empty_terms": sum(1 for numbers, _ in postings if not len(numbers)),
+    }
+
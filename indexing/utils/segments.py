@@ -0,0 +1,1044 @@
+"""
+Segment-based index (incremental indexing)
+
+Index = daftar segment immutable di manifest (segments/manifest.json):
+- "base"      : hasil full build (inverted_index.bin + document_index.json)
+- seg_000001… : batch artikel baru, masing-masing satu file postings binary
+                (format sama dengan inverted_index.bin) + satu file metadata JSON
+
+Menambah artikel hanya meng-index batch tersebut menjadi segment baru, jadi
+biayanya sebanding dengan ukuran batch, bukan ukuran corpus. Query membaca
+semua segment dengan statistik global (N, df, avgdl dijumlahkan lintas segment).
+
+Tiered merge: segment dikelompokkan per tier ukuran (kelipatan MERGE_FACTOR
+dari SEGMENT_TIER_DOCS dokumen); kalau satu tier berisi >= MERGE_FACTOR
+segment, segment tsb digabung menjadi satu segment di tier berikutnya.
+Merge berjalan di background (SegmentMerger) dan hanya mengganti manifest
+secara atomic, jadi reader yang sedang berjalan tidak terganggu.
+
+Delete / update: dokumen ditandai di tombstone bitmap per segment (file
+<segment>.<generation>.del, 1 bit per dokumen) dan dilewati oleh scorer.
+Compaction menulis ulang segment tanpa dokumen mati setelah rasio tombstone
+>= COMPACT_TOMBSTONE_RATIO, sehingga N, df dan avgdl ikut diperbarui.
+
+Full build (run_all_steps.py / step 1) menulis ulang base dan me-reset segment.
+
+Source shards: build_shards() meng-index corpus sebagai satu segment per
+source (entry manifest diberi "source"), menggantikan base. Shard satu source
+bisa di-build ulang sendiri tanpa menyentuh shard lain; shard tidak ikut
+tiered merge (hanya compaction), jadi partisi per source tetap terjaga.
+
+Query: SegmentedIndex memegang IndexSnapshot (satu generasi manifest yang
+sudah dibuka, reference counted) yang menyediakan BM25 dan TF-IDF (cosine) di
+atas postings yang sama; search engine di implementation/search_engine memakai
+reader ini, satu snapshot per query.
+Scatter-gather: skor dan top-k lokal dihitung per segment (paralel di thread
+pool kalau index >= PARALLEL_MIN_QUERY_DOCS dokumen), lalu top-k per segment
+digabung dengan heap merge.
+"""
+import fcntl
+import heapq
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from scipy import sparse
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    INDEX_DIR, INVERTED_INDEX_FILE, DOCUMENT_INDEX_FILE, SEGMENTS_DIR, SEGMENT_MANIFEST_FILE,
+    MERGE_FACTOR, SEGMENT_TIER_DOCS, MERGE_INTERVAL, COMPACT_TOMBSTONE_RATIO,
+    QUERY_WORKERS, PARALLEL_MIN_QUERY_DOCS, BM25_K1, BM25_B, INDEX_BIGRAMS, VERBOSE
+)
+from utils.binary_index import BinaryIndex, write_binary_index, write_postings
+from utils.text_processor import add_bigrams, preprocess_query
+from utils.weighting import compute_idf, tf_weights, bm25_length_norms, weighting_config
+
+BASE_SEGMENT = {
+    "name": "base",
+    "postings": os.path.relpath(INVERTED_INDEX_FILE, INDEX_DIR),
+    "documents": os.path.relpath(DOCUMENT_INDEX_FILE, INDEX_DIR),
+}
+
+MANIFEST_LOCK = os.path.join(SEGMENTS_DIR, ".manifest.lock")
+MERGE_LOCK = os.path.join(SEGMENTS_DIR, ".merge.lock")
+
+
+# ===================== MANIFEST =====================
+
+@contextmanager
+def _file_lock(path):
+    """Lock antar process (flock) untuk read-modify-write manifest / merge"""
+    os.makedirs(SEGMENTS_DIR, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _path(relative):
+    return os.path.join(INDEX_DIR, relative)
+
+
+def read_manifest():
+    """Manifest saat ini; kalau belum ada → hanya base (kalau base sudah di-build)"""
+    if os.path.exists(SEGMENT_MANIFEST_FILE):
+        with open(SEGMENT_MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    segments = [dict(BASE_SEGMENT)] if os.path.exists(INVERTED_INDEX_FILE) else []
+    return {"generation": 0, "next_id": 1, "segments": segments}
+
+
+def _write_manifest(manifest):
+    """Tulis manifest secara atomic (tmp + rename); dipanggil dengan MANIFEST_LOCK"""
+    os.makedirs(SEGMENTS_DIR, exist_ok=True)
+    manifest["generation"] += 1
+    tmp = SEGMENT_MANIFEST_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, SEGMENT_MANIFEST_FILE)
+
+
+def _remove_file(relative):
+    if relative:
+        try:
+            os.remove(_path(relative))
+        except FileNotFoundError:
+            pass
+
+
+def _remove_segment_files(segment):
+    """Hapus file segment + tombstone (file postings/dokumen base tidak pernah dihapus)"""
+    _remove_file(segment.get("tombstones"))
+    if segment["name"] != BASE_SEGMENT["name"]:
+        _remove_file(segment["postings"])
+        _remove_file(segment["documents"])
+
+
+def reset_segments():
+    """
+    Setelah full build: base sudah berisi seluruh corpus, segment lama dibuang.
+    Full build meng-index CSV apa adanya, jadi daftar deleted_ids ikut dikosongkan.
+    """
+    with _file_lock(MANIFEST_LOCK):
+        manifest = read_manifest()
+        for segment in manifest["segments"]:
+            _remove_segment_files(segment)
+        manifest["segments"] = [dict(BASE_SEGMENT)]
+        manifest.pop("deleted_ids", None)
+        _write_manifest(manifest)
+
+
+def publish_base():
+    """Base ditulis ulang di tempat (static pruning): naikkan generation supaya reader me-reload"""
+    with _file_lock(MANIFEST_LOCK):
+        _write_manifest(read_manifest())
+
+
+def segment_docs(segment):
+    """Jumlah dokumen segment (dari header file postings)"""
+    with BinaryIndex(_path(segment["postings"])) as index:
+        return index.n_docs
+
+
+def live_docs(segment):
+    """Jumlah dokumen yang belum dihapus"""
+    docs = segment.get("docs")
+    if docs is None:
+        docs = segment["docs"] = segment_docs(segment)
+    return docs - segment.get("deleted", 0)
+
+
+def segment_tier(n_docs):
+    """Tier 0: < SEGMENT_TIER_DOCS * MERGE_FACTOR dokumen, tier berikutnya x MERGE_FACTOR"""
+    if n_docs < SEGMENT_TIER_DOCS:
+        return 0
+    return int(math.log(n_docs / SEGMENT_TIER_DOCS, MERGE_FACTOR))
+
+
+# ===================== TOMBSTONES =====================
+
+def load_tombstones(segment, n_docs):
+    """Bitmap dokumen terhapus (bool array per doc number), None kalau tidak ada yang dihapus"""
+    if not segment.get("tombstones"):
+        return None
+    bits = np.fromfile(_path(segment["tombstones"]), dtype=np.uint8)
+    return np.unpackbits(bits, count=n_docs, bitorder="little").astype(bool)
+
+
+def _mark_deleted(segment, doc_ids, generation):
+    """
+    Tandai doc_ids di segment ini (dipanggil dengan MANIFEST_LOCK). File tombstone
+    tidak pernah ditimpa: bitmap baru ditulis ke file baru dan entry manifest
+    diganti, jadi reader yang masih memakai manifest lama tetap konsisten.
+    Return (jumlah dokumen yang baru ditandai, file tombstone lama).
+    """
+    with BinaryIndex(_path(segment["postings"])) as index:
+        numbers = [n for n, doc_id in enumerate(index.doc_ids) if doc_id in doc_ids]
+        if not numbers:
+            return 0, None
+        deleted = load_tombstones(segment, index.n_docs)
+        if deleted is None:
+            deleted = np.zeros(index.n_docs, dtype=bool)
+
+    marked = int((~deleted[numbers]).sum())
+    if not marked:
+        return 0, None
+    deleted[numbers] = True
+
+    old = segment.get("tombstones")
+    path = os.path.join(SEGMENTS_DIR, f"{segment['name']}.{generation}.del")
+    np.packbits(deleted, bitorder="little").tofile(path)
+    segment["tombstones"] = os.path.relpath(path, INDEX_DIR)
+    segment["deleted"] = int(deleted.sum())
+    return marked, old
+
+
+def delete_documents(doc_ids):
+    """
+    Hapus dokumen (tombstone, postings dibuang saat compaction). Return jumlah yang dihapus.
+    Doc id yang dihapus dicatat di manifest (deleted_ids): tombstone hilang saat
+    compaction, tapi build_shards dari CSV tidak boleh menghidupkannya lagi.
+    """
+    doc_ids = set(doc_ids)
+    stale, deleted = [], 0
+    with _file_lock(MANIFEST_LOCK):
+        manifest = read_manifest()
+        generation = manifest["generation"] + 1
+        live = doc_ids & indexed_doc_ids(manifest)
+        for segment in manifest["segments"]:
+            marked, old = _mark_deleted(segment, doc_ids, generation)
+            deleted += marked
+            if marked:
+                stale.append(old)
+        if deleted:
+            manifest["deleted_ids"] = sorted(set(manifest.get("deleted_ids", [])) | live)
+            _write_manifest(manifest)
+    for relative in stale:
+        _remove_file(relative)
+    return deleted
+
+
+# ===================== ADD / UPDATE =====================
+
+def indexed_doc_ids(manifest=None):
+    """Semua doc id yang ada (dan belum dihapus) di salah satu segment"""
+    manifest = manifest or read_manifest()
+    doc_ids = set()
+    for segment in manifest["segments"]:
+        with BinaryIndex(_path(segment["postings"])) as index:
+            deleted = load_tombstones(segment, index.n_docs)
+            doc_ids.update(
+                doc_id for n, doc_id in enumerate(index.doc_ids)
+                if deleted is None or not deleted[n]
+            )
+    return doc_ids
+
+
+def _new_segment(name, doc_ids, documents):
+    """Entry manifest untuk segment baru + tulis metadata dokumennya (postings ditulis caller)"""
+    os.makedirs(SEGMENTS_DIR, exist_ok=True)
+    segment = {
+        "name": name,
+        "postings": os.path.relpath(os.path.join(SEGMENTS_DIR, f"{name}.bin"), INDEX_DIR),
+        "documents": os.path.relpath(os.path.join(SEGMENTS_DIR, f"{name}.json"), INDEX_DIR),
+        "docs": len(doc_ids),
+        "created_at": round(time.time(), 3),
+    }
+    with open(_path(segment["documents"]), "w", encoding="utf-8") as f:
+        json.dump(documents, f, ensure_ascii=False)
+    return segment
+
+
+def _reserve_name():
+    with _file_lock(MANIFEST_LOCK):
+        manifest = read_manifest()
+        name = f"seg_{manifest['next_id']:06d}"
+        manifest["next_id"] += 1
+        _write_manifest(manifest)
+    return name
+
+
+def add_documents(rows, columns, replace=False):
+    """
+    Index rows (format merge-all-clean.csv) sebagai satu segment baru.
+
+    replace=False: doc id yang sudah ter-index dilewati.
+    replace=True : update — versi lama di segment lain di-tombstone pada saat
+                   yang sama dengan segment baru masuk manifest (atomic).
+    Return entry segment, None kalau tidak ada dokumen yang di-index.
+    """
+    if not replace:
+        existing = indexed_doc_ids()
+        rows = [row for row in rows if row["id"] not in existing]
+    if not rows:
+        return None
+
+    builder = index_builder.IndexBuilder()
+    for row in rows:
+        builder.add_document(row, columns)
+    doc_ids = [doc_id for doc_id, _, _ in builder.doc_terms]
+    doc_lengths = [doc_length for _, _, doc_length in builder.doc_terms]
+
+    # Nama segment diambil di bawah lock, file ditulis di luar lock
+    name = _reserve_name()
+    segment = _new_segment(name, doc_ids, builder.document_index)
+    write_binary_index(_path(segment["postings"]), builder.inverted_index, doc_ids, doc_lengths)
+
+    stale = []
+    with _file_lock(MANIFEST_LOCK):
+        manifest = read_manifest()
+        if replace:
+            generation = manifest["generation"] + 1
+            for existing in manifest["segments"]:
+                marked, old = _mark_deleted(existing, set(doc_ids), generation)
+                if marked:
+                    stale.append(old)
+        manifest["segments"].append(segment)
+        # Artikel yang pernah dihapus lalu di-index lagi secara eksplisit hidup kembali
+        if manifest.get("deleted_ids"):
+            manifest["deleted_ids"] = sorted(set(manifest["deleted_ids"]) - set(doc_ids))
+        _write_manifest(manifest)
+    for relative in stale:
+        _remove_file(relative)
+    return segment
+
+
+# ===================== SOURCE SHARDS =====================
+
+def build_shards(rows, columns, sources=None):
+    """
+    Index rows (format merge-all-clean.csv) sebagai satu shard per source.
+
+    sources: hanya source ini yang di-build (default: semua source di rows).
+    Shard lama source tsb diganti dan versi dokumennya di segment lain (base,
+    segment incremental) di-tombstone dalam satu pergantian manifest; segment
+    yang tidak punya dokumen hidup lagi (mis. base setelah semua source di-shard)
+    dibuang dari manifest. Dokumen yang sudah dihapus (deleted_ids manifest) tetap
+    ada di CSV, jadi ikut di-tombstone di shard baru. Return list entry shard baru.
+    """
+    if "source" not in columns:
+        raise ValueError("Kolom 'source' tidak ada, corpus tidak bisa di-shard per source")
+    groups = {}
+    for row in rows:
+        groups.setdefault(str(row["source"]), []).append(row)
+    if sources is not None:
+        groups = {source: groups[source] for source in sources if source in groups}
+
+    # Setiap shard ditulis di luar lock, manifest diganti sekali di akhir
+    shards, doc_ids = [], set()
+    for source, group in sorted(groups.items()):
+        start = time.time()
+        builder = index_builder.IndexBuilder()
+        for row in group:
+            builder.add_document(row, columns)
+        shard_ids = [doc_id for doc_id, _, _ in builder.doc_terms]
+        shard_lengths = [doc_length for _, _, doc_length in builder.doc_terms]
+        segment = _new_segment(_reserve_name(), shard_ids, builder.document_index)
+        segment["source"] = source
+        write_binary_index(_path(segment["postings"]), builder.inverted_index, shard_ids, shard_lengths)
+        shards.append(segment)
+        doc_ids.update(shard_ids)
+        if VERBOSE:
+            print(f"   🧩 Shard {source}: {len(shard_ids)} documents → {segment['name']} "
+                  f"in {time.time() - start:.2f}s")
+    if not shards:
+        return []
+
+    rebuilt = {segment["source"] for segment in shards}
+    stale, stale_tombstones = [], []
+    with _file_lock(MANIFEST_LOCK):
+        manifest = read_manifest()
+        generation = manifest["generation"] + 1
+        segments = []
+        for existing in manifest["segments"]:
+            if existing.get("source") in rebuilt:
+                stale.append(existing)
+                continue
+            marked, old = _mark_deleted(existing, doc_ids, generation)
+            if marked:
+                stale_tombstones.append(old)
+            if live_docs(existing) == 0:
+                stale.append(existing)
+                continue
+            segments.append(existing)
+        # Delete sebelumnya tetap berlaku di shard baru (tombstone dibawa)
+        deleted_ids = set(manifest.get("deleted_ids", []))
+        for shard in shards:
+            _mark_deleted(shard, deleted_ids, generation)
+        manifest["segments"] = segments + shards
+        _write_manifest(manifest)
+
+    for segment in stale:
+        _remove_segment_files(segment)
+    for relative in stale_tombstones:
+        _remove_file(relative)
+    return shards
+
+
+# ===================== MERGE / COMPACTION =====================
+
+def pick_merge(segments):
+    """
+    Segment di tier terendah yang penuh (>= MERGE_FACTOR segment); None kalau tidak ada.
+    Shard source tidak pernah digabung (satu shard per source).
+    """
+    tiers = {}
+    for segment in segments:
+        if segment.get("source"):
+            continue
+        tiers.setdefault(segment_tier(live_docs(segment)), []).append(segment)
+    for tier in sorted(tiers):
+        if len(tiers[tier]) >= MERGE_FACTOR:
+            return tiers[tier]
+    return None
+
+
+def pick_compaction(segments, ratio=COMPACT_TOMBSTONE_RATIO):
+    """Satu segment dengan rasio tombstone >= ratio; None kalau tidak ada"""
+    for segment in segments:
+        deleted = segment.get("deleted", 0)
+        if deleted and deleted >= ratio * (segment.get("docs") or segment_docs(segment)):
+            return [segment]
+    return None
+
+
+def rewrite_segments(segments, name):
+    """
+    K-way merge beberapa segment menjadi satu (urutan dokumen = urutan segment),
+    sekaligus membuang dokumen yang di-tombstone (compaction = rewrite satu segment).
+    Doc number dipadatkan ulang; term yang postings-nya habis ikut dibuang.
+    Return (entry segment baru atau None kalau tidak ada dokumen tersisa, tombstones yang dipakai).
+    """
+    indexes = [BinaryIndex(_path(segment["postings"])) for segment in segments]
+    used_tombstones = {segment["name"]: segment.get("tombstones") for segment in segments}
+    try:
+        doc_ids, doc_lengths, renumber = [], [], []
+        for segment, index in zip(segments, indexes):
+            deleted = load_tombstones(segment, index.n_docs)
+            live = np.ones(index.n_docs, dtype=bool) if deleted is None else ~deleted
+            # doc number lama → baru (-1 = dibuang)
+            mapping = np.full(index.n_docs, -1, dtype=np.int64)
+            mapping[live] = np.arange(int(live.sum())) + len(doc_ids)
+            renumber.append(mapping)
+            doc_ids.extend(d for d, keep in zip(index.doc_ids, live.tolist()) if keep)
+            doc_lengths.extend(index.doc_lengths[live].tolist())
+        if not doc_ids:
+            return None, used_tombstones
+
+        streams = [
+            [(term, seg_no, term_id) for term_id, term in enumerate(index.terms())]
+            for seg_no, index in enumerate(indexes)
+        ]
+        terms, postings = [], []
+        for term, group in itertools.groupby(heapq.merge(*streams), key=lambda item: item[0]):
+            numbers, tfs = [], []
+            for _, seg_no, term_id in group:
+                seg_numbers, seg_tfs = indexes[seg_no].postings_by_id(term_id)
+                seg_numbers = renumber[seg_no][seg_numbers]
+                keep = seg_numbers >= 0
+                numbers.append(seg_numbers[keep])
+                tfs.append(seg_tfs[keep])
+            numbers = np.concatenate(numbers)
+            if len(numbers):
+                terms.append(term)
+                postings.append((numbers, np.concatenate(tfs)))
+
+        live_ids = set(doc_ids)
+        documents = {}
+        for segment in segments:
+            with open(_path(segment["documents"]), "r", encoding="utf-8") as f:
+                documents.update((k, v) for k, v in json.load(f).items() if k in live_ids)
+
+        merged = _new_segment(name, doc_ids, documents)
+        if len(segments) == 1 and segments[0].get("source"):
+            # Compaction shard: hasilnya tetap shard source yang sama
+            merged["source"] = segments[0]["source"]
+        write_postings(_path(merged["postings"]), doc_ids, doc_lengths, terms, postings)
+        return merged, used_tombstones
+    finally:
+        for index in indexes:
+            index.close()
+
+
+def _replace_segments(candidates, merged, used_tombstones):
+    """
+    Ganti candidates dengan merged di manifest (posisi segment pertama).
+    Delete yang terjadi selama rewrite berjalan diterapkan ulang ke segment baru.
+    """
+    names = {segment["name"] for segment in candidates}
+    stale = []
+    with _file_lock(MANIFEST_LOCK):
+        manifest = read_manifest()
+        late_deletes = set()
+        for segment in manifest["segments"]:
+            if segment["name"] in names and segment.get("tombstones") != used_tombstones[segment["name"]]:
+                with BinaryIndex(_path(segment["postings"])) as index:
+                    deleted = load_tombstones(segment, index.n_docs)
+                    late_deletes.update(d for d, dead in zip(index.doc_ids, deleted.tolist()) if dead)
+        if merged is not None and late_deletes:
+            _mark_deleted(merged, late_deletes, manifest["generation"] + 1)
+
+        segments = []
+        for segment in manifest["segments"]:
+            if segment["name"] not in names:
+                segments.append(segment)
+                continue
+            stale.append(segment)
+            if merged is not None:
+                segments.append(merged)
+                merged = None
+        manifest["segments"] = segments
+        _write_manifest(manifest)
+
+    # Reader yang masih memegang mmap file lama tetap aman (inode belum dilepas)
+    for segment in stale:
+        _remove_segment_files(segment)
+
+
+def maybe_merge():
+    """
+    Compaction (segment dengan tombstone >= COMPACT_TOMBSTONE_RATIO) lalu tiered
+    merge, sampai tidak ada lagi yang perlu dikerjakan. Return jumlah rewrite.
+    """
+    rewrites = 0
+    with _file_lock(MERGE_LOCK):
+        while True:
+            with _file_lock(MANIFEST_LOCK):
+                segments = read_manifest()["segments"]
+            candidates = pick_compaction(segments) or pick_merge(segments)
+            if candidates is None:
+                return rewrites
+
+            start = time.time()
+            name = _reserve_name()
+            merged, used_tombstones = rewrite_segments(candidates, name)
+            _replace_segments(candidates, merged, used_tombstones)
+            rewrites += 1
+            if VERBOSE:
+                action = "Compacted" if len(candidates) == 1 else f"Merged {len(candidates)} segments"
+                source = candidates[0]["name"] if len(candidates) == 1 else ""
+                print(f"   🔀 {action} {source} → {merged['name'] if merged else '(empty)'} "
+                      f"in {time.time() - start:.2f}s")
+
+
+class SegmentMerger(threading.Thread):
+    """Background merge + compaction: cek setiap MERGE_INTERVAL detik atau saat wake()"""
+
+    def __init__(self, interval=MERGE_INTERVAL):
+        super().__init__(name="segment-merger", daemon=True)
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                maybe_merge()
+            except Exception as e:
+                print(f"[WARN] Segment merge failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+# ===================== QUERY =====================
+
+def query_terms(query, bigrams=INDEX_BIGRAMS):
+    """
+    Query → term: step 1-4 preprocessing yang sama dengan dokumen (clean, normalisasi,
+    stopwords, stemming), + bigram kata seperti tokenize() dokumen. TF-IDF dan BM25
+    memakai analisis yang sama, jadi evaluate.py membandingkan scoring saja.
+    """
+    words = preprocess_query(query).split()
+    return add_bigrams(words) if bigrams else words
+
+
+# Thread pool scatter-gather dipakai bersama semua SegmentedIndex di proses ini
+_query_executor = None
+_query_executor_lock = threading.Lock()
+
+
+def query_executor():
+    global _query_executor
+    if _query_executor is None:
+        with _query_executor_lock:
+            if _query_executor is None:
+                _query_executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="segment-query")
+    return _query_executor
+
+
+def _reset_query_executor():
+    """
+    Setelah fork (worker gunicorn preload_app, warmup di master) thread pool milik
+    parent tidak punya thread lagi di child: buang, dibuat ulang saat query pertama
+    """
+    global _query_executor, _query_executor_lock
+    _query_executor = None
+    _query_executor_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_query_executor)
+
+
+def segment_top_k(scores, deleted, top_k):
+    """
+    Top-k lokal satu segment: doc number terurut skor turun (skor sama: doc number
+    naik), hanya skor > 0 dan dokumen yang belum dihapus. Partial selection
+    (np.partition) supaya tidak perlu sort seluruh segment.
+    """
+    if deleted is not None:
+        scores[deleted] = 0
+    if len(scores) > top_k:
+        threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        candidates = np.flatnonzero(scores >= max(threshold, np.nextafter(0, 1)))
+    else:
+        candidates = np.flatnonzero(scores > 0)
+    return candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
+
+
+def _term_matrix(index, term_ids, numbers, data):
+    """CSR term × dokumen dari all_postings() (sudah urut term lalu doc number)"""
+    indptr = np.searchsorted(term_ids, np.arange(index.n_terms + 1))
+    return sparse.csr_matrix((data, numbers, indptr), shape=(index.n_terms, index.n_docs))
+
+
+class IndexSnapshot:
+    """
+    Satu generasi manifest yang sudah dibuka: reader, tombstone dan metadata
+    dokumen setiap segment, statistik global dan cache norms. Isinya tidak pernah
+    berubah; satu query memakai satu snapshot dari awal sampai akhir (scoring,
+    top-k, metadata), jadi tidak pernah mencampur dua generasi.
+
+    Reference counted: SegmentedIndex memegang satu referensi selama snapshot
+    masih yang terbaru, setiap query memegang satu (acquire / release). Reader
+    mmap baru ditutup setelah snapshot di-retire dan query terakhir selesai.
+
+    Dokumen yang di-tombstone tidak pernah masuk hasil, tapi tetap dihitung di
+    N / df / avgdl sampai segment-nya di-compact (sama seperti Lucene), jadi
+    delete tidak perlu menghitung ulang statistik.
+
+    Scatter-gather: skor dihitung per segment (bm25_scores / tfidf_scores → list
+    array sejajar dengan self.segments), top_k() memilih top-k lokal per segment
+    lalu menggabungkannya dengan heap merge. Dengan shard per source, N / df /
+    avgdl tetap global (dijumlahkan lintas shard), jadi skor sama dengan index
+    satu base.
+
+    Query batch (*_scores_batch, /api/evaluate): kontribusi skor setiap posting
+    disimpan sekali per snapshot sebagai matrix sparse term × dokumen, lalu
+    semua query di-score dengan satu matmul per segment.
+    """
+
+    def __init__(self, segments, documents, generation):
+        self.segments = segments
+        self.generation = generation
+        self.n_docs = sum(index.n_docs for _, index, _ in segments)
+        self.n_deleted = sum(int(deleted.sum()) for _, _, deleted in segments if deleted is not None)
+        total_length = sum(int(index.doc_lengths.sum()) for _, index, _ in segments)
+        self.avgdl = total_length / self.n_docs if self.n_docs else 0.0
+        self._documents = documents
+        self._tfidf_norms = None
+        self._bm25_norms = None
+        self._global_doc_freqs = None
+        self._tfidf_impacts = None
+        self._bm25_impacts = None
+        # Cache dihitung sekali per snapshot walaupun banyak query datang bersamaan
+        self._cache_lock = threading.RLock()
+        self._refs = 1
+        self._refs_lock = threading.Lock()
+
+    @classmethod
+    def open(cls):
+        """Buka semua segment di manifest saat ini"""
+        for attempt in range(3):
+            manifest = read_manifest()
+            opened, documents = [], []
+            try:
+                for segment in manifest["segments"]:
+                    index = BinaryIndex(_path(segment["postings"]))
+                    opened.append((segment, index, load_tombstones(segment, index.n_docs)))
+                    # Metadata ikut dibaca sekarang: file segment bisa dihapus merge kapan saja
+                    with open(_path(segment["documents"]), "r", encoding="utf-8") as f:
+                        documents.append(json.load(f))
+                return cls(opened, documents, manifest["generation"])
+            except FileNotFoundError:
+                # Segment baru saja di-merge dan dihapus: baca manifest lagi
+                for _, index, _ in opened:
+                    index.close()
+                time.sleep(0.05)
+        raise RuntimeError("Segment manifest keeps changing, cannot open index")
+
+    # ----- reference counting -----
+
+    def acquire(self):
+        with self._refs_lock:
+            if self._refs <= 0:
+                raise RuntimeError("Index snapshot already closed")
+            self._refs += 1
+        return self
+
+    def release(self):
+        with self._refs_lock:
+            self._refs -= 1
+            closing = self._refs == 0
+        if closing:
+            # Cache norms bisa berisi view ke mmap segment (norms tersimpan)
+            self._tfidf_norms = self._bm25_norms = self._global_doc_freqs = None
+            self._tfidf_impacts = self._bm25_impacts = None
+            for _, index, _ in self.segments:
+                index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    @property
+    def version(self):
+        """
+        Versi snapshot (untuk kunci cache hasil query): generation manifest, naik di
+        setiap commit (segment baru, merge, delete, full build, pruning base). Bukan
+        mtime: dua commit dalam granularitas timestamp / restore yang mempertahankan
+        mtime tidak boleh terlihat sebagai index yang sama.
+        """
+        return str(self.generation)
+
+    def _cached(self, name, compute):
+        value = getattr(self, name)
+        if value is None:
+            with self._cache_lock:
+                value = getattr(self, name)
+                if value is None:
+                    value = compute()
+                    setattr(self, name, value)
+        return value
+
+    # ----- query -----
+
+    def doc_freq(self, term):
+        return sum(index.doc_freq(term) for _, index, _ in self.segments)
+
+    def document(self, doc_id):
+        """Metadata dokumen (document_index entry) dari segment yang memuat versi hidupnya"""
+        for (_, index, deleted), documents in zip(self.segments, self._documents):
+            if doc_id in documents and (deleted is None or not deleted[index.doc_number(doc_id)]):
+                return documents[doc_id]
+        return None
+
+    def _scatter(self, fn, *iterables):
+        """fn per segment (sejajar dengan self.segments); paralel kalau index cukup besar"""
+        if QUERY_WORKERS > 1 and len(self.segments) > 1 and self.n_docs >= PARALLEL_MIN_QUERY_DOCS:
+            return list(query_executor().map(fn, *iterables))
+        return list(map(fn, *iterables))
+
+    def bm25_scores(self, terms):
+        """
+        BM25 per segment dengan statistik global.
+        idf = log(1 + (N - df + 0.5) / (df + 0.5))
+        """
+        segments = self.segments
+        if not terms or not self.n_docs:
+            return [np.zeros(index.n_docs) for _, index, _ in segments]
+        idf = {}
+        for term in set(terms):
+            df = self.doc_freq(term)
+            if df:
+                idf[term] = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+        def score(segment, norm):
+            _, index, _ = segment
+            scores = np.zeros(index.n_docs)
+            for term in terms:
+                if term not in idf:
+                    continue
+                numbers, tfs = index.postings(term)
+                scores[numbers] += idf[term] * tfs * (BM25_K1 + 1) / (tfs + norm[numbers])
+            return scores
+
+        return self._scatter(score, segments, self.bm25_norms())
+
+    def _stored_norms_valid(self, index):
+        """Norms di file segment dihitung dengan config bobot yang sama"""
+        return index.weighting == weighting_config()
+
+    def bm25_norms(self):
+        """
+        Faktor panjang BM25 k1 * (1 - b + b * dl / avgdl) per segment. Dipakai
+        langsung dari file (float32) kalau avgdl segment = avgdl global (index
+        satu segment); selain itu dihitung sekali per snapshot.
+        """
+        def compute():
+            norms = []
+            for _, index, _ in self.segments:
+                if self._stored_norms_valid(index) and index.avgdl == self.avgdl:
+                    norms.append(index.bm25_norms)
+                else:
+                    norms.append(bm25_length_norms(index.doc_lengths, self.avgdl))
+            return norms
+
+        return self._cached("_bm25_norms", compute)
+
+    def global_doc_freqs(self):
+        """
+        df global (dijumlahkan lintas segment, df koleksi kalau di-prune) untuk
+        setiap term lokal, per segment. Dihitung sekali per snapshot dari daftar
+        term semua segment (satu decode dictionary per segment).
+        """
+        def compute():
+            segments = self.segments
+            if len(segments) == 1:
+                return [segments[0][1].collection_freqs.astype(np.int64)]
+            segment_terms = [index.terms() for _, index, _ in segments]
+            totals = Counter()
+            for terms, (_, index, _) in zip(segment_terms, segments):
+                totals.update(dict(zip(terms, index.collection_freqs.tolist())))
+            return [np.fromiter((totals[term] for term in terms), dtype=np.int64, count=len(terms))
+                    for terms in segment_terms]
+
+        return self._cached("_global_doc_freqs", compute)
+
+    def tfidf_norms(self):
+        """
+        Panjang vektor TF-IDF (L2) setiap dokumen, per segment. Index satu segment
+        memakai norms float32 dari file (N dan df lokal = global). Dengan beberapa
+        segment / shard IDF global berubah setiap ada segment baru, jadi norms
+        dihitung sekali per snapshot (saat query TF-IDF pertama setelah reload),
+        satu decode seluruh postings per segment.
+        """
+        segments = self.segments
+        if len(segments) == 1 and self._stored_norms_valid(segments[0][1]):
+            return [segments[0][1].doc_norms]
+
+        def norm(segment, doc_freqs):
+            _, index, _ = segment
+            term_ids, numbers, tfs = index.all_postings()
+            idf = compute_idf(doc_freqs, self.n_docs)
+            weights = tf_weights(tfs, index.doc_lengths[numbers]) * idf[term_ids]
+            return np.sqrt(np.bincount(numbers, weights=weights ** 2, minlength=index.n_docs))
+
+        return self._cached("_tfidf_norms", lambda: self._scatter(norm, segments, self.global_doc_freqs()))
+
+    def tfidf_scores(self, terms):
+        """
+        Cosine similarity vektor TF-IDF query vs dokumen (bobot TF dan IDF sama
+        dengan tfidf_matrix step 2, term di luar vocabulary diabaikan), per segment
+        """
+        segments = self.segments
+        norms = self.tfidf_norms()
+        if not terms or not self.n_docs:
+            return [np.zeros(index.n_docs) for _, index, _ in segments]
+        query = {}
+        for term, count in Counter(terms).items():
+            df = self.doc_freq(term)
+            if df:
+                idf = compute_idf([df], self.n_docs)[0]
+                query[term] = (tf_weights([count], [len(terms)])[0] * idf, idf)
+        if not query:
+            return [np.zeros(index.n_docs) for _, index, _ in segments]
+        query_norm = math.sqrt(sum(weight ** 2 for weight, _ in query.values()))
+
+        def score(segment, doc_norms):
+            _, index, _ = segment
+            scores = np.zeros(index.n_docs)
+            for term, (weight, idf) in query.items():
+                numbers, tfs = index.postings(term)
+                scores[numbers] += weight * tf_weights(tfs, index.doc_lengths[numbers]) * idf
+            nonzero = doc_norms > 0
+            scores[nonzero] /= doc_norms[nonzero] * query_norm
+            return scores
+
+        return self._scatter(score, segments, norms)
+
+    # ----- query batch -----
+
+    def bm25_impacts(self):
+        """
+        Matrix term × dokumen (CSR, baris = term id lokal) per segment: skor BM25
+        setiap posting dengan idf global, dihitung sekali per snapshot untuk batch
+        """
+        def compute(segment, doc_freqs, norm):
+            _, index, _ = segment
+            term_ids, numbers, tfs = index.all_postings()
+            idf = np.log(1 + (self.n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+            tfs = tfs.astype(np.float64)
+            return _term_matrix(index, term_ids, numbers,
+                                idf[term_ids] * tfs * (BM25_K1 + 1) / (tfs + norm[numbers]))
+
+        return self._cached("_bm25_impacts", lambda: self._scatter(
+            compute, self.segments, self.global_doc_freqs(), self.bm25_norms()))
+
+    def tfidf_impacts(self):
+        """
+        Matrix term × dokumen (CSR) per segment: bobot TF-IDF setiap posting dibagi
+        panjang vektor dokumennya, dihitung sekali per snapshot untuk batch
+        """
+        def compute(segment, doc_freqs, doc_norms):
+            _, index, _ = segment
+            term_ids, numbers, tfs = index.all_postings()
+            weights = tf_weights(tfs, index.doc_lengths[numbers]) * compute_idf(doc_freqs, self.n_docs)[term_ids]
+            norms = doc_norms[numbers]
+            return _term_matrix(index, term_ids, numbers,
+                                np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0))
+
+        return self._cached("_tfidf_impacts", lambda: self._scatter(
+            compute, self.segments, self.global_doc_freqs(), self.tfidf_norms()))
+
+    def _batch_scores(self, impacts, queries):
+        """
+        queries: list dict term → bobot query. Per segment satu matrix query × term
+        dikali matrix impact (satu sparse matmul untuk semua query). Return skor
+        per query dalam bentuk yang sama dengan bm25_scores / tfidf_scores.
+        """
+        def score(segment, matrix):
+            _, index, _ = segment
+            rows, cols, weights = [], [], []
+            for row, query in enumerate(queries):
+                for term, weight in query.items():
+                    term_id = index.term_id(term)
+                    if term_id is not None:
+                        rows.append(row)
+                        cols.append(term_id)
+                        weights.append(weight)
+            query_matrix = sparse.csr_matrix((weights, (rows, cols)), shape=(len(queries), index.n_terms))
+            return (query_matrix @ matrix).toarray()
+
+        segment_scores = self._scatter(score, self.segments, impacts)
+        return [[scores[row] for scores in segment_scores] for row in range(len(queries))]
+
+    def bm25_scores_batch(self, queries):
+        """bm25_scores untuk banyak query (list of list term) sekaligus"""
+        return self._batch_scores(self.bm25_impacts(), [Counter(terms) for terms in queries])
+
+    def tfidf_scores_batch(self, queries):
+        """tfidf_scores untuk banyak query (list of list term) sekaligus"""
+        weights = []
+        for terms in queries:
+            query = {}
+            for term, count in Counter(terms).items():
+                df = self.doc_freq(term)
+                if df:
+                    query[term] = tf_weights([count], [len(terms)])[0] * compute_idf([df], self.n_docs)[0]
+            query_norm = math.sqrt(sum(weight ** 2 for weight in query.values()))
+            weights.append({term: weight / query_norm for term, weight in query.items()})
+        return self._batch_scores(self.tfidf_impacts(), weights)
+
+    def top_k(self, segment_scores, top_k=10):
+        """
+        Gabung skor semua segment → list (doc_id, score) terurut, hanya skor > 0
+        dan dokumen yang belum dihapus. Top-k lokal per segment (scatter), lalu
+        heap merge (gather). Skor sama: urutan segment lalu doc number.
+        """
+        if top_k <= 0:
+            return []
+
+        def local(segment, scores):
+            _, index, deleted = segment
+            doc_ids = index.doc_ids
+            return [(doc_ids[n], float(scores[n])) for n in segment_top_k(scores, deleted, top_k).tolist()]
+
+        heaps = self._scatter(local, self.segments, segment_scores)
+        return list(itertools.islice(heapq.merge(*heaps, key=lambda item: -item[1]), top_k))
+
+    def search(self, query, top_k=10):
+        """BM25 lintas semua segment. Return list (doc_id, score)."""
+        return self.top_k(self.bm25_scores(query_terms(query)), top_k)
+
+
+class SegmentedIndex:
+    """
+    Reader untuk semua segment di manifest: memegang IndexSnapshot terbaru.
+    refresh() membuka snapshot baru kalau manifest berubah; snapshot lama tetap
+    hidup sampai query yang masih memakainya selesai.
+
+    Query: `with index.snapshot() as snapshot:` lalu scoring, top_k dan
+    document() dari snapshot yang sama.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._snapshot = None
+        self.reload()
+
+    def reload(self):
+        snapshot = IndexSnapshot.open()
+        with self._lock:
+            old, self._snapshot = self._snapshot, snapshot
+        if old is not None:
+            old.release()
+
+    def refresh(self):
+        """Reload kalau generation manifest berubah (segment baru / merge / delete / build ulang)"""
+        with self._reload_lock:
+            if read_manifest()["generation"] != self._snapshot.generation:
+                self.reload()
+
+    def acquire(self):
+        """Snapshot terbaru untuk satu query; wajib di-release() (atau pakai snapshot())"""
+        with self._lock:
+            if self._snapshot is None:
+                raise RuntimeError("Index already closed")
+            return self._snapshot.acquire()
+
+    @contextmanager
+    def snapshot(self):
+        snapshot = self.acquire()
+        try:
+            yield snapshot
+        finally:
+            snapshot.release()
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    @property
+    def n_docs(self):
+        return self._snapshot.n_docs
+
+    @property
+    def segments(self):
+        return self._snapshot.segments
+
+    def search(self, query, top_k=10):
+        """BM25 lintas semua segment. Return list (doc_id, score)."""
+        self.refresh()
+        with self.snapshot() as snapshot:
+            return snapshot.search(query, top_k)
+
+    def document(self, doc_id):
+        with self.snapshot() as snapshot:
+            return snapshot.document(doc_id)
+
+    def close(self):
+        with self._lock:
+            old, self._snapshot = self._snapshot, None
+        if old is not None:
+            old.release()
+
+
+# index_builder → steps.step1 → segments (reset_segments), jadi di-import setelah
+# semua nama di atas terdefinisi. Sengaja tidak di dalam add_documents / build_shards:
+# di sini IndexBuilder memakai config indexing yang sama dengan module ini, juga
+# kalau segments di-import dari backend (yang punya config.py sendiri).
+from utils import index_builder  # noqa: E402
@@ -0,0 +1,275 @@
+"""
+Streaming (chunked) index builder untuk corpus yang lebih besar dari RAM
+
+CSV dibaca per chunk (BATCH_SIZE dokumen, pd.read_csv chunksize) dan setiap
+dokumen di-tokenize sekali. Postings dikumpulkan di memory sampai
+SPILL_POSTINGS postings, lalu di-spill ke disk sebagai run terurut (format
+inverted_index.bin, doc number global). Setelah scan:
+- external k-way merge semua run → inverted_index.bin (PostingsWriter)
+- TF-IDF dihitung per run dengan IDF global, langsung ke array memmap
+- document_index.json ditulis per dokumen selama scan
+
+Yang tetap di memory: satu chunk + satu run postings, term dictionary dan
+tabel per dokumen (doc id, panjang). Output identik byte-per-byte dengan
+IndexBuilder (build in-memory).
+"""
+import sys
+import os
+import json
+import heapq
+import shutil
+import tempfile
+from array import array
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    INPUT_FILE, INDEX_DIR, INVERTED_INDEX_FILE, DOCUMENT_INDEX_FILE, TEXT_COLUMN,
+    VERBOSE, SAVE_JSON_INDEX, BATCH_SIZE, SPILL_POSTINGS
+)
+from utils.text_processor import tokenize
+from utils.binary_index import BinaryIndex, PostingsWriter, write_postings
+from utils.segments import reset_segments
+from steps.step1_build_inverted_index import save_vocabulary
+from steps.step2_calculate_tfidf import compute_idf, tfidf_weights, tfidf_metadata, save_tfidf_matrix
+from steps.step3_build_document_index import document_entry, print_source_distribution
+from steps.step4_generate_statistics import print_statistics, save_statistics
+from utils.streaming_stats import StatisticsAccumulator
+
+
+def read_chunks(input_file=INPUT_FILE, chunk_size=BATCH_SIZE):
+    """Generator (list row dict, kolom) per chunk CSV — corpus tidak pernah utuh di memory"""
+    with pd.read_csv(input_file, encoding='utf-8', chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk.to_dict('records'), list(chunk.columns)
+
+
+class DocumentIndexWriter:
+    """document_index.json ditulis per dokumen, format sama dengan json.dump(indent=2)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        self._count = 0
+
+    def add(self, doc_id, entry):
+        # '{\n  "id": {...}\n}' → buang kurung kurawal luar, indent tetap sama
+        text = json.dumps({doc_id: entry}, ensure_ascii=False, indent=2)[2:-2]
+        self._file.write(("{\n" if self._count == 0 else ",\n") + text)
+        self._count += 1
+
+    def close(self):
+        self._file.write("\n}" if self._count else "{}")
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+            os.remove(self.tmp_path)
+
+
+class StreamingIndexBuilder:
+    """Stage build sama dengan IndexBuilder: scan → calculate_tfidf → save → generate_statistics"""
+
+    def __init__(self, chunk_size=BATCH_SIZE, spill_postings=SPILL_POSTINGS):
+        self.chunk_size = chunk_size
+        self.spill_postings = spill_postings
+        self.spill_dir = tempfile.mkdtemp(prefix="spill_", dir=INDEX_DIR)
+        self.merged_path = os.path.join(self.spill_dir, "merged.bin")
+
+        # Run = postings terurut untuk dokumen [first_doc, first_doc + docs)
+        self.runs = []
+        self.doc_ids = []
+        self.doc_lengths = array('I')
+        # Statistik diisi selama build (streaming aggregates)
+        self.stats = StatisticsAccumulator()
+        self.total_documents = 0
+        self.total_terms = 0
+
+        self._postings = {}
+        self._buffered = 0
+        self._run_start = 0
+        self._documents = None
+
+        self.terms = None
+        self.doc_freqs = None
+        self.idf = None
+        self.tfidf_matrix = None
+        self.statistics = None
+
+    def _spill_path(self, name):
+        return os.path.join(self.spill_dir, name)
+
+    def _memmap(self, name, dtype, count):
+        """Array di disk (spill dir); ukuran 0 tidak bisa di-mmap"""
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._spill_path(name), dtype=dtype, mode='w+', shape=(count,))
+
+    # ===================== BUILD STAGES =====================
+
+    def add_document(self, row, columns):
+        """Tokenize satu dokumen; postings masuk ke run yang sedang diisi"""
+        doc_number = self.total_documents
+        doc_id = row['id']
+        terms = tokenize(row[TEXT_COLUMN])
+        term_counts = Counter(terms)
+
+        for term, count in term_counts.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = ([], [])
+            posting[0].append(doc_number)
+            posting[1].append(count)
+        self._buffered += len(term_counts)
+
+        entry = document_entry(row, columns)
+        self._documents.add(doc_id, entry)
+        self.stats.add_document(entry)
+        self.doc_ids.append(doc_id)
+        self.doc_lengths.append(len(terms))
+        self.total_documents += 1
+        self.total_terms += len(terms)
+
+    def spill(self):
+        """Tulis postings di memory sebagai run terurut, lalu kosongkan buffer"""
+        if not self._postings:
+            return
+        terms = sorted(self._postings)
+        path = self._spill_path(f"run_{len(self.runs):06d}.bin")
+        write_postings(path, [], [], terms, [self._postings[term] for term in terms])
+        self.runs.append({
+            "path": path,
+            "first_doc": self._run_start,
+            "docs": self.total_documents - self._run_start
+        })
+        self._postings, self._buffered = {}, 0
+        self._run_start = self.total_documents
+
+    def scan(self, input_file=INPUT_FILE):
+        """Read + tokenize per chunk (satu-satunya pass atas data), lalu external merge"""
+        print(f"\n📂 Streaming: {input_file} ({self.chunk_size} documents per chunk)")
+        print(f"\n🔨 Scanning documents (spill every {self.spill_postings} postings)...")
+        self._documents = DocumentIndexWriter(DOCUMENT_INDEX_FILE)
+        for rows, columns in read_chunks(input_file, self.chunk_size):
+            for row in rows:
+                self.add_document(row, columns)
+            if self._buffered >= self.spill_postings:
+                self.spill()
+            if VERBOSE:
+                print(f"   ✓ Processed {self.total_documents} documents ({len(self.runs)} runs spilled)")
+        self.spill()
+
+        self.merge()
+
+        print(f"\n✅ Scan completed!")
+        print(f"   📊 Total unique terms: {len(self.terms)}")
+        print(f"   📊 Total terms processed: {self.total_terms}")
+        if self.total_documents:
+            print(f"   📊 Avg terms per document: {self.total_terms / self.total_documents:.1f}")
+
+    def merge(self):
+        """
+        External k-way merge semua run (heap berisi satu term per run).
+        Run urut doc number, jadi postings satu term cukup disambung per run.
+        term_map per run (memmap): term id lokal → term id global, untuk TF-IDF.
+        """
+        print(f"\n   🔀 Merging {len(self.runs)} runs...")
+        readers = [BinaryIndex(run["path"]) for run in self.runs]
+        for run_no, (run, reader) in enumerate(zip(self.runs, readers)):
+            run["term_map"] = self._memmap(f"run_{run_no:06d}.map", np.int64, len(reader))
+
+        writer = PostingsWriter(self.merged_path, self.doc_lengths)
+        heap = [(reader.term(0), run_no, 0) for run_no, reader in enumerate(readers) if len(reader)]
+        heapq.heapify(heap)
+        while heap:
+            term = heap[0][0]
+            numbers, tfs = [], []
+            while heap and heap[0][0] == term:
+                _, run_no, term_id = heapq.heappop(heap)
+                run_numbers, run_tfs = readers[run_no].postings_by_id(term_id)
+                numbers.append(run_numbers)
+                tfs.append(run_tfs)
+                self.runs[run_no]["term_map"][term_id] = len(writer.terms)
+                if term_id + 1 < len(readers[run_no]):
+                    heapq.heappush(heap, (readers[run_no].term(term_id + 1), run_no, term_id + 1))
+            writer.add(term, np.concatenate(numbers), np.concatenate(tfs))
+        writer.close(self.doc_ids)
+
+        for reader in readers:
+            reader.close()
+        self.terms = writer.terms
+        self.doc_freqs = np.asarray(writer.doc_freqs, dtype=np.int64)
+
+    def calculate_tfidf(self):
+        """TF-IDF per run dengan IDF global, hasil langsung ke array memmap (CSR)"""
+        self.idf = compute_idf(self.doc_freqs, self.total_documents)
+        self.stats.add_terms(self.terms, self.doc_freqs, self.idf)
+        nnz = int(self.doc_freqs.sum())
+        index_dtype = np.int32 if nnz < np.iinfo(np.int32).max else np.int64
+        data = self._memmap("tfidf_data", np.float64, nnz)
+        indices = self._memmap("tfidf_indices", index_dtype, nnz)
+        # Dokumen tanpa token tidak ada di run mana pun → baris kosong
+        row_nnz = np.zeros(self.total_documents, dtype=np.int64)
+
+        position = 0
+        for run in self.runs:
+            first, docs = run["first_doc"], run["docs"]
+            with BinaryIndex(run["path"]) as reader:
+                term_ids, numbers, tfs = reader.all_postings()
+            counts = sparse.csr_matrix(
+                (tfs.astype(np.float64), (numbers - first, run["term_map"][term_ids])),
+                shape=(docs, len(self.terms))
+            )
+            counts.sort_indices()
+            tfidf, _ = tfidf_weights(counts, self.doc_lengths[first:first + docs], self.idf)
+            data[position:position + tfidf.nnz] = tfidf.data
+            self.stats.add_tfidf_scores(tfidf.data)
+            indices[position:position + tfidf.nnz] = tfidf.indices
+            row_nnz[first:first + docs] = np.diff(tfidf.indptr)
+            position += tfidf.nnz
+
+        indptr = np.zeros(self.total_documents + 1, dtype=index_dtype)
+        np.cumsum(row_nnz, out=indptr[1:])
+        self.tfidf_matrix = sparse.csr_matrix(
+            (data, indices, indptr), shape=(self.total_documents, len(self.terms)), copy=False
+        )
+
+        print(f"\n✅ TF-IDF calculated for {self.tfidf_matrix.shape[0]} documents, {len(self.idf)} terms")
+
+    def save(self):
+        """Pindahkan hasil merge ke inverted_index.bin, tulis vocabulary, TF-IDF dan document index"""
+        print(f"\n💾 Saving inverted index to: {INVERTED_INDEX_FILE}")
+        os.replace(self.merged_path, INVERTED_INDEX_FILE)
+        # Base baru berisi seluruh corpus → segment incremental lama tidak dipakai lagi
+        reset_segments()
+        if SAVE_JSON_INDEX:
+            print(f"⏭️  Skipping inverted_index.json (tidak tersedia di streaming build)")
+        save_vocabulary(self.terms, self.total_documents)
+        save_tfidf_matrix(self.tfidf_matrix, self.idf, self.terms, self.doc_ids)
+        print_source_distribution(self.stats.sources)
+        print(f"\n💾 Saving document index to: {DOCUMENT_INDEX_FILE}")
+        self._documents.close()
+
+    def generate_statistics(self):
+        """Statistik sudah dikumpulkan selama scan / merge / TF-IDF; di sini hanya finalisasi"""
+        self.statistics = self.stats.result(tfidf_metadata(self.total_documents, len(self.idf)))
+        print_statistics(self.statistics)
+        save_statistics(self.statistics)
+
+    def close(self):
+        """Hapus run file dan array sementara"""
+        if self._documents is not None:
+            self._documents.abort()
+        self.tfidf_matrix = None
+        for run in self.runs:
+            run.pop("term_map", None)
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
@@ -0,0 +1,268 @@
+"""
+Streaming aggregates untuk statistik index (satu pass, memory konstan)
+
+- RunningMoments : count, sum, mean, variance (Welford/Chan), min, max
+- TopK           : bounded heap, simpan k item terbaik saja
+- QuantileSketch : sketch relative-error (bucket logaritmik, ala DDSketch)
+- StatisticsAccumulator : menggabungkan semuanya menjadi isi index_stats.json
+
+Semua aggregate bisa di-update per batch (array numpy) dan di-merge, jadi
+bisa diisi langsung saat build (term per term, dokumen per dokumen, run per
+run) tanpa menyimpan daftar nilai.
+"""
+import heapq
+import math
+from collections import Counter
+
+import numpy as np
+
+TOP_TERMS = 20
+QUANTILES = (0.5, 0.9, 0.99)
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+
+def _rank_key(item):
+    """(term, nilai): nilai terbesar dulu, seri diurutkan per term"""
+    return (-item[1], item[0])
+
+
+class RunningMoments:
+    """Mean / variance / min / max tanpa menyimpan nilai"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Satu nilai (Welford), tanpa overhead numpy"""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def update(self, values):
+        """Tambah satu batch nilai (Chan et al.: gabung moment batch ke moment berjalan)"""
+        values = np.asarray(values)
+        n = len(values)
+        if n == 0:
+            return
+        # Integer dijumlah exact (int Python), float dengan pairwise sum numpy
+        batch_total = int(values.sum()) if values.dtype.kind in "iu" else float(values.sum())
+        batch_mean = batch_total / n
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        batch_min, batch_max = values.min().item(), values.max().item()
+        self._combine(n, batch_total, batch_mean, batch_m2, batch_min, batch_max)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.total, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, n, total, mean, m2, minimum, maximum):
+        count = self.count + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * n / count
+        self.mean += delta * n / count
+        self.count = count
+        self.total += total
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.count) if self.count else 0
+
+
+class _Reversed:
+    """Bungkus key supaya heapq (min-heap) berperilaku sebagai max-heap"""
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+
+class TopK:
+    """
+    k item dengan key TERKECIL (sama dengan sorted(items, key=key)[:k]),
+    heap berisi paling banyak k item: root = item terburuk yang masih disimpan
+    """
+
+    def __init__(self, k, key):
+        self.k = k
+        self.key = key
+        self._heap = []
+
+    def push(self, item):
+        entry = (_Reversed(self.key(item)), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[0].key < self._heap[0][0].key:
+            heapq.heapreplace(self._heap, entry)
+
+    def merge(self, other):
+        for _, item in other._heap:
+            self.push(item)
+
+    def items(self):
+        return [item for _, item in sorted(self._heap, key=lambda entry: entry[0].key)]
+
+
+class QuantileSketch:
+    """
+    Quantile dengan relative error <= alpha: nilai x > 0 masuk bucket
+    ceil(log_gamma(x)), gamma = (1 + alpha) / (1 - alpha). Jumlah bucket
+    hanya bergantung pada rentang nilai (log), bukan jumlah nilai.
+    """
+
+    def __init__(self, alpha=SKETCH_RELATIVE_ACCURACY):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value > 0:
+            self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+        else:
+            self.zero_count += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        self.count += len(values)
+        if len(positive):
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                     return_counts=True)
+            self.buckets.update(dict(zip(keys.tolist(), counts.tolist())))
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Titik tengah bucket (gamma^(k-1), gamma^k] → relative error <= alpha
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def quantiles(self, qs=QUANTILES, digits=6):
+        return {f"p{round(q * 100):g}": round(self.quantile(q), digits) for q in qs}
+
+
+class StatisticsAccumulator:
+    """
+    Statistik index yang diisi selama build:
+    add_terms() per batch term, add_document() per dokumen,
+    add_tfidf_scores() per batch bobot TF-IDF, lalu result()
+    """
+
+    def __init__(self, top_k=TOP_TERMS):
+        self.doc_freqs = RunningMoments()
+        self.doc_lengths = RunningMoments()
+        self.doc_length_sketch = QuantileSketch()
+        self.tfidf = RunningMoments()
+        self.tfidf_sketch = QuantileSketch()
+        self.sources = Counter()
+        self.total_documents = 0
+        # Seri diurutkan per term, tidak bergantung urutan masuk
+        self.most_common = TopK(top_k, key=_rank_key)
+        self.top_idf = TopK(top_k, key=_rank_key)
+
+    def add_terms(self, terms, doc_freqs, idf):
+        """Satu batch term (list) + document frequency dan IDF (array, urutan sama)"""
+        doc_freqs = np.asarray(doc_freqs, dtype=np.int64)
+        idf = np.asarray(idf, dtype=np.float64)
+        self.doc_freqs.update(doc_freqs)
+        # Hanya kandidat yang bisa masuk top-k (>= nilai ke-k di batch, termasuk seri) di-push
+        for top, values in ((self.most_common, doc_freqs), (self.top_idf, idf)):
+            k = min(top.k, len(values))
+            if k == 0:
+                continue
+            threshold = np.partition(values, len(values) - k)[len(values) - k]
+            for i in np.flatnonzero(values >= threshold).tolist():
+                top.push((terms[i], values[i].item()))
+
+    def add_document(self, entry):
+        """Metadata satu dokumen (document_entry dari step 3)"""
+        self.total_documents += 1
+        if "source" in entry:
+            self.sources[entry["source"]] += 1
+        if entry.get("word_count") is not None:
+            self.doc_lengths.add(entry["word_count"])
+            self.doc_length_sketch.add(entry["word_count"])
+
+    def merge_documents(self, other):
+        """Gabung statistik dokumen dari accumulator shard lain (build paralel)"""
+        self.total_documents += other.total_documents
+        self.sources.update(other.sources)
+        self.doc_lengths.merge(other.doc_lengths)
+        self.doc_length_sketch.merge(other.doc_length_sketch)
+
+    def add_tfidf_scores(self, scores):
+        self.tfidf.update(scores)
+        self.tfidf_sketch.update(scores)
+
+    def result(self, metadata=None):
+        """Isi index_stats.json"""
+        return {
+            "overview": {
+                "total_documents": self.total_documents,
+                "vocabulary_size": self.doc_freqs.count,
+                "avg_terms_per_document": round(self.doc_lengths.average, 2),
+                "total_index_entries": self.tfidf.count
+            },
+            "term_statistics": {
+                "avg_documents_per_term": round(self.doc_freqs.average, 2),
+                "max_documents_per_term": self.doc_freqs.max or 0,
+                "min_documents_per_term": self.doc_freqs.min or 0,
+                "most_common_terms": [
+                    {"term": term, "doc_count": doc_count}
+                    for term, doc_count in self.most_common.items()
+                ]
+            },
+            "document_statistics": {
+                "avg_document_length": round(self.doc_lengths.average, 2),
+                "max_document_length": self.doc_lengths.max or 0,
+                "min_document_length": self.doc_lengths.min or 0,
+                "std_document_length": round(self.doc_lengths.std, 2),
+                "document_length_quantiles": self.doc_length_sketch.quantiles(digits=1),
+                "source_distribution": dict(self.sources)
+            },
+            "tfidf_statistics": {
+                "avg_tfidf_score": round(self.tfidf.average, 6),
+                "max_tfidf_score": round(self.tfidf.max or 0, 6),
+                "std_tfidf_score": round(self.tfidf.std, 6),
+                "tfidf_score_quantiles": self.tfidf_sketch.quantiles(),
+                "top_discriminative_terms": [
+                    {"term": term, "idf_score": round(score, 4)}
+                    for term, score in self.top_idf.items()
+                ]
+            },
+            "metadata": metadata or {}
+        }
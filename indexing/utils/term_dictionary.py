@@ -0,0 +1,200 @@
+"""
+Front-coded term dictionary (block compression)
+
+Term terurut (urutan byte UTF-8) dipecah menjadi block berisi BLOCK_SIZE term:
+
+    term pertama block : vbyte(panjang) + bytes term lengkap
+    term berikutnya    : vbyte(panjang prefix yang sama dengan term sebelumnya)
+                         + vbyte(panjang suffix) + bytes suffix
+
+Offset awal setiap block (u32[n_blocks + 1]) + term pertama setiap block
+(tidak di-front-code) membentuk sparse block index: binary search hanya di
+antara term pertama block, lalu tepat satu block di-decode untuk menemukan
+term. Yang resident di memory hanya data per block (offset + term pertama,
+1/BLOCK_SIZE dari vocabulary) + block terakhir yang di-decode.
+
+Variable-byte sama dengan postings (utils/binary_index.py): 7 bit per byte,
+byte terakhir setiap angka diberi bit 0x80.
+
+Dipakai untuk section term di inverted_index.bin dan untuk vocabulary.bin.
+"""
+import struct
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+BLOCK_SIZE = 16
+
+VOCAB_MAGIC = b"PIVOC\x00\x00\x00"
+VOCAB_VERSION = 1
+# magic, version, n_terms, block size, total documents, n_blocks
+VOCAB_HEADER = struct.Struct("<8sIIIII")
+
+
+# ===================== VARIABLE-BYTE (SCALAR) =====================
+
+def _put_vbyte(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F)
+        value >>= 7
+    out.append(value | 0x80)
+
+
+def _get_vbyte(data, pos):
+    """(angka, posisi setelah angka)"""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _common_prefix(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+# ===================== ENCODE / DECODE =====================
+
+def encode_terms(terms, block_size=BLOCK_SIZE):
+    """List term terurut → (offset block u32[n_blocks + 1], blob bytes)"""
+    blob = bytearray()
+    offsets = []
+    previous = b""
+    for i, term in enumerate(terms):
+        term = term.encode("utf-8") if isinstance(term, str) else term
+        if i % block_size == 0:
+            offsets.append(len(blob))
+            _put_vbyte(blob, len(term))
+            blob += term
+        else:
+            prefix = _common_prefix(previous, term)
+            _put_vbyte(blob, prefix)
+            _put_vbyte(blob, len(term) - prefix)
+            blob += term[prefix:]
+        previous = term
+    offsets.append(len(blob))
+    return np.asarray(offsets, dtype=np.uint32), bytes(blob)
+
+
+def decode_block(data):
+    """bytes satu block → list term (bytes)"""
+    length, pos = _get_vbyte(data, 0)
+    previous = data[pos:pos + length]
+    pos += length
+    terms = [previous]
+    while pos < len(data):
+        prefix, pos = _get_vbyte(data, pos)
+        length, pos = _get_vbyte(data, pos)
+        previous = previous[:prefix] + data[pos:pos + length]
+        pos += length
+        terms.append(previous)
+    return terms
+
+
+class TermDictionary:
+    """
+    Reader front-coded dictionary di atas buffer (mmap / bytes).
+    base = posisi blob di buffer, block_offsets relatif terhadap base.
+    Term id = posisi term dalam urutan terurut.
+    """
+
+    def __init__(self, buffer, block_offsets, n_terms, block_size=BLOCK_SIZE, base=0):
+        self._buffer = buffer
+        self._block_offsets = block_offsets
+        self._base = base
+        self.n_terms = n_terms
+        self.block_size = block_size
+        self.n_blocks = len(block_offsets) - 1
+        self._firsts = None
+        # Block terakhir yang di-decode (akses berurutan: satu decode per block)
+        self._cached = (None, None)
+
+    def __len__(self):
+        return self.n_terms
+
+    def _first(self, block):
+        """Term pertama block (bytes) tanpa decode block"""
+        pos = self._base + int(self._block_offsets[block])
+        length, pos = _get_vbyte(self._buffer, pos)
+        return bytes(self._buffer[pos:pos + length])
+
+    def block(self, block):
+        cached_block, terms = self._cached
+        if cached_block != block:
+            start = self._base + int(self._block_offsets[block])
+            end = self._base + int(self._block_offsets[block + 1])
+            terms = decode_block(bytes(self._buffer[start:end]))
+            self._cached = (block, terms)
+        return terms
+
+    def term_bytes(self, term_id):
+        return self.block(term_id // self.block_size)[term_id % self.block_size]
+
+    def term(self, term_id):
+        return self.term_bytes(term_id).decode("utf-8")
+
+    def term_id(self, term):
+        """Binary search term pertama setiap block, lalu satu block di-decode; None kalau tidak ada"""
+        if self._firsts is None:
+            # Sparse index dibaca sekali saat lookup pertama
+            self._firsts = [self._first(block) for block in range(self.n_blocks)]
+        key = term.encode("utf-8") if isinstance(term, str) else term
+        block = bisect_right(self._firsts, key) - 1
+        if block < 0:
+            return None
+        terms = self.block(block)
+        i = bisect_left(terms, key)
+        if i < len(terms) and terms[i] == key:
+            return block * self.block_size + i
+        return None
+
+    def terms(self):
+        """Semua term (terurut), decode seluruh blob sekali"""
+        start = self._base
+        blob = bytes(self._buffer[start:start + int(self._block_offsets[-1])])
+        offsets = self._block_offsets.tolist()
+        terms = []
+        for block in range(self.n_blocks):
+            terms.extend(term.decode("utf-8") for term in decode_block(blob[offsets[block]:offsets[block + 1]]))
+        return terms
+
+    def close(self):
+        # View ke mmap harus dilepas sebelum mmap ditutup
+        self._block_offsets = None
+        self._buffer = None
+
+
+# ===================== VOCABULARY FILE =====================
+
+def write_vocabulary(path, terms, total_documents, block_size=BLOCK_SIZE):
+    """vocabulary.bin: header + offset block (align 8) + blob front-coded"""
+    block_offsets, blob = encode_terms(terms, block_size)
+    with open(path, "wb") as f:
+        f.write(VOCAB_HEADER.pack(VOCAB_MAGIC, VOCAB_VERSION, len(terms), block_size,
+                                  total_documents, len(block_offsets) - 1))
+        f.write(b"\x00" * (-VOCAB_HEADER.size % 8))
+        f.write(block_offsets.tobytes())
+        f.write(b"\x00" * (-block_offsets.nbytes % 8))
+        f.write(blob)
+
+
+def load_vocabulary(path):
+    """(TermDictionary, total_documents) dari vocabulary.bin"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, n_terms, block_size, total_documents, n_blocks = VOCAB_HEADER.unpack_from(data, 0)
+    if magic != VOCAB_MAGIC:
+        raise ValueError(f"{path} is not a vocabulary file")
+    if version != VOCAB_VERSION:
+        raise ValueError(f"Unsupported vocabulary version {version} (expected {VOCAB_VERSION})")
+    position = VOCAB_HEADER.size + (-VOCAB_HEADER.size % 8)
+    block_offsets = np.frombuffer(data, dtype=np.uint32, count=n_blocks + 1, offset=position)
+    position += block_offsets.nbytes + (-block_offsets.nbytes % 8)
+    return TermDictionary(data, block_offsets, n_terms, block_size, base=position), total_documents
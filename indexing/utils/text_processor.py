@@ -2,16 +2,66 @@
 Utility functions untuk text processing saat indexing
 """
 from collections import Counter
+import importlib.util
 import math
+import os
+import sys
+import threading
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import INDEX_BIGRAMS, PREPROCESSING_DIR
+
+_preprocessing = None
+_preprocessing_lock = threading.Lock()
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def preprocessing():
+    """
+    (utils/text_pipeline, config) milik preprocessing/, di-load sekali dari path
+    file: nama modul config/utils di sana bentrok dengan indexing/
+    """
+    global _preprocessing
+    if _preprocessing is None:
+        with _preprocessing_lock:
+            if _preprocessing is None:
+                _preprocessing = (
+                    _load_module("preprocessing_text_pipeline",
+                                 os.path.join(PREPROCESSING_DIR, "utils", "text_pipeline.py")),
+                    _load_module("preprocessing_config", os.path.join(PREPROCESSING_DIR, "config.py")),
+                )
+    return _preprocessing
+
+
+def preprocess_query(query):
+    """Query mentah → text hasil step 1-4 preprocessing, sama seperti content / title dokumen"""
+    pipeline, config = preprocessing()
+    return pipeline.preprocess_text(query, config.KEEP_NUMBERS, config.MIN_WORD_LENGTH)
+
+
+def add_bigrams(words):
+    """Unigram + bigram kata berurutan ("a b")"""
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
 
 def tokenize(text):
     """
     Simple tokenization - split by whitespace
     Karena text sudah di-preprocess, cukup split by space
+    (+ bigram kata kalau INDEX_BIGRAMS)
     """
     if not isinstance(text, str):
         return []
-    return text.split()
+    words = text.split()
+    return add_bigrams(words) if INDEX_BIGRAMS else words
 
 def calculate_tf(term_counts):
     """
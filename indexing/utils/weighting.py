@@ -0,0 +1,63 @@
+"""
+Rumus bobot term dan normalisasi dokumen (dipakai build TF-IDF, writer
+inverted_index.bin dan query di segments.py)
+
+TF   = 1 + log(count) kalau SUBLINEAR_TF, selain itu count / panjang dokumen
+IDF  = log((1 + N) / (1 + df)) + 1 kalau SMOOTH_IDF, selain itu log(N / df)
+BM25 = faktor normalisasi panjang k1 * (1 - b + b * dl / avgdl)
+"""
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SUBLINEAR_TF, SMOOTH_IDF, BM25_K1, BM25_B
+
+
+def compute_idf(doc_freqs, total_docs):
+    """IDF per term (array) dari document frequency per term (array)"""
+    doc_freqs = np.asarray(doc_freqs, dtype=np.float64)
+    if SMOOTH_IDF:
+        return np.log((1 + total_docs) / (1 + doc_freqs)) + 1
+    with np.errstate(divide='ignore'):
+        return np.log(total_docs / doc_freqs)
+
+
+def tf_weights(counts, doc_lengths):
+    """
+    TF dari raw count (array): 1 + log(count) kalau SUBLINEAR_TF, selain itu
+    count / panjang dokumen (doc_lengths sejajar dengan counts)
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    if SUBLINEAR_TF:
+        return 1 + np.log(counts)
+    return counts / np.asarray(doc_lengths, dtype=np.float64)
+
+
+def squared_weights(doc_freqs, numbers, tfs, doc_lengths):
+    """
+    Kuadrat bobot TF-IDF per posting (untuk panjang vektor L2 per dokumen):
+    numbers / tfs per posting, doc_freqs per term (urutan term sama dengan
+    urutan postings). IDF dari N = len(doc_lengths).
+    """
+    doc_lengths = np.asarray(doc_lengths, dtype=np.int64)
+    doc_freqs = np.asarray(doc_freqs, dtype=np.int64)
+    idf = np.repeat(compute_idf(doc_freqs, len(doc_lengths)), doc_freqs)
+    weights = tf_weights(tfs, doc_lengths[numbers]) * idf
+    return weights * weights
+
+
+def bm25_length_norms(doc_lengths, avgdl):
+    """k1 * (1 - b + b * dl / avgdl) per dokumen"""
+    doc_lengths = np.asarray(doc_lengths, dtype=np.float64)
+    if not avgdl:
+        return np.full(len(doc_lengths), BM25_K1 * (1 - BM25_B))
+    return BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / avgdl)
+
+
+def weighting_config():
+    """Nilai config yang menentukan norms tersimpan (untuk cek apakah masih valid)"""
+    return (float(SUBLINEAR_TF), float(SMOOTH_IDF), float(BM25_K1), float(BM25_B))
@@ -19,8 +19,14 @@ STEP4_OUTPUT = os.path.join(DATA_DIR, "preprocessing_step5.csv")  # Output step4
 FINAL_OUTPUT = os.path.join(DATA_DIR, "merge-all-clean.csv")
 STATS_OUTPUT = os.path.join(DATA_DIR, "preprocessing_stats.json")
 
+# Build cache: fingerprint input/config/code per step (run_all_steps.py)
+BUILD_MANIFEST = os.path.join(DATA_DIR, "preprocessing_manifest.json")
+
+# Profiling (run_all_steps.py --profile): report JSON + dump cProfile per step
+PROFILE_DIR = os.path.join(DATA_DIR, "profile")
+
 # ===================== PREPROCESSING PARAMETERS =====================
-TEXT_COLUMNS = ["content"]
+TEXT_COLUMNS = ["title_clean", "content"]  # title asli tetap di kolom title (tampilan)
 REMOVE_NEWLINES = True  # PENTING: Hapus \n, \r, \t
 LOWERCASE = True
 REMOVE_PUNCTUATION = True
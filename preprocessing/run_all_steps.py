@@ -1,48 +1,124 @@
 """
 Master script to run all preprocessing steps
+
+Build cache: fingerprint (isi input + config + code) setiap step dicatat di
+BUILD_MANIFEST. Step yang fingerprint-nya sama dengan run sebelumnya di-skip;
+step yang berubah dijalankan ulang bersama semua step setelahnya.
+
+--profile: wall/CPU time, dokumen/detik dan peak memory (tracemalloc) per
+step ditulis ke report JSON di PROFILE_DIR; --cprofile menambah dump
+cProfile (.prof) per step.
 """
+import argparse
 import sys
 import os
 import time
+from importlib import metadata
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import config
+from config import (
+    INPUT_FILE, STEP1_OUTPUT, STEP2_OUTPUT, STEP3_OUTPUT, STEP4_OUTPUT, FINAL_OUTPUT, BUILD_MANIFEST,
+    PROFILE_DIR
+)
 from steps import step1_basic_cleaning
 from steps import step2_normalize
 from steps import step3_remove_stopwords
 from steps import step4_stemming 
 from steps import step5_finalize 
+from utils import text_pipeline
+from utils.build_cache import BuildCache, step_spec, config_values
+from utils.step_profiler import StepProfiler, default_report_path
+
+
+def library_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def count_documents(path):
+    """Jumlah baris (artikel) di CSV input step, untuk dokumen/detik"""
+    import pandas as pd
+    return len(pd.read_csv(path, encoding='utf-8', usecols=[0]))
+
 
+# Fungsi teks step 1-4 ada di utils/text_pipeline.py, jadi ikut fingerprint code step tsb
+TEXT_PIPELINE = text_pipeline.__file__
 
-def run_all():
+
+def pipeline_steps():
+    """(name, func, spec) per step; spec = apa saja yang menentukan output step"""
+    sastrawi = library_version("Sastrawi")
+    return [
+        ("Step 1: Basic Cleaning", step1_basic_cleaning.main, step_spec(
+            inputs=[INPUT_FILE], outputs=[STEP1_OUTPUT],
+            config=config_values(config, ["TEXT_COLUMNS"]),
+            code=[TEXT_PIPELINE, step1_basic_cleaning.__file__])),
+        ("Step 2: Normalization", step2_normalize.main, step_spec(
+            inputs=[STEP1_OUTPUT], outputs=[STEP2_OUTPUT],
+            config=config_values(config, ["TEXT_COLUMNS", "KEEP_NUMBERS"]),
+            code=[TEXT_PIPELINE, step2_normalize.__file__])),
+        ("Step 3: Remove Stopwords", step3_remove_stopwords.main, step_spec(
+            inputs=[STEP2_OUTPUT], outputs=[STEP3_OUTPUT],
+            config={**config_values(config, ["TEXT_COLUMNS", "MIN_WORD_LENGTH"]),
+                    "stopwords": sorted(step3_remove_stopwords.ALL_STOPWORDS)},
+            code=[TEXT_PIPELINE, step3_remove_stopwords.__file__])),
+        # Stemming dulu
+        ("Step 4: Stemming", step4_stemming.main, step_spec(
+            inputs=[STEP3_OUTPUT], outputs=[STEP4_OUTPUT],
+            config={"sastrawi": sastrawi if step4_stemming.SASTRAWI_AVAILABLE else None},
+            code=[TEXT_PIPELINE, step4_stemming.__file__])),
+        # Finalize terakhir
+        ("Step 5: Finalize & Combine", step5_finalize.main, step_spec(
+            inputs=[STEP4_OUTPUT], outputs=[FINAL_OUTPUT],
+            code=[step5_finalize.__file__])),
+    ]
+
+
+def run_all(force=False, profile=None, cprofile=False):
+    """profile: path report JSON (None = tanpa profiling)"""
     print("\n" + "="*60)
     print("🚀 PREPROCESSING PIPELINE - MODULAR EXECUTION")
     print("="*60)
     print("This will run all preprocessing steps sequentially")
     print("="*60 + "\n")
     
-    steps = [
-        ("Step 1: Basic Cleaning", step1_basic_cleaning.main),
-        ("Step 2: Normalization", step2_normalize.main),
-        ("Step 3: Remove Stopwords", step3_remove_stopwords.main),
-        ("Step 4: Stemming", step4_stemming.main),  # Stemming dulu
-        ("Step 5: Finalize & Combine", step5_finalize.main),  # Finalize terakhir 
-    ]
+    steps = pipeline_steps()
+    cache = BuildCache(BUILD_MANIFEST)
+    # Setelah satu step dijalankan, semua step setelahnya ikut dijalankan
+    rerun_downstream = force
+    profiler = StepProfiler(
+        "preprocessing", enabled=profile is not None,
+        cprofile_dir=os.path.splitext(profile)[0] if profile and cprofile else None
+    )
     
     total_start = time.time()
     
-    for i, (name, func) in enumerate(steps, 1):
+    for i, (name, func, spec) in enumerate(steps, 1):
+        fingerprint = cache.fingerprint(spec)
+        if not rerun_downstream and cache.is_fresh(name, fingerprint, spec):
+            print(f"⏭️  [{i}/{len(steps)}] {name} - unchanged, skipped (fingerprint {fingerprint[:12]})")
+            profiler.skipped(name)
+            continue
+        rerun_downstream = True
+        
         print(f"\n{'='*60}")
         print(f"▶️  [{i}/{len(steps)}] {name}")
         print("="*60)
         
-        start = time.time()
+        # Hitung dokumen di luar blok profiling supaya tidak ikut terukur
+        documents = count_documents(spec["inputs"][0]) if profiler.enabled else None
         try:
-            func()
-            elapsed = time.time() - start
-            print(f"✅ {name} completed in {elapsed:.2f}s")
+            with profiler.step(name, documents=documents) as record:
+                func()
+            cache.record(name, fingerprint, spec)
+            print(f"✅ {name} completed in {record['wall_time']:.2f}s")
         except Exception as e:
+            cache.invalidate(name)
             print(f"❌ Error in {name}: {e}")
             import traceback
             traceback.print_exc()
@@ -57,9 +133,27 @@ def run_all():
     print(f"📁 Final output: merge-all-clean.csv")
     print("="*60 + "\n")
     
+    if profiler.enabled:
+        profiler.print_summary()
+        profiler.write(profile, input_file=os.path.abspath(INPUT_FILE),
+                       input_bytes=os.path.getsize(INPUT_FILE), force=force)
+    
     return True
 
 
 if __name__ == "__main__":
-    success = run_all()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Preprocessing merge-all.csv → merge-all-clean.csv")
+    parser.add_argument("--force", action="store_true",
+                        help="Jalankan semua step walaupun fingerprint tidak berubah")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="REPORT_JSON",
+                        help="Catat wall/CPU time, dokumen/detik dan peak memory per step ke report JSON "
+                             "(default: PROFILE_DIR/preprocessing_<timestamp>.json)")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="Dengan --profile: dump cProfile (.prof) per step di folder sebelah report")
+    args = parser.parse_args()
+    if args.cprofile and args.profile is None:
+        parser.error("--cprofile membutuhkan --profile")
+    if args.profile == "":
+        args.profile = default_report_path(PROFILE_DIR, "preprocessing")
+    success = run_all(force=args.force, profile=args.profile, cprofile=args.cprofile)
+    sys.exit(0 if success else 1)
@@ -4,9 +4,9 @@ STEP 1: Basic Text Cleaning
 - Hapus extra whitespace
 - Hapus URL & email
 - Lowercase conversion
+- Title dibersihkan ke kolom title_clean (title asli tetap untuk tampilan)
 """
 import pandas as pd
-import re
 import sys
 import os
 
@@ -14,57 +14,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import INPUT_FILE, STEP1_OUTPUT, TEXT_COLUMNS, VERBOSE
-
-
-def clean_newlines_aggressive(text):
-    """Hapus SEMUA newline dan jadikan 1 baris panjang"""
-    if not isinstance(text, str):
-        return ""
-    
-    # Hapus \n, \r, \t, dan semua whitespace character
-    text = text.replace('\n', ' ')
-    text = text.replace('\r', ' ')
-    text = text.replace('\t', ' ')
-    
-    # Hapus multiple spaces jadi single space
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Trim
-    text = text.strip()
-    
-    return text
-
-
-def remove_urls(text):
-    """Hapus URL"""
-    url_pattern = r'https?://\S+|www\.\S+'
-    return re.sub(url_pattern, '', text)
-
-
-def remove_emails(text):
-    """Hapus email"""
-    email_pattern = r'\S+@\S+'
-    return re.sub(email_pattern, '', text)
-
-
-def basic_clean(text):
-    """Pipeline cleaning dasar"""
-    if not isinstance(text, str):
-        return ""
-    
-    # 1. Lowercase
-    text = text.lower()
-    
-    # 2. Remove URLs
-    text = remove_urls(text)
-    
-    # 3. Remove emails
-    text = remove_emails(text)
-    
-    # 4. Remove newlines AGRESIF
-    text = clean_newlines_aggressive(text)
-    
-    return text
+from utils.text_pipeline import basic_clean
 
 
 def main():
@@ -92,6 +42,9 @@ def main():
         sample_idx = 0
         original_content = df['content'].iloc[sample_idx]
     
+    # Content asli disimpan untuk snippet hasil pencarian (document index indexing/)
+    df['content_original'] = df['content']
+
     # REPLACE content column with cleaned version
     df['content'] = df['content'].fillna('').apply(basic_clean)
     
@@ -104,12 +57,15 @@ def main():
         print(f"  {df['content'].iloc[sample_idx][:200]}...")
         print()
     
-    # Title: TIDAK DIPROSES (keep original)
-    print(f"⏭️  Skipping column: title (NO preprocessing - keep original)")
+    # Title: dibersihkan ke kolom baru title_clean (ikut step 2-4 dan text_combined),
+    # title asli tetap untuk tampilan hasil pencarian
+    print(f"🔄 Processing column: title → title_clean (title asli tetap)")
+    df['title_clean'] = df['title'].fillna('').apply(basic_clean)
     
     if VERBOSE:
-        print(f"\n📝 TITLE unchanged (original):")
-        print(f"  Title: {df['title'].iloc[0]}")
+        print(f"\n📝 Sample TITLE transformation:")
+        print(f"  BEFORE: {df['title'].iloc[0]}")
+        print(f"  AFTER:  {df['title_clean'].iloc[0]}")
         print()
     
     # Save
@@ -10,37 +10,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import STEP2_OUTPUT, STEP3_OUTPUT, TEXT_COLUMNS, MIN_WORD_LENGTH, VERBOSE
-
-# Import stopwords
-try:
-    from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
-    factory = StopWordRemoverFactory()
-    STOPWORDS = set(factory.get_stop_words())
-    print(f"✅ Loaded {len(STOPWORDS)} stopwords from Sastrawi")
-except ImportError:
-    print("⚠️  Sastrawi not installed, using minimal stopwords")
-    STOPWORDS = {'yang', 'untuk', 'pada', 'ke', 'di', 'dari', 'dan', 'atau', 'akan', 'adalah'}
-
-# Add sports-specific stopwords
-SPORTS_STOPWORDS = {
-    'jakarta', 'tempo', 'com', 'id', 'foto', 'video', 'berita', 'artikel'
-}
-
-ALL_STOPWORDS = STOPWORDS | SPORTS_STOPWORDS
-
-
-def remove_stopwords(text, min_length=2):
-    """Remove stopwords and short words"""
-    if not isinstance(text, str):
-        return ""
-    
-    words = text.split()
-    filtered = [
-        word for word in words 
-        if word.lower() not in ALL_STOPWORDS and len(word) >= min_length
-    ]
-    
-    return ' '.join(filtered)
+from utils.text_pipeline import ALL_STOPWORDS, remove_stopwords
 
 
 def main():
@@ -82,12 +52,13 @@ def main():
         print(f"  AFTER:  {df['content'].iloc[sample_idx][:100]}...")
         print()
     
-    # TITLE: SKIP stopword removal (keep as is)
-    print(f"\n⏭️  Skipping: title (NO preprocessing - keep original)")
+    # TITLE: stopword removal title_clean (title asli tetap)
+    print(f"\n🔄 Processing: title_clean")
+    df['title_clean'] = df['title_clean'].apply(lambda x: remove_stopwords(x, MIN_WORD_LENGTH))
     
     if VERBOSE:
-        print(f"\n📝 TITLE unchanged:")
-        print(f"  Title: {df['title'].iloc[0][:80]}...")
+        print(f"\n📝 Sample TITLE:")
+        print(f"  AFTER: {df['title_clean'].iloc[0][:80]}...")
         print()
     
     print(f"💾 Saving to: {STEP3_OUTPUT}")
@@ -10,62 +10,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import STEP3_OUTPUT, STEP4_OUTPUT, VERBOSE
-
-# Import Sastrawi Stemmer
-try:
-    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-    factory = StemmerFactory()
-    stemmer = factory.create_stemmer()
-    print(f"✅ Sastrawi Stemmer loaded successfully")
-    SASTRAWI_AVAILABLE = True
-except ImportError:
-    print("❌ Sastrawi not installed!")
-    print("💡 Install with: pip install Sastrawi")
-    SASTRAWI_AVAILABLE = False
-
-
-def stem_text(text):
-    """
-    Stem text menggunakan Sastrawi
-    
-    Args:
-        text: string text yang akan di-stem
-    
-    Returns:
-        string text dengan kata-kata dalam bentuk dasar
-    """
-    if not isinstance(text, str) or not text.strip():
-        return ""
-    
-    if not SASTRAWI_AVAILABLE:
-        return text
-    
-    # Stem menggunakan Sastrawi
-    stemmed = stemmer.stem(text)
-    
-    return stemmed
-
-
-def stem_word_by_word(text):
-    """
-    Alternative: Stem word by word (lebih detail untuk melihat proses)
-    
-    Args:
-        text: string text
-    
-    Returns:
-        string text yang sudah di-stem per kata
-    """
-    if not isinstance(text, str) or not text.strip():
-        return ""
-    
-    if not SASTRAWI_AVAILABLE:
-        return text
-    
-    words = text.split()
-    stemmed_words = [stemmer.stem(word) for word in words]
-    
-    return ' '.join(stemmed_words)
+from utils.text_pipeline import SASTRAWI_AVAILABLE, stem_text, stem_word_by_word
 
 
 def main():
@@ -114,12 +59,13 @@ def main():
                 print(f"    {i}. {b} → {a}")
         print()
     
-    # TITLE: SKIP stemming (keep as is)
-    print(f"\n⏭️  Skipping: title (NO preprocessing - keep original)")
+    # TITLE: stemming title_clean (title asli tetap)
+    print(f"\n🔄 Processing: title_clean (stemming)")
+    df['title_clean'] = df['title_clean'].apply(stem_text)
     
     if VERBOSE:
-        print(f"\n📝 TITLE unchanged:")
-        print(f"  Title: {df['title'].iloc[0][:80]}...")
+        print(f"\n📝 Sample TITLE:")
+        print(f"  AFTER: {df['title_clean'].iloc[0][:80]}...")
         print()
     
     # Save to step4 output (akan diproses step5 finalize)
@@ -1,6 +1,6 @@
 """
 STEP 5: Finalize & Combine
-- Combine title + content (sudah di-stem)
+- Combine title_clean + content (keduanya sudah di-stem)
 - Calculate final statistics
 - Generate final output
 """
@@ -21,10 +21,10 @@ def main():
     df = pd.read_csv(STEP4_OUTPUT, encoding='utf-8')
     print(f"✅ Loaded {len(df)} articles\n")
     
-    # title dan content sudah bersih dari step sebelumnya
+    # title_clean dan content sudah bersih dari step sebelumnya (title asli untuk tampilan)
     # Tambahkan column text_combined saja
     print("🔗 Creating text_combined...")
-    df['text_combined'] = df['title'] + ' ' + df['content']
+    df['text_combined'] = df['title_clean'].fillna('') + ' ' + df['content'].fillna('')
     df['text_combined'] = df['text_combined'].str.strip()
     
     # Calculate statistics
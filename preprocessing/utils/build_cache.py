@@ -0,0 +1,116 @@
+"""
+Build cache berbasis content fingerprint untuk runner pipeline
+(dipakai preprocessing/run_all_steps.py dan indexing/run_all_steps.py)
+
+Setiap step dideklarasikan dengan spec (dict dari step_spec()): file input,
+file output, nilai config, dan file code (.py). Fingerprint step = sha256 dari isi semua input,
+config dan code. Manifest JSON menyimpan fingerprint terakhir setiap step
+beserta hash output-nya.
+
+Step di-skip kalau fingerprint sama dengan run sebelumnya DAN semua output
+masih sama dengan yang ditulis run itu. Begitu satu step dijalankan ulang,
+semua step setelahnya (downstream) ikut dijalankan ulang.
+
+Hash file di-cache per (size, mtime) di manifest, jadi no-op rebuild hanya
+melakukan stat() tanpa membaca ulang isi file.
+"""
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+HASH_CHUNK = 1 << 20
+
+
+def step_spec(inputs=(), outputs=(), config=None, code=()):
+    """Input / output / config / code yang menentukan hasil satu step"""
+    return {"inputs": list(inputs), "outputs": list(outputs), "config": config or {}, "code": list(code)}
+
+
+def config_values(module, names):
+    """Nilai config (by name) dari module config → dict untuk spec["config"]"""
+    return {name: getattr(module, name) for name in names}
+
+
+def package_code(package_dir, *extra):
+    """Semua file .py di package (config, steps/, utils/) + file tambahan"""
+    files = []
+    for root, dirs, names in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".py"))
+    return files + list(extra)
+
+
+class BuildCache:
+    """Manifest fingerprint per step (lihat docstring module)"""
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.manifest = {"version": MANIFEST_VERSION, "files": {}, "steps": {}}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION:
+                self.manifest = manifest
+
+    def _key(self, path):
+        # Path relatif terhadap manifest: manifest tetap valid kalau repo dipindah
+        return os.path.relpath(os.path.abspath(path), os.path.dirname(os.path.abspath(self.manifest_path)))
+
+    def file_hash(self, path):
+        """sha256 isi file (None kalau tidak ada); dibaca ulang hanya kalau size/mtime berubah"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = self._key(path)
+        cached = self.manifest["files"].get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+        self.manifest["files"][key] = {
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()
+        }
+        return digest.hexdigest()
+
+    def fingerprint(self, spec):
+        """sha256 dari hash input + config + hash code"""
+        payload = {
+            "inputs": {self._key(path): self.file_hash(path) for path in spec["inputs"]},
+            "config": spec["config"],
+            "code": {self._key(path): self.file_hash(path) for path in spec["code"]},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+
+    def is_fresh(self, name, fingerprint, spec):
+        """True kalau fingerprint sama dan semua output masih identik dengan run sebelumnya"""
+        entry = self.manifest["steps"].get(name)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return False
+        for path in spec["outputs"]:
+            current = self.file_hash(path)
+            if current is None or entry["outputs"].get(self._key(path)) != current:
+                return False
+        return True
+
+    def record(self, name, fingerprint, spec):
+        """Catat step yang baru selesai, lalu simpan manifest (atomic)"""
+        self.manifest["steps"][name] = {
+            "fingerprint": fingerprint,
+            "outputs": {self._key(path): self.file_hash(path) for path in spec["outputs"]},
+        }
+        self.save()
+
+    def invalidate(self, name):
+        self.manifest["steps"].pop(name, None)
+        self.save()
+
+    def save(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
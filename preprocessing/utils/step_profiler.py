@@ -0,0 +1,125 @@
+"""
+Profiling per step untuk runner pipeline
+(dipakai preprocessing/run_all_steps.py dan indexing/run_all_steps.py --profile)
+
+Per step dicatat: wall time, CPU time, dokumen/detik, peak memory Python
+(tracemalloc, di-reset setiap step) dan peak RSS proses. Opsional: dump
+cProfile per step (.prof, buka dengan `python -m pstats` atau snakeviz).
+Hasilnya satu report JSON supaya performa pipeline bisa dibandingkan
+antar run / antar ukuran corpus.
+
+tracemalloc memperlambat kode yang banyak alokasi (~2x), jadi angka waktu
+dengan --profile lebih tinggi dari run biasa; bandingkan report dengan
+report, bukan dengan run tanpa profiling.
+"""
+import cProfile
+import json
+import os
+import platform
+import re
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _peak_rss_mb():
+    # ru_maxrss: KB di Linux, byte di macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StepProfiler:
+    """
+    with profiler.step(name) as record: ...  → satu entry report per step.
+    record["documents"] boleh diisi di dalam blok untuk menghitung dokumen/detik.
+    enabled=False: hanya wall time (tanpa tracemalloc / cProfile).
+    """
+
+    def __init__(self, pipeline, enabled=False, cprofile_dir=None):
+        self.pipeline = pipeline
+        self.enabled = enabled
+        self.cprofile_dir = cprofile_dir
+        self.steps = []
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if cprofile_dir:
+            os.makedirs(cprofile_dir, exist_ok=True)
+
+    @contextmanager
+    def step(self, name, documents=None):
+        record = {"name": name, "documents": documents, "skipped": False}
+        profile = None
+        if self.enabled:
+            tracemalloc.reset_peak()
+            if self.cprofile_dir:
+                profile = cProfile.Profile()
+                profile.enable()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = round(time.perf_counter() - wall_start, 4)
+            if self.enabled:
+                record["cpu_time"] = round(time.process_time() - cpu_start, 4)
+                record["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+                record["peak_rss_mb"] = _peak_rss_mb()
+                if profile is not None:
+                    profile.disable()
+                    path = os.path.join(self.cprofile_dir, f"{len(self.steps) + 1:02d}_{_slug(name)}.prof")
+                    profile.dump_stats(path)
+                    record["cprofile"] = path
+            if record["documents"] and record["wall_time"] > 0:
+                record["docs_per_sec"] = round(record["documents"] / record["wall_time"], 1)
+            self.steps.append(record)
+
+    def skipped(self, name):
+        """Step yang di-skip build cache tetap muncul di report"""
+        self.steps.append({"name": name, "skipped": True})
+
+    def report(self, **extra):
+        executed = [step for step in self.steps if not step["skipped"]]
+        return {
+            "pipeline": self.pipeline,
+            "started_at": self.started_at,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **extra,
+            "total_wall_time": round(sum(step["wall_time"] for step in executed), 4),
+            "total_cpu_time": round(sum(step.get("cpu_time", 0) for step in executed), 4),
+            "peak_rss_mb": _peak_rss_mb(),
+            "steps": self.steps,
+        }
+
+    def print_summary(self):
+        print(f"\n📈 Profile ({self.pipeline}):")
+        print(f"   {'Step':<46} {'wall s':>8} {'cpu s':>8} {'docs/s':>9} {'peak MB':>8}")
+        for step in self.steps:
+            if step["skipped"]:
+                print(f"   {step['name']:<46} {'skipped':>8}")
+                continue
+            docs_per_sec = step.get("docs_per_sec")
+            print(f"   {step['name']:<46} {step['wall_time']:>8.2f} {step.get('cpu_time', 0):>8.2f} "
+                  f"{docs_per_sec if docs_per_sec is not None else '-':>9} "
+                  f"{step.get('peak_traced_mb', 0):>8.1f}")
+
+    def write(self, path, **extra):
+        """Tulis report JSON (direktori dibuat kalau belum ada), return report"""
+        report = self.report(**extra)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Profile report saved to: {path}")
+        return report
+
+
+def default_report_path(profile_dir, pipeline):
+    """<profile_dir>/<pipeline>_<timestamp>.json"""
+    return os.path.join(profile_dir, f"{pipeline}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
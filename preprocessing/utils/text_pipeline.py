@@ -0,0 +1,200 @@
+"""
+Rantai pemrosesan teks step 1-4 (per string)
+
+Dipakai step 1-4 untuk kolom dokumen dan oleh indexing/ untuk query
+(indexing/utils/text_processor.preprocess_query, lalu segments.query_terms
+menambah bigram lewat add_bigrams), supaya query dan index selalu
+melewati cleaning, normalisasi, stopword removal dan stemming yang sama.
+Modul ini hanya bergantung pada stdlib + Sastrawi (opsional) dan tidak
+mencetak apa-apa saat di-import.
+"""
+import re
+import string
+
+# Stopwords Sastrawi (fallback: daftar minimal)
+try:
+    from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+    STOPWORDS = set(StopWordRemoverFactory().get_stop_words())
+except ImportError:
+    STOPWORDS = {'yang', 'untuk', 'pada', 'ke', 'di', 'dari', 'dan', 'atau', 'akan', 'adalah'}
+
+# Add sports-specific stopwords
+SPORTS_STOPWORDS = {
+    'jakarta', 'tempo', 'com', 'id', 'foto', 'video', 'berita', 'artikel'
+}
+
+ALL_STOPWORDS = STOPWORDS | SPORTS_STOPWORDS
+
+# Sastrawi Stemmer (create_stemmer() sudah meng-cache hasil per kata)
+try:
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+    stemmer = StemmerFactory().create_stemmer()
+    SASTRAWI_AVAILABLE = True
+except ImportError:
+    stemmer = None
+    SASTRAWI_AVAILABLE = False
+
+
+# ===== STEP 1: BASIC CLEANING =====
+
+def clean_newlines_aggressive(text):
+    """Hapus SEMUA newline dan jadikan 1 baris panjang"""
+    if not isinstance(text, str):
+        return ""
+
+    # Hapus \n, \r, \t, dan semua whitespace character
+    text = text.replace('\n', ' ')
+    text = text.replace('\r', ' ')
+    text = text.replace('\t', ' ')
+
+    # Hapus multiple spaces jadi single space
+    text = re.sub(r'\s+', ' ', text)
+
+    # Trim
+    text = text.strip()
+
+    return text
+
+
+def remove_urls(text):
+    """Hapus URL"""
+    url_pattern = r'https?://\S+|www\.\S+'
+    return re.sub(url_pattern, '', text)
+
+
+def remove_emails(text):
+    """Hapus email"""
+    email_pattern = r'\S+@\S+'
+    return re.sub(email_pattern, '', text)
+
+
+def basic_clean(text):
+    """Pipeline cleaning dasar"""
+    if not isinstance(text, str):
+        return ""
+
+    # 1. Lowercase
+    text = text.lower()
+
+    # 2. Remove URLs
+    text = remove_urls(text)
+
+    # 3. Remove emails
+    text = remove_emails(text)
+
+    # 4. Remove newlines AGRESIF
+    text = clean_newlines_aggressive(text)
+
+    return text
+
+
+# ===== STEP 2: NORMALIZATION =====
+
+def remove_punctuation(text):
+    """Hapus semua tanda baca"""
+    translator = str.maketrans('', '', string.punctuation)
+    return text.translate(translator)
+
+
+def remove_numbers(text):
+    """Hapus semua angka"""
+    return re.sub(r'\d+', '', text)
+
+
+def remove_repeated_chars(text, max_repeat=2):
+    """Hapus karakter berulang: gooolll -> gol"""
+    pattern = r'(.)\1{' + str(max_repeat) + ',}'
+    return re.sub(pattern, r'\1' * max_repeat, text)
+
+
+def normalize_text(text, keep_nums=True):
+    """Pipeline normalization"""
+    if not isinstance(text, str):
+        return ""
+
+    # 1. Remove punctuation
+    text = remove_punctuation(text)
+
+    # 2. Remove numbers (optional)
+    if not keep_nums:
+        text = remove_numbers(text)
+
+    # 3. Remove repeated chars
+    text = remove_repeated_chars(text)
+
+    # 4. Clean whitespace
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    return text
+
+
+# ===== STEP 3: STOPWORDS =====
+
+def remove_stopwords(text, min_length=2):
+    """Remove stopwords and short words"""
+    if not isinstance(text, str):
+        return ""
+
+    words = text.split()
+    filtered = [
+        word for word in words
+        if word.lower() not in ALL_STOPWORDS and len(word) >= min_length
+    ]
+
+    return ' '.join(filtered)
+
+
+# ===== STEP 4: STEMMING =====
+
+def stem_text(text):
+    """
+    Stem text menggunakan Sastrawi
+
+    Args:
+        text: string text yang akan di-stem
+
+    Returns:
+        string text dengan kata-kata dalam bentuk dasar
+    """
+    if not isinstance(text, str) or not text.strip():
+        return ""
+
+    if not SASTRAWI_AVAILABLE:
+        return text
+
+    # Stem menggunakan Sastrawi
+    stemmed = stemmer.stem(text)
+
+    return stemmed
+
+
+def stem_word_by_word(text):
+    """
+    Alternative: Stem word by word (lebih detail untuk melihat proses)
+
+    Args:
+        text: string text
+
+    Returns:
+        string text yang sudah di-stem per kata
+    """
+    if not isinstance(text, str) or not text.strip():
+        return ""
+
+    if not SASTRAWI_AVAILABLE:
+        return text
+
+    words = text.split()
+    stemmed_words = [stemmer.stem(word) for word in words]
+
+    return ' '.join(stemmed_words)
+
+
+# ===== STEP 1-4 =====
+
+def preprocess_text(text, keep_nums=True, min_length=2):
+    """Step 1-4 untuk satu string (mis. query): clean → normalize → stopwords → stem"""
+    text = basic_clean(text)
+    text = normalize_text(text, keep_nums)
+    text = remove_stopwords(text, min_length)
+    return stem_text(text)